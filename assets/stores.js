@@ -0,0 +1,43 @@
+// Dekodiert Stores im Spaltenformat von core/stores.py für Clientside-Callbacks:
+// window.stores.decode(data) -> {spalte: Array bzw. TypedArray, ...}
+window.stores = (function () {
+    var TYPES = {
+        uint8: Uint8Array, int8: Int8Array,
+        uint16: Uint16Array, int16: Int16Array,
+        uint32: Uint32Array, int32: Int32Array,
+        float64: Float64Array
+    };
+
+    function unpack(spec) {
+        if (!('b64' in spec)) {
+            return spec.values;
+        }
+        var raw = atob(spec.b64);
+        var bytes = new Uint8Array(raw.length);
+        for (var i = 0; i < raw.length; i++) {
+            bytes[i] = raw.charCodeAt(i);
+        }
+        // Python schreibt Little-Endian, wie alle gängigen Browser-Plattformen
+        return new TYPES[spec.dtype](bytes.buffer);
+    }
+
+    function decode(data) {
+        if (!data || data.format !== 'spalten/1') {
+            throw new Error('Kein Store im Format spalten/1');
+        }
+        var columns = {};
+        Object.keys(data.columns).forEach(function (name) {
+            var spec = data.columns[name];
+            var values = unpack(spec);
+            if (spec.categories) {
+                values = Array.prototype.map.call(values, function (code) {
+                    return code < 0 ? null : spec.categories[code];
+                });
+            }
+            columns[name] = values;
+        });
+        return columns;
+    }
+
+    return {decode: decode};
+})();
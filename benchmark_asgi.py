@@ -0,0 +1,127 @@
+"""Vergleich WSGI- gegen ASGI-Betrieb unter gleichzeitigen Callback-Anfragen.
+
+Schickt ``--anfragen`` Callback-Anfragen (Handelsverlauf je Land, alle Länder
+im Wechsel) gleichzeitig an die App und misst Durchsatz sowie Latenz vom
+Eintreffen bis zur fertigen Antwort (inkl. Wartezeit auf einen freien
+Thread). Vor jedem Lauf wird eine neue Datenversion veröffentlicht, die
+Callbacks rechnen also wie nach einem Neustart ohne Cache. Beide Betriebsarten
+bekommen gleich viele Threads (``--threads``): im WSGI-Betrieb als
+Worker-Threads, im ASGI-Betrieb (:mod:`core.asgi`) als Rechen-Threads.
+
+Die Clients senden ohne Verzögerung; gemessen wird also nur, was die
+Callbacks selbst kosten. Der Vorteil des ASGI-Betriebs bei langsamen Clients
+zeigt sich hier bewusst nicht.
+
+    python benchmark_asgi.py --anfragen 512 --threads 4
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.test import EnvironBuilder, run_wsgi_app
+
+import multiple_pages_test_zweiteHauptkategorie as main
+from core import asgi, datasets
+
+PATH = '/_dash-update-component'
+
+
+def payloads():
+    länder = sorted(datasets.get('df_grouped')['Land'].unique())
+    return [
+        json.dumps({
+            'output': 'handel_graph.figure',
+            'outputs': {'id': 'handel_graph', 'property': 'figure'},
+            'inputs': [{'id': 'land_dropdown', 'property': 'value', 'value': land}],
+            'changedPropIds': ['land_dropdown.value'],
+            'state': [],
+        }).encode()
+        for land in länder
+    ]
+
+
+def fresh():
+    """Neue Datenversion: die Callback-Caches beginnen leer."""
+    datasets.publish({})
+
+
+def run_wsgi(bodies, threads):
+    def request(body, arrived):
+        environ = EnvironBuilder(path=PATH, method='POST', data=body, content_type='application/json').get_environ()
+        _, status, _ = run_wsgi_app(main.server, environ, buffered=True)
+        assert status.startswith('200'), status
+        return time.perf_counter() - arrived
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        futures = [pool.submit(request, body, time.perf_counter()) for body in bodies]
+        return [future.result() for future in futures]
+
+
+def run_asgi(bodies, threads):
+    app = asgi.wrap(main.server, threads=threads)
+
+    async def request(body):
+        arrived = time.perf_counter()
+        received = []
+
+        async def receive():
+            if received:
+                return {'type': 'http.disconnect'}
+            received.append(True)
+            return {'type': 'http.request', 'body': body, 'more_body': False}
+
+        status = {}
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                status['code'] = message['status']
+
+        scope = {
+            'type': 'http', 'http_version': '1.1', 'scheme': 'http', 'method': 'POST',
+            'path': PATH, 'raw_path': PATH.encode(), 'root_path': '', 'query_string': b'',
+            'headers': [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode())],
+            'server': ('localhost', 8050), 'client': ('127.0.0.1', 0),
+        }
+        await app(scope, receive, send)
+        assert status['code'] == 200, status
+        return time.perf_counter() - arrived
+
+    async def run_all():
+        return await asyncio.gather(*(request(body) for body in bodies))
+
+    try:
+        return asyncio.run(run_all())
+    finally:
+        app.executor.shutdown()
+
+
+def report(name, durations, wall):
+    durations = sorted(durations)
+    p95 = durations[int(len(durations) * 0.95) - 1]
+    print(f'{name:5s} {len(durations) / wall:8.1f} Anfragen/s   '
+          f'Median {statistics.median(durations) * 1000:7.1f} ms   p95 {p95 * 1000:7.1f} ms')
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--anfragen', type=int, default=512)
+    parser.add_argument('--threads', type=int, default=4, help='Worker- bzw. Rechen-Threads')
+    args = parser.parse_args()
+
+    länder = payloads()
+    bodies = [länder[i % len(länder)] for i in range(args.anfragen)]
+    # Aufwärmen: Importe, Indizes und Abfrage-Backend einmal initialisieren
+    run_wsgi(länder[:8], 1)
+
+    for name, run in [('WSGI', run_wsgi), ('ASGI', run_asgi)]:
+        fresh()
+        start = time.perf_counter()
+        durations = run(bodies, args.threads)
+        report(name, durations, time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+    main_cli()
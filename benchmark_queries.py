@@ -0,0 +1,78 @@
+"""Vergleich der Speicher-Backends von core.queries.
+
+Führt dieselben typischen Seitenabfragen (Monatswerte eines Landes, Top-10,
+Vorjahresvergleich, Handelsdaten einer Ware, ...) mit jedem Backend aus,
+prüft, dass alle Backends dieselben Zeilen liefern, und gibt die Laufzeit
+je Abfrage aus. Das erste Ergebnis je Backend (Aufbau der Arrays bzw. der
+SQLite-Datei) wird nicht mitgemessen.
+
+    python benchmark_queries.py --wiederholungen 20 --backends pandas mmap sqlite
+"""
+import argparse
+import statistics
+import time
+
+import pandas as pd
+
+from core import datasets, queries
+
+
+def cases():
+    df = datasets.get('top10_goods_spec_country_and_year')
+    jahr = int(df['Jahr'].max())
+    land = 'Frankreich' if 'Frankreich' in df['Land'].values else df['Land'].iloc[0]
+    ware = df['Label'].value_counts().index[0]
+    return {
+        'country_years': lambda: queries.country_years(land, range(2008, 2025)),
+        'monthly': lambda: queries.monthly(land, jahr),
+        'monthly (gesamt)': lambda: queries.monthly(None, jahr),
+        'yearly_by_good': lambda: queries.yearly_by_good([ware]),
+        'country_goods': lambda: queries.country_goods(country=land, year=jahr),
+        'top_n Land': lambda: queries.top_n('export', jahr, 10),
+        'top_n Land/Ware': lambda: queries.top_n('export', jahr, 10, good=ware),
+        'top_n Ware': lambda: queries.top_n('export', jahr, 10, by='Label'),
+        'yoy': lambda: queries.yoy(land, jahr),
+        'details': lambda: queries.details(jahr, ware),
+    }
+
+
+def run(backend, abfragen, wiederholungen):
+    queries.use(backend)
+    results, timings = {}, {}
+    for name, query in abfragen.items():
+        results[name] = query()  # Aufwärmen
+        durations = []
+        for _ in range(wiederholungen):
+            start = time.perf_counter()
+            query()
+            durations.append(time.perf_counter() - start)
+        timings[name] = statistics.median(durations)
+    return results, timings
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--wiederholungen', type=int, default=20)
+    parser.add_argument('--backends', nargs='+', default=list(queries.BACKENDS), choices=list(queries.BACKENDS))
+    args = parser.parse_args()
+
+    datasets.load_all()
+    abfragen = cases()
+
+    reference = None
+    timings = {}
+    for backend in args.backends:
+        results, timings[backend] = run(backend, abfragen, args.wiederholungen)
+        if reference is None:
+            reference = results
+        else:
+            for name, result in results.items():
+                pd.testing.assert_frame_equal(reference[name], result, obj=f'{backend}: {name}')
+
+    print(f'{"Abfrage":18s}' + ''.join(f'{backend:>12s}' for backend in args.backends) + '   (Median in ms)')
+    for name in abfragen:
+        print(f'{name:18s}' + ''.join(f'{timings[backend][name] * 1000:12.2f}' for backend in args.backends))
+
+
+if __name__ == '__main__':
+    main_cli()
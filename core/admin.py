@@ -0,0 +1,44 @@
+"""Verwaltungs-Endpunkte auf dem Flask-Server der App.
+
+``POST /admin/reload`` lädt alle Datensätze im laufenden Betrieb neu,
+``GET /admin/memory`` zeigt den Speicherbedarf je Datensatz vor und nach
+dem Verkleinern der Datentypen. Die Endpunkte sind nur aktiv, wenn die
+Umgebungsvariable ``ADMIN_TOKEN`` gesetzt ist; der Token wird im Header
+``X-Admin-Token`` erwartet.
+"""
+import hmac
+import os
+
+from flask import abort, jsonify, request
+
+from core import datasets
+
+
+def _check_token():
+    token = os.environ.get('ADMIN_TOKEN')
+    if not token:
+        abort(404)
+    if not hmac.compare_digest(request.headers.get('X-Admin-Token', ''), token):
+        abort(403)
+
+
+def register_routes(server):
+    """Registriert die Verwaltungs-Endpunkte auf ``server`` (``app.server``)."""
+
+    @server.route('/admin/reload', methods=['POST'])
+    def admin_reload():
+        _check_token()
+        # Marker-Datei berühren, damit auch die übrigen Worker neu laden
+        snapshot = datasets.request_reload()
+        return jsonify({'version': snapshot.version})
+
+    @server.route('/admin/memory', methods=['GET'])
+    def admin_memory():
+        _check_token()
+        report = datasets.memory_report()
+        total = sum(entry['nachher'] for entry in report.values())
+        return jsonify({
+            'datensaetze': report,
+            'gesamt': total,
+            'budget': int(datasets.MEMORY_BUDGET_MB * 2 ** 20) or None,
+        })
@@ -0,0 +1,232 @@
+"""Auffällige Monate aller Länder, Waren und Land-Waren-Paare.
+
+Ein Monat ist auffällig, wenn seine Veränderung zum Vorjahresmonat weit
+außerhalb dessen liegt, was die Reihe in den :data:`WINDOW` Monaten davor
+gezeigt hat (z.B. der Einbruch der Exporte nach Iran durch Sanktionen).
+Gemessen wird mit einem robusten z-Wert::
+
+    d(t) = x(t) - x(t - 12)
+    z(t) = (d(t) - Median(d im Fenster)) / (1,4826 · MAD(d im Fenster))
+
+Berechnet wird für alle Reihen einer Matrix aus :mod:`core.series` auf
+einmal mit NumPy (gleitende Fenster über die Spalten, in Zeilenblöcken von
+:data:`CHUNK_ROWS`), nicht je Reihe. Da ``z(t)`` nur von Monaten bis ``t``
+abhängt, ändern neue Monate die Werte älterer Monate nicht: Kommen nur
+Monate hinzu (z.B. über :mod:`core.ingest`), werden beim Neuladen nur die
+neuen Spalten berechnet und an das vorige Ergebnis angehängt.
+
+:func:`alerts` liefert die Hinweistabelle aller auffälligen Monate.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from core import datasets, series
+
+SEASON = 12
+
+# Fenster der Vergangenheit (Monate) und Mindestzahl vorhandener Vorjahresveränderungen darin
+WINDOW = 24
+MIN_HISTORY = 12
+
+# Ab diesem |z| gilt ein Monat als auffällig
+Z_THRESHOLD = 4.0
+
+# Kleinste Streuung relativ zum Vorjahreswert und kleinster Monatswert (€) eines Hinweises,
+# damit sehr kleine oder fast konstante Reihen nicht bei jeder Schwankung auffallen
+MIN_SCALE_SHARE = 0.1
+MIN_VALUE = 1e7
+
+# Geprüfte Reihen und Kennzahlen (Land-Waren-Paare nur, wenn handelsdaten vorliegt)
+KINDS = ('land', 'ware', 'land_ware')
+METRICS = ('export', 'import')
+
+# Reihen je Block: begrenzt den Speicher der gleitenden Fenster
+CHUNK_ROWS = 4096
+
+ART = {'land': 'Land', 'ware': 'Ware', 'land_ware': 'Land und Ware'}
+KENNZAHL = {'export': 'Export', 'import': 'Import'}
+
+COLUMNS = ['Art', 'Land', 'Ware', 'Jahr', 'Monat', 'Kennzahl', 'Wert', 'Vorjahreswert', 'z']
+
+
+def _median(windows, count):
+    # Median über die letzte Achse ohne NaN: sortieren (NaN landen hinten) und die mittleren Werte lesen
+    ordered = np.sort(windows, axis=-1)
+    lower = np.maximum((count - 1) // 2, 0)[..., None]
+    upper = np.maximum(count // 2, 0)[..., None]
+    median = (np.take_along_axis(ordered, lower, axis=-1) + np.take_along_axis(ordered, upper, axis=-1)) / 2
+    return median[..., 0]
+
+
+def score(values, first=0):
+    """Robuste z-Werte aller Zeilen von ``values`` (Reihe × Monat).
+
+    Gibt nur die Spalten ab ``first`` zurück (Form ``(n, T - first)``);
+    davor liegende Spalten dienen nur als Vergangenheit. ``NaN``, wo die
+    Vergangenheit nicht ausreicht.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    start = max(0, first - SEASON - WINDOW)
+    values = values[:, start:]
+    n_series, n_months = values.shape
+    z = np.full((n_series, n_months), np.nan)
+
+    # Vorjahresveränderungen; erst ab MIN_HISTORY davon hat ein Monat genug Vergangenheit
+    if n_months > SEASON + MIN_HISTORY:
+        previous = values[:, :-SEASON]
+        diff = values[:, SEASON:] - previous
+        # Vorn WINDOW Lücken, damit Fenster j genau die WINDOW Veränderungen vor Veränderung j enthält
+        padded = np.concatenate([np.full((n_series, WINDOW), np.nan), diff], axis=1)
+
+        for begin in range(0, n_series, CHUNK_ROWS):
+            rows = slice(begin, begin + CHUNK_ROWS)
+            windows = sliding_window_view(padded[rows], WINDOW, axis=1)[:, MIN_HISTORY:diff.shape[1]]
+            count = (~np.isnan(windows)).sum(axis=2)
+            median = _median(windows, count)
+            mad = _median(np.abs(windows - median[..., None]), count)
+            scale = np.maximum(1.4826 * mad, MIN_SCALE_SHARE * np.abs(previous[rows, MIN_HISTORY:]))
+            with np.errstate(divide='ignore', invalid='ignore'):
+                chunk = (diff[rows, MIN_HISTORY:] - median) / scale
+            chunk[(count < MIN_HISTORY) | (scale == 0)] = np.nan
+            z[rows, SEASON + MIN_HISTORY:] = chunk
+
+    return z[:, first - start:]
+
+
+class _Scores:
+    """z-Werte aller Reihen einer Art für einen Datenstand (inkl. der Werte, aus denen sie stammen)."""
+
+    def __init__(self, matrix, z):
+        self.matrix = matrix
+        self.z = z
+
+    def extends(self, matrix):
+        """Anzahl der bereits berechneten Monate, wenn ``matrix`` nur neue Monate anhängt, sonst 0."""
+        old = self.matrix
+        n_old = len(old.periods)
+        if (not old.names.equals(matrix.names) or len(matrix.periods) < n_old
+                or not n_old or matrix.periods[0] != old.periods[0]
+                or set(old.values) != set(matrix.values)):
+            return 0
+        for metric, values in old.values.items():
+            if not np.array_equal(values, matrix.values[metric][:, :n_old]):
+                return 0
+        return n_old
+
+
+_lock = threading.Lock()
+
+# Letztes Ergebnis je Art über Datenversionen hinweg (Grundlage der inkrementellen Aktualisierung)
+_latest = {}
+
+
+@datasets.per_version
+def _scores(snapshot):
+    return {}
+
+
+def _compute(kind, matrix):
+    previous = _latest.get(kind)
+    done = previous.extends(matrix) if previous is not None else 0
+    z = {}
+    for metric in METRICS:
+        new = score(matrix.values[metric], first=done)
+        z[metric] = np.concatenate([previous.z[metric], new], axis=1) if done else new
+    return _Scores(matrix, z)
+
+
+def scores(kind, snapshot=None):
+    """Die z-Werte der Reihen ``kind`` als Dict ``kennzahl -> (Reihe × Monat)`` samt Matrix.
+
+    ``None``, wenn der Datensatz der Art nicht vorliegt (``handelsdaten`` ist optional).
+    """
+    snapshot = snapshot or datasets.current()
+    stored = _scores(snapshot)
+    if kind not in stored:
+        with _lock:
+            if kind not in stored:
+                try:
+                    matrix = series.matrix(kind, snapshot)
+                except (FileNotFoundError, ValueError):
+                    stored[kind] = None
+                else:
+                    stored[kind] = _compute(kind, matrix)
+                    _latest[kind] = stored[kind]
+    return stored[kind]
+
+
+def _alerts(kind, result):
+    matrix = result.matrix
+    frames = []
+    for metric in METRICS:
+        values, z = matrix.values[metric], result.z[metric]
+        previous = np.full_like(values, np.nan)
+        previous[:, SEASON:] = values[:, :-SEASON]
+        with np.errstate(invalid='ignore'):
+            flagged = (np.abs(z) >= Z_THRESHOLD) & (np.fmax(values, previous) >= MIN_VALUE)
+        rows, columns = np.nonzero(flagged)
+        if kind == 'land_ware':
+            land = matrix.names.get_level_values(0)[rows]
+            ware = matrix.names.get_level_values(1)[rows]
+        elif kind == 'land':
+            land, ware = matrix.names[rows], None
+        else:
+            land, ware = None, matrix.names[rows]
+        periods = matrix.periods[columns]
+        frames.append(pd.DataFrame({
+            'Art': ART[kind],
+            'Land': land,
+            'Ware': ware,
+            'Jahr': periods.year.astype(np.int16),
+            'Monat': periods.month.astype(np.int8),
+            'Kennzahl': KENNZAHL[metric],
+            'Wert': values[rows, columns],
+            'Vorjahreswert': previous[rows, columns],
+            'z': z[rows, columns],
+        }, columns=COLUMNS))
+    return pd.concat(frames, ignore_index=True)
+
+
+@datasets.per_version
+def _alert_table(snapshot):
+    frames = [_alerts(kind, result) for kind in KINDS
+              if (result := scores(kind, snapshot)) is not None]
+    df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=COLUMNS)
+    # Stärkste Auffälligkeiten zuerst
+    return df.iloc[np.argsort(-df['z'].abs().to_numpy(), kind='stable')].reset_index(drop=True)
+
+
+def alerts(country=None, good=None, year=None, kind=None, snapshot=None):
+    """Hinweistabelle der auffälligen Monate, nach |z| absteigend sortiert.
+
+    Spalten siehe :data:`COLUMNS`; ``Land`` bzw. ``Ware`` sind bei Reihen
+    nur eines Landes bzw. einer Ware leer. Optional gefiltert nach Land,
+    Ware, Jahr und Art (``'land'``, ``'ware'``, ``'land_ware'``).
+    """
+    df = _alert_table(snapshot or datasets.current())
+    mask = np.ones(len(df), dtype=bool)
+    if country is not None:
+        mask &= (df['Land'] == country).to_numpy()
+    if good is not None:
+        mask &= (df['Ware'] == good).to_numpy()
+    if year is not None:
+        mask &= (df['Jahr'] == int(year)).to_numpy()
+    if kind is not None:
+        mask &= (df['Art'] == ART[kind]).to_numpy()
+    return df[mask].reset_index(drop=True)
+
+
+def series_scores(kind, name, metric):
+    """Werte und z-Werte einer Reihe als DataFrame (``Periode``, ``wert``, ``z``) oder ``None``."""
+    result = scores(kind)
+    if result is None or name not in result.matrix:
+        return None
+    row = result.matrix.row(name)
+    return pd.DataFrame({
+        'Periode': result.matrix.periods,
+        'wert': result.matrix.values[metric][row],
+        'z': result.z[metric][row],
+    })
@@ -0,0 +1,79 @@
+"""ASGI-Betrieb für den Flask-Server der App (Puffern langsamer Clients).
+
+Im normalen WSGI-Betrieb (``gunicorn`` mit sync-Workern, ``app.run_server``)
+belegt jede Anfrage einen Worker von der ersten bis zur letzten
+Byte-Übertragung, also auch während langsame Clients den Request-Body
+senden oder die Antwort abholen. :func:`wrap` stellt ``app.server`` über den
+WSGI-Adapter von ``a2wsgi`` als ASGI-Anwendung bereit und liest den
+Request-Body vorher vollständig in der Event-Loop ein. Ein Rechen-Thread
+wird damit erst belegt, wenn die Anfrage komplett da ist, und die Antwort
+schickt die Event-Loop aus einem Puffer.
+
+Die Callbacks selbst ändern sich dadurch nicht: Dash 2.11 ruft sie
+synchron auf, sie laufen samt ihren Lesezugriffen (Cache, Partitionen,
+Datendateien) weiter vollständig in einem Thread des Pools. Schneller wird
+also nur der Betrieb mit langsamen Clients, nicht die Berechnung.
+
+Start z.B. mit uvicorn (nur für diesen Betrieb nötig, daher in
+``requirements-asgi.txt`` statt ``requirements.txt``)::
+
+    pip install -r requirements-asgi.txt
+    uvicorn --factory multiple_pages_test_zweiteHauptkategorie:asgi_app --workers 2
+
+Die Anzahl der Rechen-Threads je Prozess lässt sich über ``ASGI_THREADS``
+festlegen (Standard 10 wie bei ``a2wsgi``).
+"""
+import os
+
+import plotly.io.json
+
+# Rechen-Threads je Prozess
+DEFAULT_THREADS = int(os.environ.get('ASGI_THREADS', 10))
+
+
+def _buffered(app):
+    """Liest den Request-Body vollständig ein, bevor ``app`` die Anfrage sieht."""
+
+    async def buffered_app(scope, receive, send):
+        if scope['type'] != 'http':
+            await app(scope, receive, send)
+            return
+
+        body = bytearray()
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return
+            body += message.get('body', b'')
+            if not message.get('more_body'):
+                break
+
+        # Der Body liegt jetzt vollständig vor (auch bei chunked Uploads)
+        headers = [
+            (name, value) for name, value in scope.get('headers', [])
+            if name.lower() not in (b'content-length', b'transfer-encoding')
+        ]
+        scope = dict(scope, headers=headers + [(b'content-length', str(len(body)).encode('latin-1'))])
+        messages = [{'type': 'http.request', 'body': bytes(body), 'more_body': False}]
+
+        async def replay():
+            # Danach nur noch auf das Ende der Verbindung warten
+            return messages.pop() if messages else await receive()
+
+        await app(scope, replay, send)
+
+    return buffered_app
+
+
+def wrap(wsgi_app, threads=DEFAULT_THREADS):
+    """Macht ``wsgi_app`` (z.B. ``app.server``) zu einer ASGI-Anwendung."""
+    from a2wsgi import WSGIMiddleware  # nur im ASGI-Betrieb installiert
+
+    # Plotly lädt orjson erst beim ersten Serialisieren; gleichzeitige erste
+    # Anfragen sehen sonst ein halb importiertes Modul
+    plotly.io.json.to_json_plotly({})
+
+    middleware = WSGIMiddleware(wsgi_app, workers=threads)
+    asgi_app = _buffered(middleware)
+    asgi_app.executor = middleware.executor
+    return asgi_app
@@ -0,0 +1,134 @@
+"""Gemeinsame Berechnung der Achsenbeschriftungen für alle Seiten.
+
+Bisher hatte fast jedes Seitenmodul eigene Varianten von
+``determine_step_size``, ``calculate_tick_step``, ``generate_ticks`` und
+``formatter`` mit leicht unterschiedlichen Schwellwerttabellen. Hier gibt es
+drei Achsentypen:
+
+* :func:`linear` – von 0 bis zum aufgerundeten Maximum (Beträge)
+* :func:`diverging` – vom abgerundeten Minimum bis zum aufgerundeten
+  Maximum bzw. mit ``symmetric=True`` von ``-M`` bis ``M`` (Differenzen,
+  Wachstum)
+* :func:`ranking` – Platzierungen, Platz 1 oben
+
+:func:`linear` und :func:`diverging` geben ``(tickvals, ticktext)`` zurück,
+:func:`ranking` ``(tickvals, range)``. Die Schrittweite wird
+per ``np.searchsorted`` aus der Tabelle bestimmt, die Beschriftungen werden
+je gerundetem Bereich nur einmal erzeugt und danach aus dem Cache geliefert.
+"""
+import functools
+
+import numpy as np
+
+# Schwellwerte (Maximum < Schwelle) -> Schrittweite; letzter Schritt gilt darüber
+STEP_TABLES = {
+    'betrag': (
+        [2e4, 5e4, 1e5, 2e5, 5e5, 1e6, 2e6, 5e6, 10e6, 50e6, 100e6, 250e6, 500e6, 1e9, 5e9, 10e9, 50e9, 100e9],
+        [5e3, 1e4, 2e4, 5e4, 1e5, 2e5, 5e5, 1e6, 5e6, 10e6, 25e6, 50e6, 100e6, 250e6, 500e6, 1e9, 2e9, 10e9, 25e9],
+    ),
+    'prozent': (
+        [10, 50, 100, 500, 1000, 5000, 10000, 50000],
+        [1, 5, 10, 50, 100, 500, 1000, 5000, 10000],
+    ),
+}
+
+# Beschriftungsstile: (ab Betrag, Teiler, Format); der erste passende Eintrag gilt
+LABEL_FORMATS = {
+    # 1.25 Mrd € / 350 Mio € / 12,500 €
+    'euro': [(1e9, 1e9, '{:.2f} Mrd €'), (1e6, 1e6, '{:.0f} Mio €'), (0, 1, '{:,.0f} €')],
+    # 1.2 Mrd / 350.0 Mio / 12.5 K
+    'kurz': [(1e9, 1e9, '{:.1f} Mrd'), (1e6, 1e6, '{:.1f} Mio'), (1e3, 1e3, '{:.1f} K'), (0, 1, '{:.0f}')],
+    # 1.2 Mrd / 350 Mio / 12 K
+    'kompakt': [(1e9, 1e9, '{:.1f} Mrd'), (1e6, 1e6, '{:.0f} Mio'), (1e3, 1e3, '{:.0f} K'), (0, 1, '{:.0f}')],
+    # 1.25 Mrd / 350.0 Mio / 12 Tsd (Differenzen)
+    'differenz': [(1e9, 1e9, '{:.2f} Mrd'), (1e6, 1e6, '{:.1f} Mio'), (1e3, 1e3, '{:.0f} Tsd'), (0, 1, '{:.0f}')],
+    # 2 Mrd / 350 Mio / 12 Tsd
+    'ganz': [(1e9, 1e9, '{:.0f} Mrd'), (1e6, 1e6, '{:.0f} Mio'), (1e3, 1e3, '{:.0f} Tsd'), (0, 1, '{:.0f}')],
+    # nur Zahlen (z.B. Prozentachsen)
+    'zahl': [(0, 1, '{:g}')],
+}
+
+MONATE_KURZ = ['Jan', 'Feb', 'Mär', 'Apr', 'Mai', 'Jun', 'Jul', 'Aug', 'Sep', 'Okt', 'Nov', 'Dez']
+
+
+def _finite(values):
+    """Endliche Werte als float-Array (NaN und ±inf, z.B. Wachstum ab 0, werden ignoriert)."""
+    values = np.asarray(values, dtype=np.float64).ravel()
+    return values[np.isfinite(values)]
+
+
+def step_size(max_value, steps='betrag'):
+    """Schrittweite für ein (absolutes) Maximum laut Tabelle ``steps``."""
+    thresholds, step_values = STEP_TABLES[steps]
+    index = np.searchsorted(thresholds, abs(max_value), side='right')
+    return step_values[index]
+
+
+def format_values(values, labels='euro'):
+    """Beschriftet Achsenwerte im Stil ``labels`` (siehe :data:`LABEL_FORMATS`)."""
+    values = np.asarray(values, dtype=np.float64)
+    formats = LABEL_FORMATS[labels]
+    bounds = np.array([bound for bound, _, _ in formats])
+    # Index des ersten Eintrags, dessen Schwelle erreicht ist (Tabelle absteigend)
+    choice = np.argmax(np.abs(values)[:, None] >= bounds[None, :], axis=1)
+    divisors = np.array([divisor for _, divisor, _ in formats])[choice]
+    scaled = values / divisors
+    return tuple(formats[c][2].format(v) for c, v in zip(choice, scaled))
+
+
+@functools.lru_cache(maxsize=1024)
+def _ticks(lower, upper, step, labels):
+    tickvals = np.arange(lower, upper + step / 2, step)
+    ticktext = format_values(tickvals, labels) if labels else None
+    return tuple(tickvals.tolist()), ticktext
+
+
+def linear(values, steps='betrag', labels='euro', step=None):
+    """Achse von 0 bis zum aufgerundeten Maximum von ``values``.
+
+    ``values`` ist ein Wert oder ein Array; ``step`` erzwingt eine feste
+    Schrittweite statt der Tabelle.
+    """
+    finite = _finite(values)
+    max_value = max(finite.max(), 0) if finite.size else 0
+    step = step or step_size(max_value, steps)
+    upper = np.ceil(max_value / step) * step
+    return _ticks(0.0, float(upper), float(step), labels)
+
+
+def diverging(values, steps='betrag', labels='euro', step=None, symmetric=False):
+    """Achse für positive und negative Werte (Differenzen, Wachstum).
+
+    Ohne ``symmetric`` reicht die Achse vom abgerundeten Minimum bis zum
+    aufgerundeten Maximum, mit ``symmetric`` von ``-M`` bis ``M`` um die 0.
+    """
+    finite = _finite(values)
+    if not finite.size:
+        finite = np.zeros(1)
+    low, high = min(finite.min(), 0), max(finite.max(), 0)
+    abs_max = max(abs(low), abs(high))
+    step = step or step_size(abs_max, steps)
+    if symmetric:
+        upper = np.ceil(abs_max / step) * step
+        lower = -upper
+    else:
+        lower = np.floor(low / step) * step
+        upper = np.ceil(high / step) * step
+    return _ticks(float(lower), float(upper), float(step), labels)
+
+
+@functools.lru_cache(maxsize=1024)
+def _ranking_ticks(best, worst, ticks):
+    step = max(1, (worst - best) // ticks)
+    return tuple(range(best, worst + step, step)), (worst + 2, best - 2)
+
+
+def ranking(ranks, ticks=10):
+    """Achse für Platzierungen: etwa ``ticks`` Markierungen zwischen bestem und schlechtestem Platz.
+
+    Gibt ``(tickvals, range)`` zurück; der Bereich ist umgekehrt, damit
+    Platz 1 oben steht.
+    """
+    finite = _finite(ranks)
+    best, worst = (int(finite.min()), int(finite.max())) if finite.size else (1, 1)
+    return _ranking_ticks(best, worst, ticks)
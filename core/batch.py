@@ -0,0 +1,135 @@
+"""Stapelabfragen: viele Eingaben einer Seite in einer Anfrage.
+
+Berichtsjobs brauchen dieselbe Seite oft für viele Eingaben (z.B. jedes
+Land für 2024). Statt je Eingabe eine Callback-Anfrage zu schicken, nimmt
+``POST /api/batch`` den Seitennamen und eine Liste von Eingabe-Tupeln::
+
+    {"seite": "LA_trade_spec_country_and_year",
+     "eingaben": [["Frankreich", 2024], ["Italien", 2024]]}
+
+Die Antwort ist NDJSON (eine JSON-Zeile je Eingabe, in derselben
+Reihenfolge) und wird gestreamt, während gerechnet wird::
+
+    {"eingaben": ["Frankreich", 2024], "ausgaben": [<figure>, "<Infotext>"]}
+
+Seiten melden sich in ``register_callbacks`` mit :func:`register` an. Die
+Rechenfunktion bekommt alle Eingaben auf einmal, filtert die Daten in einem
+Durchgang und liefert die Ausgaben je Eingabe als Generator. Die ganze
+Abfrage rechnet auf demselben Daten-Snapshot. Schlägt eine Eingabe fehl,
+enthält ihre Zeile statt ``ausgaben`` einen ``fehler``; die übrigen
+Eingaben werden danach einzeln weitergerechnet.
+"""
+import pandas as pd
+import plotly.io.json
+from flask import Response, abort, jsonify, request
+
+from core import datasets
+
+# Maximale Anzahl Eingaben je Anfrage
+MAX_INPUTS = 5000
+
+_pages = {}
+
+
+def register(page, func, inputs):
+    """Meldet ``page`` für Stapelabfragen an.
+
+    ``func(eingaben)`` bekommt die Liste der Eingabe-Tupel und liefert je
+    Eingabe die Liste der Ausgaben (wie der Callback der Seite). ``inputs``
+    benennt die Elemente eines Tupels (nur für Fehlermeldungen).
+    """
+    _pages[page] = (func, tuple(inputs))
+
+
+def pages():
+    """Angemeldete Seiten und die Namen ihrer Eingaben."""
+    return {page: list(inputs) for page, (_, inputs) in sorted(_pages.items())}
+
+
+class _Groups(dict):
+    def __init__(self, groups, empty):
+        super().__init__(groups)
+        self.empty = empty
+
+    def __missing__(self, key):
+        return self.empty
+
+
+def select(df, columns, inputs):
+    """Alle Zeilen von ``df``, deren Werte in ``columns`` einer der ``inputs`` entsprechen."""
+    keys = pd.MultiIndex.from_tuples(list(inputs), names=columns)
+    return df[pd.MultiIndex.from_frame(df[columns]).isin(keys)]
+
+
+def split(df, columns, inputs):
+    """Teilt ``df`` in einem Durchgang nach ``columns`` für alle ``inputs`` auf.
+
+    Liefert ein Dict Eingabe-Tupel -> Teil-DataFrame (Zeilen in der
+    ursprünglichen Reihenfolge); Eingaben ohne Daten ergeben einen leeren
+    Frame.
+    """
+    rows = select(df, columns, inputs)
+    return _Groups(tuple(rows.groupby(columns, sort=False)), df.iloc[:0])
+
+
+def _bad_request(message):
+    response = jsonify({'fehler': message})
+    response.status_code = 400
+    return response
+
+
+def _line(values, outputs=None, exc=None):
+    if exc is not None:
+        return plotly.io.json.to_json_plotly({'eingaben': values, 'fehler': f'{type(exc).__name__}: {exc}'}) + '\n'
+    return plotly.io.json.to_json_plotly({'eingaben': values, 'ausgaben': list(outputs)}) + '\n'
+
+
+def _stream(func, inputs, snapshot):
+    results = None
+    shared = True
+    for values in inputs:
+        # Jeder Schritt kann in einem anderen Thread laufen (ASGI-Betrieb),
+        # daher den Snapshot je Schritt festhalten statt für den ganzen Generator
+        with datasets.pinned(snapshot):
+            line = None
+            if shared:
+                try:
+                    if results is None:
+                        results = iter(func(inputs))
+                    line = _line(values, next(results))
+                except Exception:
+                    # Ein Fehler beendet den gemeinsamen Durchgang; diese und alle
+                    # weiteren Eingaben werden einzeln gerechnet
+                    shared = False
+            if line is None:
+                try:
+                    line = _line(values, next(iter(func([values]))))
+                except Exception as exc:
+                    line = _line(values, exc=exc)
+        yield line
+
+
+def register_routes(server):
+    """Registriert ``GET/POST /api/batch`` auf ``server`` (``app.server``)."""
+
+    @server.route('/api/batch', methods=['GET'])
+    def api_batch_pages():
+        return jsonify({'seiten': pages()})
+
+    @server.route('/api/batch', methods=['POST'])
+    def api_batch():
+        payload = request.get_json(silent=True) or {}
+        if payload.get('seite') not in _pages:
+            abort(404)
+        func, names = _pages[payload['seite']]
+
+        inputs = payload.get('eingaben')
+        if not isinstance(inputs, list) or not inputs:
+            return _bad_request('"eingaben" muss eine nicht-leere Liste sein')
+        if len(inputs) > MAX_INPUTS:
+            return _bad_request(f'Höchstens {MAX_INPUTS} Eingaben je Anfrage')
+        if any(not isinstance(values, list) or len(values) != len(names) for values in inputs):
+            return _bad_request(f'Jede Eingabe muss eine Liste [{", ".join(names)}] sein')
+
+        inputs = [tuple(values) for values in inputs]
+        return Response(_stream(func, inputs, datasets.current()), mimetype='application/x-ndjson')
@@ -0,0 +1,95 @@
+"""Gemeinsamer Wrapper für die Callbacks der Seitenmodule.
+
+:func:`cached` hält während eines Callbacks den aktuellen Daten-Snapshot
+fest (siehe :func:`core.datasets.pinned`) und cacht die erzeugten Figuren
+je Datenversion. Wird ein neuer Snapshot veröffentlicht, werden alle
+gecachten Ergebnisse der alten Version verworfen.
+
+Gleichzeitige identische Aufrufe (gleicher Callback, gleiche Eingaben,
+gleiche Datenversion) werden zusammengefasst: Nur der erste Aufruf rechnet,
+alle weiteren warten auf sein Ergebnis (bzw. seine Exception). So rechnet
+z.B. nach einem Neuladen der Daten nicht jeder gleichzeitige Besucher der
+Standardansicht dieselbe Figur erneut.
+
+Verwendung unterhalb von ``@app.callback``::
+
+    @app.callback(Output(...), Input(...))
+    @callbacks.cached()
+    def update_graph(selected_country):
+        ...
+"""
+import functools
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from core import datasets
+
+# Maximale Anzahl gecachter Ergebnisse je Callback
+DEFAULT_MAXSIZE = 128
+
+
+def _freeze(value):
+    """Macht Callback-Argumente (Listen, Dicts aus dem Browser) hashbar."""
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    return value
+
+
+def cached(maxsize=DEFAULT_MAXSIZE):
+    """Dekorator: Snapshot festhalten und Ergebnisse je Datenversion cachen."""
+    def decorator(func):
+        results = OrderedDict()
+        inflight = {}  # key -> Future des gerade rechnenden Aufrufs
+        lock = threading.Lock()
+        state = {'version': None}
+
+        @functools.wraps(func)
+        def wrapper(*args):
+            with datasets.pinned() as snapshot:
+                try:
+                    key = (snapshot.version, _freeze(args))
+                    hash(key)
+                except TypeError:
+                    return func(*args)
+
+                with lock:
+                    if state['version'] != snapshot.version:
+                        # Neue Datenversion: alte Figuren verwerfen
+                        if state['version'] is None or snapshot.version > state['version']:
+                            results.clear()
+                            state['version'] = snapshot.version
+                    if key in results:
+                        results.move_to_end(key)
+                        return results[key]
+                    # Läuft derselbe Aufruf bereits, auf dessen Ergebnis warten
+                    pending = inflight.get(key)
+                    if pending is None:
+                        future = inflight[key] = Future()
+
+                if pending is not None:
+                    return pending.result()
+
+                try:
+                    result = func(*args)
+                except BaseException as exc:
+                    with lock:
+                        inflight.pop(key, None)
+                    future.set_exception(exc)
+                    raise
+
+                with lock:
+                    # Ergebnisse eines veralteten Snapshots nicht mehr aufnehmen
+                    if snapshot.version == state['version']:
+                        results[key] = result
+                        while len(results) > maxsize:
+                            results.popitem(last=False)
+                    inflight.pop(key, None)
+                future.set_result(result)
+                return result
+
+        wrapper.cache_clear = results.clear
+        return wrapper
+    return decorator
@@ -0,0 +1,93 @@
+"""Marktkonzentration (Herfindahl-Hirschman-Index) je Ware und Jahr.
+
+Für jede Ware in ``top10_goods_spec_country_and_year`` und jedes Jahr wird
+gemessen, wie stark sich Deutschlands Importe auf wenige Herkunftsländer
+bzw. die Exporte auf wenige Abnehmerländer verteilen::
+
+    HHI = Σ (Anteil des Landes in %)²      (0 bis 10 000)
+
+Üblich ist die Einstufung unter 1500 als gering, bis 2500 als mäßig und
+darüber als hoch konzentriert (:data:`LEVELS`). Dazu kommen das jeweils
+größte Land mit seinem Anteil und die Zahl der Länder.
+
+Alle (Ware, Jahr)-Gruppen werden in einem Durchgang über Gruppen-Codes
+(``np.bincount``) und eine gemeinsame Sortierung berechnet und je
+Datenversion als abgeleitete Tabelle gespeichert (:func:`table`).
+"""
+import numpy as np
+
+from core import datasets
+
+FLOWS = {'import': 'Einfuhr: Wert', 'export': 'Ausfuhr: Wert'}
+
+# Obergrenzen der Einstufung (HHI)
+LEVELS = [(1500, 'gering'), (2500, 'mäßig'), (np.inf, 'hoch')]
+
+
+def level(hhi):
+    """Einstufung (``'gering'``, ``'mäßig'``, ``'hoch'``) für ein Array von HHI-Werten."""
+    bounds = [bound for bound, _ in LEVELS]
+    labels = np.array([label for _, label in LEVELS], dtype=object)
+    return labels[np.searchsorted(bounds, np.asarray(hhi), side='left')]
+
+
+def compute(df):
+    """Konzentrationskennzahlen je ``Code``/``Label``/``Jahr`` für die Länderdaten ``df``.
+
+    Spalten je Richtung (``import``, ``export``): ``*_wert``, ``*_hhi``,
+    ``*_laender`` (Länder mit Handel), ``*_top_land`` und ``*_top_anteil``
+    (Anteil in %) sowie ``*_stufe``.
+    """
+    df = df[df['Code'].notna() & df['Land'].notna()]
+    grouped = df.groupby(['Code', 'Label', 'Jahr'], sort=True, observed=True)
+    groups = grouped.ngroup().to_numpy()
+    keys = grouped.size().index.to_frame(index=False).astype({'Jahr': df['Jahr'].dtype})
+    n_groups = len(keys)
+    countries = df['Land'].to_numpy()
+
+    result = keys.copy()
+    for flow, column in FLOWS.items():
+        values = np.clip(df[column].to_numpy(dtype=np.float64), 0, None)
+        totals = np.bincount(groups, weights=values, minlength=n_groups)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            shares = np.where(totals[groups] > 0, values / totals[groups] * 100, 0.0)
+
+        # Größtes Land je Gruppe: nach Gruppe und absteigendem Wert sortieren, erste Zeile je Gruppe
+        order = np.lexsort((-values, groups))
+        first = order[np.r_[True, groups[order][1:] != groups[order][:-1]]]
+
+        hhi = np.bincount(groups, weights=shares ** 2, minlength=n_groups)
+        top_land = np.full(n_groups, None, dtype=object)
+        top_share = np.zeros(n_groups)
+        top_land[groups[first]] = countries[first]
+        top_share[groups[first]] = shares[first]
+        has_trade = totals > 0
+
+        result[f'{flow}_wert'] = totals
+        result[f'{flow}_hhi'] = np.where(has_trade, hhi, np.nan).astype(np.float32)
+        result[f'{flow}_laender'] = np.bincount(groups, weights=values > 0, minlength=n_groups).astype(np.int16)
+        result[f'{flow}_top_land'] = np.where(has_trade, top_land, None)
+        result[f'{flow}_top_anteil'] = np.where(has_trade, top_share, np.nan).astype(np.float32)
+        result[f'{flow}_stufe'] = np.where(has_trade, level(np.nan_to_num(hhi)), None)
+    return result
+
+
+@datasets.per_version
+def table(snapshot):
+    """Die abgeleitete Tabelle aus :func:`compute` für alle Waren und Jahre."""
+    with datasets.pinned(snapshot):
+        return compute(datasets.get('top10_goods_spec_country_and_year'))
+
+
+def ranking(year, flow='import', n=None):
+    """Waren eines Jahres nach HHI der Richtung ``flow`` absteigend (höchstes Abhängigkeitsrisiko zuerst)."""
+    df = table()
+    df = df[df['Jahr'] == int(year)]
+    df = df.sort_values([f'{flow}_hhi', f'{flow}_wert'], ascending=[False, False], na_position='last', ignore_index=True)
+    return df if n is None else df.head(n)
+
+
+def history(good):
+    """Alle Jahre einer Ware (``Label``), nach Jahr sortiert."""
+    df = table()
+    return df[df['Label'] == good].sort_values('Jahr', ignore_index=True)
@@ -0,0 +1,81 @@
+"""Korrelationen zwischen den Monatsreihen aller Länder bzw. Waren.
+
+Für eine Art von Reihen (siehe :mod:`core.series`), eine Kennzahl und eine
+Umformung wird die vollständige Korrelationsmatrix einmal je Datenversion
+berechnet: Zeilen zentrieren, auf Länge 1 bringen, ``Z @ Z.T``. Abfragen
+für eine Auswahl von Reihen schneiden nur die passenden Zeilen und Spalten
+aus der gespeicherten Matrix::
+
+    correlation.subset('land', ['Frankreich', 'Italien', 'China'], 'export')
+
+Umformungen (:data:`TRANSFORMS`):
+
+* ``'werte'``: die Monatswerte selbst (gemeinsame Trends gehen mit ein),
+* ``'vorjahr'``: Veränderung zum Vorjahresmonat (ohne Trend und Saison).
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+from core import datasets, series
+
+SEASON = 12
+
+TRANSFORMS = {'werte': 'Monatswerte', 'vorjahr': 'Veränderung zum Vorjahresmonat'}
+
+
+def _transform(values, transform):
+    if transform == 'vorjahr':
+        return values[:, SEASON:] - values[:, :-SEASON]
+    return values
+
+
+def correlate(values):
+    """Pearson-Korrelation aller Zeilenpaare von ``values`` (Reihe × Monat).
+
+    Konstante Reihen haben keine Korrelation (``NaN``).
+    """
+    values = np.asarray(values, dtype=np.float64)
+    centered = values - values.mean(axis=1, keepdims=True)
+    norms = np.linalg.norm(centered, axis=1, keepdims=True)
+    valid = norms[:, 0] > 0
+    unit = np.divide(centered, norms, out=np.zeros_like(centered), where=norms > 0)
+    matrix = np.clip(unit @ unit.T, -1, 1)
+    matrix[~valid, :] = np.nan
+    matrix[:, ~valid] = np.nan
+    return matrix
+
+
+_lock = threading.Lock()
+
+
+@datasets.per_version
+def _matrices(snapshot):
+    return {}
+
+
+def matrix(kind, metric, transform='werte', snapshot=None):
+    """Die Reihennamen und die gespeicherte Korrelationsmatrix ``(names, matrix)``."""
+    snapshot = snapshot or datasets.current()
+    stored = _matrices(snapshot)
+    key = (kind, metric, transform)
+    if key not in stored:
+        with _lock:
+            if key not in stored:
+                values = series.matrix(kind, snapshot)
+                stored[key] = (values.names, correlate(_transform(values.values[metric], transform)))
+    return stored[key]
+
+
+def subset(kind, names, metric, transform='werte'):
+    """Korrelationen der Reihen ``names`` untereinander als DataFrame (Zeilen und Spalten = Namen).
+
+    Unbekannte Namen werden ausgelassen, die Reihenfolge bleibt erhalten.
+    """
+    all_names, correlations = matrix(kind, metric, transform)
+    positions = all_names.get_indexer(list(names))
+    known = positions >= 0
+    selected = all_names[positions[known]]
+    rows = positions[known]
+    return pd.DataFrame(correlations[np.ix_(rows, rows)], index=selected, columns=selected)
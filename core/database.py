@@ -0,0 +1,198 @@
+"""SQLite-Datenbank als alternatives Speicher-Backend für alle Datensätze.
+
+Im Normalbetrieb hält jeder Worker-Prozess alle Datensätze als eigene
+DataFrames im Speicher. Mit ``SQLITE_BACKEND=1`` werden sie zusätzlich in
+eine gemeinsame SQLite-Datei unter ``data/.cache`` geschrieben (eine
+Tabelle je Datensatz). Abfragen lesen dann über ``mmap`` direkt aus dieser
+Datei: Alle Worker teilen sich den Seiten-Cache des Betriebssystems, statt
+jeweils private Kopien zu halten.
+
+Für die Filter der Seiten gibt es abdeckende Indizes auf ``(Land, Jahr)``,
+``(Label, Jahr)`` und ``(Land, Label, Jahr)``. Sie enthalten nach den
+Schlüsselspalten alle übrigen Spalten, sodass eine Abfrage nur den Index
+und nie die Tabelle selbst lesen muss.
+
+Die Datei wird aus dem aktuellen Snapshot gebaut (:func:`build`) und trägt
+dessen ``fingerprint``, also den Stand der Dateien, aus denen er geladen
+wurde. Passt er nach einem Neuladen nicht mehr, wird sie neu erzeugt
+(:func:`ensure`).
+Abfragen laufen über :func:`select` bzw. :func:`query`::
+
+    database.select('trade_spec_country_and_year', where={'Land': 'Frankreich', 'Jahr': 2024})
+"""
+import contextlib
+import os
+import sqlite3
+import threading
+import uuid
+
+import pandas as pd
+
+from core import datasets, schema
+
+try:
+    import fcntl
+except ImportError:  # Windows: kein Sperren zwischen Prozessen
+    fcntl = None
+
+ENABLED = os.environ.get('SQLITE_BACKEND', '0') == '1'
+DB_PATH = os.environ.get('SQLITE_PATH') or os.path.join(datasets.CACHE_DIR, f'handel.v{schema.SCHEMA_VERSION}.sqlite')
+
+# Schlüsselspalten der abdeckenden Indizes (nur für Tabellen, die alle Spalten haben)
+INDEXES = [('Land', 'Jahr'), ('Label', 'Jahr'), ('Land', 'Label', 'Jahr')]
+
+# Bereich, den SQLite je Verbindung per mmap einblendet
+MMAP_SIZE = 2 ** 31
+
+_local = threading.local()
+_build_lock = threading.Lock()
+
+
+def _quote(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+@contextlib.contextmanager
+def _exclusive(path):
+    """Verhindert, dass mehrere Worker gleichzeitig dieselbe Datei bauen."""
+    with _build_lock:
+        if fcntl is None:
+            yield
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + '.lock', 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _stored_signature(path):
+    if not os.path.exists(path):
+        return None
+    try:
+        conn = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+        try:
+            row = conn.execute("SELECT wert FROM meta WHERE schluessel = 'signatur'").fetchone()
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return None
+    return row[0] if row else None
+
+
+def build(snapshot=None, path=DB_PATH):
+    """Schreibt alle Datensätze des Snapshots in eine neue SQLite-Datei.
+
+    Die Datei wird unter einem temporären Namen gebaut und dann atomar
+    ersetzt; laufende Abfragen lesen bis zum Wiederöffnen die alte Datei.
+    """
+    snapshot = snapshot or datasets.current()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f'{path}.{uuid.uuid4().hex}.tmp'
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.execute('PRAGMA journal_mode=OFF')
+        conn.execute('PRAGMA synchronous=OFF')
+        conn.execute('CREATE TABLE meta (schluessel TEXT PRIMARY KEY, wert TEXT)')
+        for name in datasets.DATASETS:
+            try:
+                df = snapshot[name]
+            except Exception:
+                continue  # Fehlende Datensätze fehlen auch in der Datenbank
+            df.to_sql(name, conn, index=False, chunksize=50000)
+            for keys in INDEXES:
+                if set(keys) <= set(df.columns):
+                    # Schlüssel zuerst, danach alle übrigen Spalten (abdeckender Index)
+                    columns = list(keys) + [column for column in df.columns if column not in keys]
+                    conn.execute(
+                        f'CREATE INDEX {_quote(name + "_" + "_".join(keys))} '
+                        f'ON {_quote(name)} ({", ".join(map(_quote, columns))})'
+                    )
+        conn.execute('ANALYZE')
+        conn.execute("INSERT INTO meta VALUES ('signatur', ?)", (snapshot.fingerprint,))
+        conn.commit()
+    finally:
+        conn.close()
+    os.replace(tmp_path, path)
+    return path
+
+
+def ensure(snapshot=None, path=DB_PATH):
+    """Baut die Datenbank, wenn sie fehlt oder nicht zum Snapshot passt.
+
+    Ein veralteter Snapshot (die Dateien haben sich seit dem Laden
+    geändert) überschreibt eine vorhandene Datei nicht; der Worker lädt
+    ohnehin gleich neu, und ein anderer Worker hat sie womöglich schon aus
+    den neuen Dateien gebaut.
+    """
+    snapshot = snapshot or datasets.current()
+    if _stored_signature(path) == snapshot.fingerprint:
+        return path
+    with _exclusive(path):
+        # Ein anderer Worker hat die Datei vielleicht gerade gebaut
+        stored = _stored_signature(path)
+        if stored != snapshot.fingerprint and (stored is None or snapshot.matches_files()):
+            build(snapshot, path=path)
+    return path
+
+
+@datasets.per_version
+def _ensure_for_version(snapshot):
+    # Nach jedem Neuladen einmal prüfen, ob die Datei noch aktuell ist
+    return ensure(snapshot)
+
+
+def connection():
+    """Nur-Lese-Verbindung des aktuellen Threads (nach einem Neubau neu geöffnet)."""
+    path = _ensure_for_version()
+    inode = os.stat(path).st_ino
+    conn = getattr(_local, 'conn', None)
+    if conn is None or _local.inode != inode:
+        if conn is not None:
+            conn.close()
+        conn = sqlite3.connect(f'file:{path}?mode=ro', uri=True, check_same_thread=False)
+        conn.execute(f'PRAGMA mmap_size={MMAP_SIZE}')
+        _local.conn, _local.inode = conn, inode
+    return conn
+
+
+def _param(value):
+    # numpy-Zahlen (z.B. Standardwerte aus dem Layout) kann sqlite3 nicht binden
+    return value.item() if hasattr(value, 'item') else value
+
+
+def query(sql, params=()):
+    """Führt eine SQL-Abfrage aus und gibt das Ergebnis als DataFrame zurück."""
+    return pd.read_sql_query(sql, connection(), params=[_param(value) for value in params])
+
+
+def select(table, columns=None, where=None, order_by=None):
+    """Zeilen aus ``table`` als DataFrame.
+
+    ``where`` bildet Spalten auf einen Wert (``=``), eine Liste von
+    Werten (``IN``) oder einen ``range`` (``BETWEEN``) ab; ``order_by`` ist
+    eine Liste von Spalten. Ohne
+    ``order_by`` kommen die Zeilen in der Reihenfolge des Datensatzes.
+    """
+    if table not in datasets.DATASETS:
+        raise KeyError(table)
+    sql = f'SELECT {", ".join(map(_quote, columns)) if columns else "*"} FROM {_quote(table)}'
+    conditions, params = [], []
+    for column, value in (where or {}).items():
+        if isinstance(value, range) and value.step == 1:
+            conditions.append(f'{_quote(column)} BETWEEN ? AND ?')
+            params.extend([value.start, value.stop - 1])
+        elif isinstance(value, (list, tuple, set, range)):
+            values = list(value)
+            conditions.append(f'{_quote(column)} IN ({", ".join("?" * len(values))})' if values else '0')
+            params.extend(values)
+        else:
+            conditions.append(f'{_quote(column)} = ?')
+            params.append(value)
+    if conditions:
+        sql += ' WHERE ' + ' AND '.join(conditions)
+    # rowid entspricht der Zeilenreihenfolge im DataFrame
+    sql += ' ORDER BY ' + (', '.join(map(_quote, order_by)) if order_by else 'rowid')
+    return query(sql, params)
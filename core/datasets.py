@@ -0,0 +1,443 @@
+"""Zentrales Laden aller Datensätze aus dem Ordner ``data``.
+
+Statt dass jedes Modul in ``graphs`` seine CSV-Dateien beim Import selbst
+einliest, werden alle Datensätze beim Start einmal parallel geladen
+(:func:`load_all`) und die fertig transformierten DataFrames über
+:func:`get` an die Seitenmodule herausgegeben.
+
+Alle geladenen Frames bilden zusammen einen unveränderlichen
+:class:`Snapshot` mit Versionsnummer. Neue Daten (Neuladen geänderter
+Dateien, :mod:`core.ingest`) erzeugen einen neuen Snapshot, der atomar gegen
+den alten ausgetauscht wird; laufende Callbacks rechnen mit dem Snapshot
+weiter, der bei ihrem Start aktuell war (siehe :func:`pinned`).
+
+Die zurückgegebenen DataFrames werden von allen Seiten gemeinsam genutzt
+und dürfen deshalb nicht verändert werden.
+"""
+import contextlib
+import contextvars
+import functools
+import glob
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pandas as pd
+
+from core import schema
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+CACHE_DIR = os.path.join(DATA_DIR, ".cache")
+
+MONATSNAMEN = {
+    1: "Jan", 2: "Feb", 3: "Mär", 4: "Apr", 5: "Mai", 6: "Jun",
+    7: "Jul", 8: "Aug", 9: "Sep", 10: "Okt", 11: "Nov", 12: "Dez"
+}
+
+
+# ---------------- Transformationen ------------------
+# Müssen Funktionen auf Modulebene sein, damit sie auch in einem
+# Prozess-Pool (pickle) ausgeführt werden können.
+
+def add_handelsvolumen(df):
+    df['Handelsvolumen'] = df['Ausfuhr: Wert'] + df['Einfuhr: Wert']
+    return df
+
+
+def add_monat_name(df):
+    df['Monat_Name'] = df['Monat'].map(MONATSNAMEN)
+    return df
+
+
+# ---------------- Registry ------------------
+# name -> Dateien (relativ zu DATA_DIR) und Transformationen pro Datei.
+# Die Geldspalten werden vorher gemäß core.schema in ganze Euro umgerechnet.
+# Statt fester Dateien kann ein Muster ("pattern") angegeben werden. Bei
+# "optional" werden fehlende Dateien übersprungen, solange mindestens eine
+# Datei vorhanden ist.
+DATASETS = {
+    'gesamt_deutschland': {'files': ['1gesamt_deutschland.csv']},
+    'gesamt_deutschland_monthly': {'files': ['gesamt_deutschland_monthly.csv']},
+    'df_grouped': {'files': ['df_grouped.csv']},
+    'df_reduced': {'files': ['df_reduced.csv']},
+    'aggregated_df': {'files': ['aggregated_df.csv']},
+    'top10_goods_spec_country': {'files': ['top10_goods_spec_country.csv']},
+    'trade_spec_country_and_year': {'files': ['trade_spec_country_and_year.csv']},
+    'top10_goods_spec_country_and_year': {
+        'files': ['top10_goods_spec_country_and_year.csv'],
+        'transforms': [add_handelsvolumen],
+    },
+    'handelsdaten': {
+        'pattern': 'Handelsdaten_*.csv',
+        'transforms': [add_monat_name],
+        'optional': True,
+    },
+}
+
+# Speicherbudget aller Datensätze je Worker in MB (0 = ohne Grenze)
+MEMORY_BUDGET_MB = float(os.environ.get('MEMORY_BUDGET_MB', 0))
+
+# Wird von /admin/reload berührt, damit alle Worker neu laden
+RELOAD_MARKER = os.path.join(DATA_DIR, ".reload")
+
+
+class Snapshot:
+    """Unveränderlicher Stand aller geladenen Datensätze.
+
+    ``frames`` enthält die DataFrames, ``errors`` die beim Laden
+    aufgetretenen Fehler je Datensatz. Die ``version`` steigt mit jedem
+    veröffentlichten Snapshot und dient Caches im Prozess als Schlüssel.
+
+    ``sources`` hält je Datensatz den Stand der Dateien fest, aus denen er
+    geladen wurde (Name, Änderungszeitpunkt, Größe). Daraus ergibt sich der
+    ``fingerprint``: Er ist über Neustarts und Worker hinweg gleich, solange
+    sich die Dateien nicht ändern, und dient gemeinsamen Caches außerhalb des
+    Prozesses als Schlüssel.
+    """
+
+    def __init__(self, version, frames, errors, sources=None):
+        self.version = version
+        self._frames = frames
+        self._errors = errors
+        self.sources = sources or {}
+        self.fingerprint = _fingerprint(self.sources)
+
+    def matches_files(self):
+        """``True``, solange die Dateien aller Datensätze noch so auf der Platte liegen wie beim Laden."""
+        return all(stamps == _stamp(name) for name, stamps in self.sources.items())
+
+    def __contains__(self, name):
+        return name in self._frames or name in self._errors
+
+    def __getitem__(self, name):
+        if name in self._errors:
+            raise self._errors[name]
+        return self._frames[name]
+
+
+def _fingerprint(sources):
+    payload = json.dumps([schema.SCHEMA_VERSION, sorted(sources.items())])
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+_current = Snapshot(0, {}, {})
+_pinned = contextvars.ContextVar('datasets_snapshot', default=None)
+_lock = threading.Lock()
+
+# Zuletzt verarbeiteter Stand der Marker-Datei in diesem Worker
+_marker_seen = None
+_marker_lock = threading.Lock()
+
+
+def _files(name):
+    spec = DATASETS[name]
+    if 'pattern' in spec:
+        return sorted(os.path.basename(path) for path in glob.glob(os.path.join(DATA_DIR, spec['pattern'])))
+    return spec['files']
+
+
+def _stamp(name):
+    """Name, Änderungszeitpunkt (ns) und Größe aller vorhandenen Dateien eines Datensatzes."""
+    stamps = []
+    for filename in _files(name):
+        try:
+            stat = os.stat(os.path.join(DATA_DIR, filename))
+        except FileNotFoundError:
+            continue
+        stamps.append((filename, stat.st_mtime_ns, stat.st_size))
+    return tuple(stamps)
+
+
+def _cache_path(filename):
+    return os.path.join(CACHE_DIR, f"{os.path.splitext(filename)[0]}.v{schema.SCHEMA_VERSION}.pkl")
+
+
+def _load_file(name, filename):
+    """Liest eine Datei (binärer Cache oder CSV) und wendet die Transformationen an.
+
+    Läuft im Worker des Pools. Der Cache enthält die bereits normalisierten
+    Daten (siehe core.schema) und gilt nur, solange er neuer als die
+    CSV-Datei ist.
+    """
+    path = os.path.join(DATA_DIR, filename)
+    if not os.path.exists(path):
+        return None
+
+    cache = _cache_path(filename)
+    if os.path.exists(cache) and os.path.getmtime(cache) >= os.path.getmtime(path):
+        df = pd.read_pickle(cache)
+    else:
+        df = schema.normalize(name, pd.read_csv(path, encoding='utf-8'))
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            df.to_pickle(cache)
+        except OSError:
+            # Der Cache ist nur eine Beschleunigung, z.B. bei schreibgeschütztem Ordner
+            pass
+
+    for transform in DATASETS[name].get('transforms', []):
+        df = transform(df)
+    return df
+
+
+def _combine(name, parts):
+    spec = DATASETS[name]
+    parts = [part for part in parts if part is not None]
+    if not parts:
+        if spec.get('optional'):
+            raise ValueError(f"Keine gültigen Dateien für Datensatz '{name}' gefunden.")
+        raise FileNotFoundError(os.path.join(DATA_DIR, spec.get('pattern') or spec['files'][0]))
+    df = parts[0] if len(parts) == 1 else pd.concat(parts, ignore_index=True)
+    if df.empty:
+        raise ValueError(f"CSV-Datei für Datensatz '{name}' ist leer.")
+    return df
+
+
+def _read(names, max_workers=None, processes=False):
+    """Liest die angegebenen Datensätze parallel ein.
+
+    Gibt ``(frames, errors, sources)`` zurück; Fehler werden pro Datensatz
+    gesammelt. Der Stand der Dateien wird vor dem Lesen erfasst, damit eine
+    währenddessen geänderte Datei als geändert erkannt wird.
+    """
+    sources = {name: _stamp(name) for name in names}
+    jobs = [(name, filename) for name in names for filename in _files(name)]
+    if processes:
+        pool = ProcessPoolExecutor(max_workers=max_workers or os.cpu_count())
+    else:
+        pool = ThreadPoolExecutor(max_workers=max_workers or max(1, len(jobs)))
+
+    with pool:
+        futures = [
+            (name, pool.submit(_load_file, name, filename))
+            for name, filename in jobs
+        ]
+
+        results = {name: [] for name in names}
+        errors = {}
+        for name, future in futures:
+            try:
+                results[name].append(future.result())
+            except Exception as exc:
+                errors[name] = exc
+
+    frames = {}
+    for name in names:
+        if name in errors:
+            continue
+        try:
+            frames[name] = _combine(name, results[name])
+        except Exception as exc:
+            errors[name] = exc
+    return frames, errors, sources
+
+
+def _swap(frames, errors, sources):
+    """Veröffentlicht einen neuen Snapshot mit den geänderten Datensätzen."""
+    global _current
+    with _lock:
+        new_frames = {name: df for name, df in _current._frames.items() if name not in errors}
+        new_frames.update(frames)
+        new_errors = {name: exc for name, exc in _current._errors.items() if name not in frames}
+        new_errors.update(errors)
+        new_sources = dict(_current.sources)
+        new_sources.update(sources)
+        _current = Snapshot(_current.version + 1, new_frames, new_errors, new_sources)
+    return _current
+
+
+def load_all(names=None, max_workers=None, processes=False):
+    """Lädt die angegebenen (bzw. alle) Datensätze parallel.
+
+    Jede Datei ist ein eigener Job im Pool, sodass die Startzeit durch die
+    größte Datei und nicht durch die Summe aller Dateien bestimmt wird.
+    Standardmäßig wird ein Thread-Pool verwendet (der CSV-Parser von pandas
+    gibt das GIL frei); mit ``processes=True`` ein Prozess-Pool.
+
+    Fehler (z.B. fehlende Dateien) werden pro Datensatz gespeichert und erst
+    beim Zugriff über :func:`get` ausgelöst. Das Ergebnis wird als neuer
+    Snapshot veröffentlicht und zurückgegeben.
+    """
+    names = list(DATASETS) if names is None else list(names)
+    frames, errors, sources = _read(names, max_workers=max_workers, processes=processes)
+    return _swap(frames, errors, sources)
+
+
+def current():
+    """Gibt den Snapshot zurück, mit dem der laufende Aufruf rechnet.
+
+    Innerhalb von :func:`pinned` ist das der beim Start festgehaltene
+    Snapshot, sonst der zuletzt veröffentlichte.
+    """
+    return _pinned.get() or _current
+
+
+def version():
+    return current().version
+
+
+@contextlib.contextmanager
+def pinned(snapshot=None):
+    """Hält einen Snapshot für die Dauer eines Callbacks fest.
+
+    Alle Aufrufe von :func:`get` innerhalb des Blocks sehen dieselben Daten,
+    auch wenn währenddessen ein neuer Snapshot veröffentlicht wird.
+    """
+    snapshot = snapshot or current()
+    token = _pinned.set(snapshot)
+    try:
+        yield snapshot
+    finally:
+        _pinned.reset(token)
+
+
+def get(name):
+    """Gibt den gemeinsam genutzten DataFrame eines Datensatzes zurück.
+
+    Wurde der Datensatz noch nicht geladen (z.B. wenn ein Modul ohne
+    :func:`load_all` importiert wird), wird er jetzt nachgeladen.
+    """
+    snapshot = current()
+    if name not in snapshot:
+        snapshot = load_all([name])
+    return snapshot[name]
+
+
+def publish(frames):
+    """Ersetzt mehrere Datensätze auf einmal durch einen neuen Snapshot (z.B. nach core.ingest).
+
+    ``frames`` bildet Datensatznamen auf neue DataFrames ab; die bisherigen
+    Frames werden nicht verändert. Da diese Frames keiner Datei entsprechen,
+    bekommen sie eine einmalige Quelle und der Snapshot damit einen eigenen
+    ``fingerprint``.
+    """
+    token = uuid.uuid4().hex
+    return _swap(frames, {}, {name: (('publish', token),) for name in frames})
+
+
+def per_version(func):
+    """Cacht aus den Daten abgeleitete Werte, solange sich die Datenversion nicht ändert.
+
+    ``func`` bekommt den Snapshot übergeben. Die Ergebnisse der letzten zwei
+    Versionen werden behalten, damit noch laufende Callbacks auf dem alten
+    Snapshot nicht ständig neu rechnen.
+    """
+    results = {}
+    lock = threading.Lock()
+
+    @functools.wraps(func)
+    def wrapper(snapshot=None):
+        snapshot = snapshot or current()
+        with lock:
+            if snapshot.version in results:
+                return results[snapshot.version]
+        result = func(snapshot)
+        with lock:
+            results[snapshot.version] = result
+            for old in sorted(results)[:-2]:
+                del results[old]
+        return result
+    return wrapper
+
+
+# ---------------- Speicherbedarf ------------------
+
+def memory_report(snapshot=None):
+    """Speicherbedarf je Datensatz in Bytes, vor und nach dem Verkleinern der Datentypen.
+
+    Gibt ein Dict Datensatz -> ``{'zeilen', 'vorher', 'nachher'}`` zurück
+    (siehe :func:`core.schema.memory_usage`); nicht geladene Datensätze
+    fehlen.
+    """
+    snapshot = snapshot or current()
+    report = {}
+    for name in DATASETS:
+        if name not in snapshot._frames:
+            continue
+        df = snapshot._frames[name]
+        before, after = schema.memory_usage(df)
+        report[name] = {'zeilen': len(df), 'vorher': before, 'nachher': after}
+    return report
+
+
+def check_memory_budget(snapshot=None, budget_mb=None):
+    """Prüft den Speicherbedarf aller Datensätze gegen :data:`MEMORY_BUDGET_MB`.
+
+    Löst ``MemoryError`` aus, wenn das Budget überschritten ist, und gibt
+    sonst den Bedarf in Bytes zurück.
+    """
+    budget_mb = MEMORY_BUDGET_MB if budget_mb is None else budget_mb
+    total = sum(entry['nachher'] for entry in memory_report(snapshot).values())
+    if budget_mb and total > budget_mb * 2 ** 20:
+        raise MemoryError(f"Datensätze belegen {total / 2 ** 20:.1f} MB, Budget je Worker ist {budget_mb:.0f} MB.")
+    return total
+
+
+# ---------------- Neuladen im laufenden Betrieb ------------------
+
+def _marker_mtime():
+    return os.path.getmtime(RELOAD_MARKER) if os.path.exists(RELOAD_MARKER) else None
+
+
+def _signature():
+    """Stand aller Dateien je Datensatz (siehe :func:`_stamp`) und der Marker-Datei."""
+    return {name: _stamp(name) for name in DATASETS}, _marker_mtime()
+
+
+def reload(names=None):
+    """Lädt Datensätze neu und tauscht sie im laufenden Betrieb aus."""
+    return load_all(names)
+
+
+def request_reload():
+    """Löst ein Neuladen in allen Workern aus (über die Marker-Datei) und lädt hier sofort neu.
+
+    Der neue Stand der Marker-Datei gilt in diesem Worker als bereits
+    verarbeitet, damit :func:`watch` nicht ein zweites Mal neu lädt.
+    """
+    global _marker_seen
+    with _marker_lock:
+        with open(RELOAD_MARKER, 'a'):
+            os.utime(RELOAD_MARKER, None)
+        _marker_seen = _marker_mtime()
+    return reload()
+
+
+def watch(interval=10):
+    """Startet einen Hintergrund-Thread, der ``data`` auf Änderungen prüft.
+
+    Geänderte Datensätze werden neu geladen, eine geänderte Marker-Datei
+    (siehe :func:`request_reload`) lädt alle Datensätze neu. Jeder Worker
+    überwacht die Dateien selbst, ein Neustart ist nicht nötig.
+    """
+    def run():
+        global _marker_seen
+        signature, _ = _signature()
+        with _marker_lock:
+            _marker_seen = _marker_mtime()
+        while True:
+            time.sleep(interval)
+            try:
+                new_signature, _ = _signature()
+                # Unter der Sperre lesen, damit request_reload dazwischen nicht doppelt zählt
+                with _marker_lock:
+                    new_marker = _marker_mtime()
+                    marker_changed = new_marker != _marker_seen
+                    _marker_seen = new_marker
+                if marker_changed:
+                    reload()
+                else:
+                    changed = [name for name in DATASETS if new_signature[name] != signature[name]]
+                    if changed:
+                        reload(changed)
+                signature = new_signature
+            except Exception as exc:
+                print(f"Neuladen der Daten fehlgeschlagen: {exc}")
+
+    thread = threading.Thread(target=run, name='datasets-watch', daemon=True)
+    thread.start()
+    return thread
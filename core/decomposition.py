@@ -0,0 +1,188 @@
+"""Zerlegung aller Monatsreihen in Trend, Saison und Rest.
+
+Klassische additive Zerlegung (wie ``seasonal_decompose`` in statsmodels),
+aber für alle Reihen einer Matrix aus :mod:`core.series` in einem Durchgang
+mit NumPy statt einer Zerlegung je Reihe und Anfrage:
+
+* Trend: zentrierter gleitender 2×12-Durchschnitt; die je sechs Monate am
+  Anfang und Ende ohne vollständiges Fenster werden aus einer Geraden durch
+  die nächsten zwölf Trendwerte fortgeschrieben.
+* Saison: mittlere Abweichung vom Trend je Kalendermonat, auf Summe 0
+  zentriert.
+* Rest: was nach Abzug von Trend und Saison bleibt.
+
+Die Komponenten werden einmal je Datenversion berechnet und gespeichert;
+die Seiten lesen mit :func:`frame` nur noch die Zeile einer Reihe::
+
+    decomposition.frame('land', 'Frankreich', 'export', year=2024)
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+from core import axes, datasets, figures, series
+
+SEASON = 12
+
+COMPONENTS = ('trend', 'saison', 'rest')
+
+# Beschriftungen der Kennzahlen für die Auswahl auf den Seiten
+METRIC_OPTIONS = [
+    {'label': 'Export', 'value': 'export'},
+    {'label': 'Import', 'value': 'import'},
+    {'label': 'Handelsvolumen', 'value': 'handelsvolumen'},
+]
+
+
+def _extrapolate(trend, half):
+    # Ränder ohne vollständiges Fenster: Gerade durch die nächsten SEASON Trendwerte (alle Reihen auf einmal)
+    n_months = trend.shape[1]
+    if n_months < 2 * half + 2:
+        return trend
+    x = np.arange(SEASON, dtype=np.float64)
+    x_centered = x - x.mean()
+    denominator = (x_centered ** 2).sum()
+
+    for window, targets in (
+        (slice(half, half + SEASON), np.arange(0, half)),
+        (slice(n_months - half - SEASON, n_months - half), np.arange(n_months - half, n_months)),
+    ):
+        y = trend[:, window]
+        slope = (y - y.mean(axis=1, keepdims=True)) @ x_centered / denominator
+        intercept = y.mean(axis=1) - slope * x.mean()
+        positions = targets - window.start
+        trend[:, targets] = intercept[:, None] + slope[:, None] * positions
+    return trend
+
+
+def decompose(values, first_month=1):
+    """Zerlegt alle Zeilen von ``values`` (Reihe × Monat) auf einmal.
+
+    ``first_month`` ist der Kalendermonat (1–12) der ersten Spalte. Gibt ein
+    Dict ``{'trend', 'saison', 'rest'}`` mit Arrays der Form von ``values``
+    zurück. Reihen mit weniger als zwei Jahren haben nur einen Trend.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n_series, n_months = values.shape
+    half = SEASON // 2
+
+    if n_months < 2 * SEASON:
+        trend = np.repeat(values.mean(axis=1, keepdims=True), n_months, axis=1) if n_months else values.copy()
+        zeros = np.zeros_like(values)
+        return {'trend': trend, 'saison': zeros, 'rest': values - trend}
+
+    # 2×12-Durchschnitt über kumulierte Summen: volles Fenster aus 13 Monaten, Randmonate halb gewichtet
+    cumsum = np.concatenate([np.zeros((n_series, 1)), np.cumsum(values, axis=1)], axis=1)
+    window = cumsum[:, 2 * half + 1:] - cumsum[:, :-(2 * half + 1)]
+    inner = (window - 0.5 * values[:, :-2 * half] - 0.5 * values[:, 2 * half:]) / SEASON
+    trend = np.full_like(values, np.nan)
+    trend[:, half:n_months - half] = inner
+    trend = _extrapolate(trend, half)
+
+    # Mittelwert je Kalendermonat: auf volle Jahre auffüllen, als (Reihe, Jahr, Monat) umformen
+    offset = first_month - 1
+    n_padded = -(-(offset + n_months) // SEASON) * SEASON
+    detrended = np.full((n_series, n_padded), np.nan)
+    detrended[:, offset:offset + n_months] = values - trend
+    means = np.nanmean(detrended.reshape(n_series, -1, SEASON), axis=1)
+    means -= means.mean(axis=1, keepdims=True)
+    seasonal = np.tile(means, n_padded // SEASON)[:, offset:offset + n_months]
+
+    return {'trend': trend, 'saison': seasonal, 'rest': values - trend - seasonal}
+
+
+_lock = threading.Lock()
+
+
+@datasets.per_version
+def _components(snapshot):
+    return {}
+
+
+def components(kind, snapshot=None):
+    """Komponenten aller Reihen ``kind`` als Dict ``kennzahl -> {'trend', 'saison', 'rest'}``."""
+    snapshot = snapshot or datasets.current()
+    stored = _components(snapshot)
+    if kind not in stored:
+        with _lock:
+            if kind not in stored:
+                matrix = series.matrix(kind, snapshot)
+                first_month = matrix.periods[0].month if len(matrix.periods) else 1
+                stored[kind] = {
+                    metric: decompose(values, first_month)
+                    for metric, values in matrix.values.items()
+                }
+    return stored[kind]
+
+
+def frame(kind, name, metric, year=None):
+    """Monatswerte und Komponenten einer Reihe als DataFrame.
+
+    Spalten ``Jahr``, ``Monat``, ``wert``, ``trend``, ``saison`` und
+    ``rest``; mit ``year`` nur die Monate dieses Jahres. Leer, wenn es die
+    Reihe nicht gibt.
+    """
+    snapshot = datasets.current()
+    matrix = series.matrix(kind, snapshot)
+    if name not in matrix:
+        return pd.DataFrame(columns=['Jahr', 'Monat', 'wert', *COMPONENTS])
+    row = matrix.row(name)
+    parts = components(kind, snapshot)[metric]
+
+    df = pd.DataFrame({
+        'Jahr': matrix.periods.year,
+        'Monat': matrix.periods.month,
+        'wert': matrix.values[metric][row],
+        **{component: parts[component][row] for component in COMPONENTS},
+    })
+    if year is not None:
+        df = df[df['Jahr'] == int(year)].reset_index(drop=True)
+    return df
+
+
+# Figur-Gerüst: oben Monatswert und Trend, unten Saison- und Restkomponente
+@figures.template
+def decomposition_figure():
+    fig = make_subplots(rows=2, cols=1, shared_xaxes=True, vertical_spacing=0.08, row_heights=[0.6, 0.4])
+
+    for name, color, dash in [('Monatswert', '#7f7f7f', None), ('Trend', '#d62728', 'dash')]:
+        fig.add_trace(go.Scatter(
+            mode='lines+markers' if dash is None else 'lines',
+            name=name,
+            line=dict(width=2, color=color, dash=dash),
+            hovertemplate=f'<b>{name}</b><br>Monat: %{{x}}<br>Wert: %{{y:,.0f}} €<extra></extra>'
+        ), row=1, col=1)
+    for name, color in [('Saison', '#9467bd'), ('Rest', '#8c564b')]:
+        fig.add_trace(go.Bar(
+            name=name,
+            marker_color=color,
+            hovertemplate=f'<b>{name}</b><br>Monat: %{{x}}<br>Wert: %{{y:,.0f}} €<extra></extra>'
+        ), row=2, col=1)
+
+    fig.update_layout(
+        barmode='group',
+        legend=dict(title='Komponente', bgcolor='rgba(255,255,255,0.7)')
+    )
+    fig.update_xaxes(tickmode='array', tickvals=list(range(1, 13)), ticktext=axes.MONATE_KURZ)
+    fig.update_xaxes(title_text='Monat', row=2, col=1)
+    fig.update_yaxes(title_text='Wert in €', row=1, col=1)
+    fig.update_yaxes(title_text='Abweichung in €', row=2, col=1)
+    return fig
+
+
+def figure(df, title):
+    """Zerlegungs-Figur aus einem DataFrame von :func:`frame` (ein Jahr)."""
+    if df.empty:
+        return go.Figure()
+
+    tickvals, ticktext = axes.linear(max(df['wert'].max(), df['trend'].max()))
+    return decomposition_figure(
+        data=[{'x': df['Monat'], 'y': df[column]} for column in ['wert', 'trend', 'saison', 'rest']],
+        layout={
+            'title': {'text': title},
+            'yaxis': {'tickvals': tickvals, 'ticktext': ticktext},
+        }
+    )
@@ -0,0 +1,142 @@
+"""Datenexport: die Zahlen hinter den Figuren als CSV oder NDJSON.
+
+Jede Seite meldet in ``register_callbacks`` an, aus welchem Datensatz ihre
+Figuren stammen und welche Spalte von welcher Auswahl gefiltert wird::
+
+    export.register(app, 'LA_trade_spec_country_and_year', 'trade_spec_country_and_year', {
+        'Land': Input('la_trade_spec_country_dropdown_country', 'value'),
+        'Jahr': Input('la_trade_spec_country_dropdown_year', 'value'),
+    })
+
+und zeigt mit :func:`links` die Download-Links an, die ein Callback bei
+jeder Auswahl auf ``GET /api/export/<seite>.csv?Land=...&Jahr=...`` (bzw.
+``.ndjson``) setzt. Mehrfachauswahlen werden als wiederholte Parameter
+übergeben; fehlende Parameter filtern nicht. Vergleicht eine Seite das
+gewählte Jahr mit dem Vorjahr, nennt ``previous_year`` die Jahresspalte;
+der Export enthält dann auch die Zeilen des Vorjahres.
+
+Die Antwort wird in Blöcken von :data:`CHUNK_ROWS` Zeilen erzeugt: gefiltert
+wird über eine Zeilenmaske, aus der je Block nur die benötigten Zeilen
+gelesen werden. Auch große Ausschnitte (z.B. ``handelsdaten`` eines Jahres)
+werden so nie vollständig als eigener DataFrame aufgebaut.
+"""
+from urllib.parse import urlencode
+
+import numpy as np
+from dash import html
+from dash.dependencies import Output
+from flask import Response, abort, request
+
+from core import datasets
+
+FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson; charset=utf-8',
+}
+
+# Zeilen je gestreamtem Block
+CHUNK_ROWS = 5000
+
+_pages = {}
+
+
+def _ids(page):
+    return {fmt: f'{page}_export_{fmt}' for fmt in FORMATS}
+
+
+def links(page):
+    """Download-Links einer Seite (werden von :func:`register` aktualisiert)."""
+    ids = _ids(page)
+    return html.Div([
+        'Daten herunterladen: ',
+        html.A('CSV', id=ids['csv'], href=url(page, 'csv', {})),
+        ' | ',
+        html.A('NDJSON', id=ids['ndjson'], href=url(page, 'ndjson', {})),
+    ], style={'marginTop': '10px'})
+
+
+def url(page, fmt, filters):
+    """Export-URL für ``filters`` (Spalte -> Wert oder Liste von Werten)."""
+    query = {column: value for column, value in filters.items() if value not in (None, [])}
+    query = urlencode(query, doseq=True)
+    return f'/api/export/{page}.{fmt}' + (f'?{query}' if query else '')
+
+
+def register(app, page, dataset, filters, previous_year=None):
+    """Meldet den Export von ``page`` an und hält ihre Download-Links aktuell.
+
+    ``filters`` bildet die Spalten von ``dataset`` auf die Eingaben der
+    Seite ab (``Input``-Objekte); ohne Filter wird der ganze Datensatz
+    exportiert. Mit ``previous_year`` (Name der Jahresspalte) werden zu
+    jedem gewählten Jahr auch die Zeilen des Vorjahres exportiert.
+    """
+    _pages[page] = (dataset, tuple(filters), previous_year)
+    ids = _ids(page)
+    columns = list(filters)
+
+    if not filters:
+        # Links aus dem Layout zeigen bereits auf den ganzen Datensatz
+        return
+
+    @app.callback([Output(link_id, 'href') for link_id in ids.values()], list(filters.values()))
+    def update_export_links(*values):
+        selected = dict(zip(columns, values))
+        return [url(page, fmt, selected) for fmt in ids]
+
+
+def _parse(df, column, values):
+    # Parameter kommen als Text; für Zahlenspalten passend umwandeln
+    kind = df[column].dtype.kind
+    if kind in 'iu':
+        return [int(float(value)) for value in values]
+    if kind == 'f':
+        return [float(value) for value in values]
+    return values
+
+
+def _mask(df, filters):
+    mask = np.ones(len(df), dtype=bool)
+    for column, values in filters.items():
+        mask &= df[column].isin(values).to_numpy()
+    return mask
+
+
+def _chunks(df, rows, fmt):
+    for start in range(0, len(rows), CHUNK_ROWS):
+        chunk = df.take(rows[start:start + CHUNK_ROWS])
+        if fmt == 'csv':
+            yield chunk.to_csv(index=False, header=start == 0)
+        else:
+            # Abschließender Zeilenumbruch je nach pandas-Version vorhanden oder nicht
+            yield chunk.to_json(orient='records', lines=True, force_ascii=False).rstrip('\n') + '\n'
+    if fmt == 'csv' and len(rows) == 0:
+        yield df.iloc[:0].to_csv(index=False)
+
+
+def register_routes(server):
+    """Registriert ``GET /api/export/<seite>.<format>`` auf ``server`` (``app.server``)."""
+
+    @server.route('/api/export/<page>.<fmt>')
+    def api_export(page, fmt):
+        if page not in _pages or fmt not in FORMATS:
+            abort(404)
+        dataset, columns, previous_year = _pages[page]
+        df = datasets.get(dataset)
+
+        try:
+            filters = {
+                column: _parse(df, column, request.args.getlist(column))
+                for column in columns if column in request.args
+            }
+        except ValueError:
+            abort(400)
+        if previous_year in filters:
+            # Die Figur vergleicht mit dem Vorjahr, also gehört es zu ihren Daten
+            filters[previous_year] = filters[previous_year] + [year - 1 for year in filters[previous_year]]
+        rows = np.flatnonzero(_mask(df, filters))
+
+        return Response(
+            _chunks(df, rows, fmt),
+            content_type=FORMATS[fmt],
+            headers={'Content-Disposition': f'attachment; filename="{page}.{fmt}"'},
+        )
@@ -0,0 +1,66 @@
+"""Vorab validierte Figur-Gerüste für die Callbacks.
+
+``go.Figure()``, ``add_trace`` und ``update_layout`` prüfen bei jedem Aufruf
+alle Eigenschaften gegen das Plotly-Schema; das ist ein großer Teil der
+Rechenzeit eines Callbacks. Mit :func:`template` wird das Gerüst einer Figur
+(Trace-Typen, Farben, Hovertexte, Achsentitel …) einmal über die normale
+Plotly-API gebaut und validiert. Pro Anfrage werden danach nur noch die
+Datenarrays und Titel als einfache Dicts eingesetzt::
+
+    @figures.template
+    def diff_figure():
+        fig = go.Figure(go.Bar(orientation='h', marker_color='green'))
+        fig.update_layout(xaxis_title='Differenz (EUR)')
+        return fig
+
+    fig = diff_figure(
+        data=[{'x': df['wert'], 'y': df['Land']}],
+        layout={'title': {'text': 'Differenzen 2024'}},
+    )
+
+Trace ``i`` übernimmt die Eigenschaften von Trace ``i`` des Gerüsts bzw. vom
+letzten Trace des Gerüsts, wenn mehr Traces übergeben werden (z.B. je
+ausgewählter Ware eine Linie). Verschachtelte Dicts werden zusammengeführt,
+alle anderen Werte ersetzt. Eigenschaften müssen in der ausgeschriebenen
+Form angegeben werden (``{'xaxis': {'title': {'text': ...}}}`` statt
+``xaxis_title``). Das Ergebnis ist ein Dict, das Dash direkt als ``figure``
+annimmt.
+"""
+import functools
+import threading
+
+
+def _merge(base, update):
+    """Führt ``update`` in eine Kopie von ``base`` zusammen (``base`` bleibt unverändert)."""
+    merged = dict(base)
+    for key, value in update.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def template(builder):
+    """Dekorator: baut das Gerüst aus ``builder()`` einmal und füllt es danach ohne Validierung."""
+    skeleton = {}
+    lock = threading.Lock()
+
+    def _skeleton():
+        if not skeleton:
+            with lock:
+                if not skeleton:
+                    skeleton.update(builder().to_plotly_json())
+        return skeleton
+
+    @functools.wraps(builder)
+    def render(data=(), layout=None):
+        base = _skeleton()
+        prototypes = base['data']
+        traces = [
+            _merge(prototypes[min(i, len(prototypes) - 1)], trace) if prototypes else dict(trace)
+            for i, trace in enumerate(data)
+        ]
+        return {'data': traces, 'layout': _merge(base['layout'], layout or {})}
+
+    return render
@@ -0,0 +1,224 @@
+"""Prognosen der monatlichen Export- und Importwerte aller Länder und Waren.
+
+Jede Reihe aus :mod:`core.series` bekommt ein saisonales Holt-Winters-Modell
+(``statsmodels``: additiver, gedämpfter Trend und additive Saison über 12
+Monate), das die nächsten :data:`HORIZON` Monate fortschreibt. Das Band um
+die Prognose ist eine Näherung aus der Streuung der Modellresiduen, die mit
+der Wurzel des Prognoseabstands wächst.
+
+Das Anpassen aller rund 700 Reihen dauert zu lange für eine Anfrage. Es
+läuft deshalb im Hintergrund in einem Prozess-Pool (:func:`build_in_background`,
+mit ``FORECAST=1`` standardmäßig an) und wird je Datenstand als Datei unter
+``data/.cache`` abgelegt; weitere Worker und Neustarts lesen die Datei. Nach
+einem Neuladen der Daten startet der Bau für die neue Version beim ersten
+Zugriff. Solange er läuft, passt :func:`forecast` nur die angefragte Reihe
+direkt an; solche Ergebnisse dürfen nicht über :func:`ready` hinaus gecacht
+werden.
+"""
+import logging
+import os
+import threading
+import uuid
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from core import datasets, schema, series
+
+try:
+    import fcntl
+except ImportError:  # Windows: kein Sperren zwischen Prozessen
+    fcntl = None
+
+ENABLED = os.environ.get('FORECAST', '1') == '1'
+MAX_WORKERS = int(os.environ.get('FORECAST_WORKERS', os.cpu_count() or 1))
+
+# Prognosehorizont und Saisonlänge in Monaten
+HORIZON = 12
+SEASON = 12
+
+# Prognostizierte Arten von Reihen (siehe core.series.KINDS), Kennzahlen und Reihen je Pool-Aufgabe
+KINDS = ('land', 'ware')
+METRICS = ('export', 'import')
+CHUNK_SIZE = 20
+
+# z-Wert des Prognosebands (etwa 95 %)
+BAND_Z = 1.96
+
+logger = logging.getLogger(__name__)
+
+
+def fit(values):
+    """Passt das Modell an eine Reihe an und gibt ``(prognose, sigma)`` zurück.
+
+    ``prognose`` enthält :data:`HORIZON` Werte, ``sigma`` ist die
+    Standardabweichung der Residuen. Reihen mit weniger als zwei Saisons
+    oder ohne Schwankung werden saisonal naiv (Werte des Vorjahres)
+    fortgeschrieben. Muss auf Modulebene stehen (Pool-Prozess).
+    """
+    from statsmodels.tsa.holtwinters import ExponentialSmoothing
+
+    values = np.asarray(values, dtype=np.float64)
+    naive = np.resize(values[-SEASON:], HORIZON) if len(values) else np.zeros(HORIZON)
+    scale = np.abs(values).max() if len(values) else 0
+    if len(values) < 2 * SEASON or scale == 0 or np.ptp(values) == 0:
+        return naive, 0.0
+
+    # Auf 0..1 skaliert konvergiert die Optimierung zuverlässiger
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        try:
+            model = ExponentialSmoothing(
+                values / scale, trend='add', damped_trend=True, seasonal='add',
+                seasonal_periods=SEASON, initialization_method='estimated',
+            ).fit()
+        except (ValueError, np.linalg.LinAlgError):
+            return naive, float(np.std(values[SEASON:] - values[:-SEASON]))
+    prognose = np.clip(model.forecast(HORIZON) * scale, 0, None)
+    if not np.isfinite(prognose).all():
+        return naive, float(np.std(values[SEASON:] - values[:-SEASON]))
+    return prognose, float(np.std(model.resid) * scale)
+
+
+def _fit_rows(rows):
+    # Eine Pool-Aufgabe: mehrere Reihen nacheinander
+    return [fit(values) for values in rows]
+
+
+def _path(key):
+    return os.path.join(datasets.CACHE_DIR, f'forecast.v{schema.SCHEMA_VERSION}.{key}.pkl')
+
+
+def _key(snapshot):
+    return '-'.join(series.matrix(kind, snapshot).fingerprint() for kind in KINDS)
+
+
+def build(snapshot=None, max_workers=None):
+    """Passt alle Reihen im Prozess-Pool an.
+
+    Gibt ein Dict ``(art, kennzahl) -> {'prognose', 'sigma'}`` zurück
+    (``prognose`` mit einer Zeile je Reihe von :func:`core.series.matrix`).
+    """
+    snapshot = snapshot or datasets.current()
+    tasks = []
+    for kind in KINDS:
+        matrix = series.matrix(kind, snapshot)
+        for metric in METRICS:
+            tasks.append(((kind, metric), matrix.values[metric]))
+
+    jobs = []
+    with ProcessPoolExecutor(max_workers=max_workers or MAX_WORKERS) as pool:
+        for key, values in tasks:
+            for start in range(0, len(values), CHUNK_SIZE):
+                jobs.append((key, pool.submit(_fit_rows, values[start:start + CHUNK_SIZE])))
+        fitted = {key: [] for key, _ in tasks}
+        for key, future in jobs:
+            fitted[key].extend(future.result())
+
+    return {
+        key: {
+            'prognose': np.array([prognose for prognose, _ in results]).reshape(len(results), HORIZON),
+            'sigma': np.array([sigma for _, sigma in results]),
+        }
+        for key, results in fitted.items()
+    }
+
+
+def _write(results, path):
+    tmp_path = f'{path}.{uuid.uuid4().hex}.tmp'
+    pd.to_pickle(results, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _run(snapshot, state):
+    path = _path(state['key'])
+    try:
+        lock_file = None
+        if fcntl is not None:
+            os.makedirs(datasets.CACHE_DIR, exist_ok=True)
+            lock_file = open(path + '.lock', 'w')
+            # Baut ein anderer Worker bereits, auf ihn warten und seine Datei lesen
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            if not os.path.exists(path):
+                _write(build(snapshot), path)
+            state['results'] = pd.read_pickle(path)
+        finally:
+            if lock_file is not None:
+                lock_file.close()
+    except Exception:
+        logger.exception('Prognosen für Datenversion %s fehlgeschlagen', snapshot.version)
+    finally:
+        state['running'] = False
+
+
+@datasets.per_version
+def _state(snapshot):
+    return {'key': _key(snapshot), 'results': None, 'running': False, 'lock': threading.Lock()}
+
+
+def results(snapshot=None, start=True):
+    """Die Prognosen aller Reihen für den Snapshot oder ``None``, solange sie noch fehlen.
+
+    Liegt keine Datei vor, wird mit ``start=True`` der Bau im Hintergrund
+    gestartet (höchstens einmal je Datenversion und Prozess).
+    """
+    snapshot = snapshot or datasets.current()
+    state = _state(snapshot)
+    if state['results'] is None:
+        with state['lock']:
+            if state['results'] is None and not state['running']:
+                path = _path(state['key'])
+                if os.path.exists(path):
+                    state['results'] = pd.read_pickle(path)
+                elif start:
+                    state['running'] = True
+                    threading.Thread(target=_run, args=(snapshot, state), name='forecast', daemon=True).start()
+    return state['results']
+
+
+def ready(snapshot=None):
+    """``True``, sobald die Prognosen aller Reihen für den Snapshot vorliegen (startet sonst den Bau)."""
+    return results(snapshot, start=ENABLED) is not None
+
+
+def build_in_background():
+    """Startet den Bau der Prognosen für die aktuelle Datenversion, wenn ``FORECAST=1``."""
+    if ENABLED:
+        results()
+
+
+def forecast(kind, name, metric):
+    """Verlauf und Prognose einer Reihe.
+
+    Gibt ein Dict mit ``verlauf`` und ``prognose`` (je ``pd.Series`` mit
+    Monaten als Index), dem Band ``unten``/``oben`` und ``quelle``
+    (``'cache'`` oder ``'direkt'``) zurück bzw. ``None``, wenn es die Reihe
+    nicht gibt.
+    """
+    snapshot = datasets.current()
+    matrix = series.matrix(kind, snapshot)
+    if name not in matrix:
+        return None
+    row = matrix.row(name)
+    values = matrix.values[metric][row]
+
+    cached = results(snapshot, start=ENABLED)
+    if cached is not None:
+        prognose, sigma = cached[(kind, metric)]['prognose'][row], cached[(kind, metric)]['sigma'][row]
+        source = 'cache'
+    else:
+        prognose, sigma = fit(values)
+        source = 'direkt'
+
+    periods = pd.period_range(matrix.periods[-1] + 1, periods=HORIZON, freq='M')
+    band = BAND_Z * sigma * np.sqrt(np.arange(1, HORIZON + 1))
+    return {
+        'verlauf': pd.Series(values, index=matrix.periods),
+        'prognose': pd.Series(prognose, index=periods),
+        'unten': pd.Series(np.clip(prognose - band, 0, None), index=periods),
+        'oben': pd.Series(prognose + band, index=periods),
+        'quelle': source,
+    }
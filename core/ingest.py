@@ -0,0 +1,259 @@
+"""Inkrementelles Update aller abgeleiteten Tabellen um einen neuen Monat.
+
+Veröffentlicht Destatis einen neuen Monat, müssen nicht mehr alle Tabellen
+in ``data`` neu erzeugt werden. :func:`ingest_month` nimmt die Rohdaten
+eines Monats (Format wie ``Handelsdaten_<jahr>.csv``) entgegen, aktualisiert
+nur die Zeilen des betroffenen Monats bzw. Jahres und tauscht die Datensätze
+anschließend im Speicher aus (:func:`core.datasets.publish`).
+
+Aufruf über die Kommandozeile::
+
+    python -m core.ingest neue_daten.csv --write
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from core import datasets, ranking, schema
+
+RAW_COLUMNS = ['Jahr', 'Monat', 'Land', 'Code', 'Label', 'Ausfuhr: Wert', 'Einfuhr: Wert']
+HANDEL = ['Ausfuhr: Wert', 'Einfuhr: Wert']
+WERTE = ['export_wert', 'import_wert', 'handelsvolumen_wert']
+METRICS = ['export', 'import', 'handelsvolumen']
+
+# Sortierung der Tabellen wie in den CSV-Dateien
+SORT_KEYS = {
+    'trade_spec_country_and_year': ['Land', 'Jahr', 'Monat'],
+    'gesamt_deutschland_monthly': ['Jahr', 'Monat'],
+    'gesamt_deutschland': ['Jahr'],
+    'aggregated_df': ['Jahr', 'Monat', 'Code'],
+    'df_reduced': ['Jahr', 'Label'],
+    'df_grouped': ['Land', 'Jahr'],
+    'top10_goods_spec_country_and_year': ['Land', 'Jahr', 'Code'],
+    'top10_goods_spec_country': ['Land', 'Code'],
+    'handelsdaten': ['Jahr', 'Monat', 'Land', 'Code'],
+}
+
+
+def _try_get(name):
+    try:
+        return datasets.get(name)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _replace_rows(df, mask, new_rows, name):
+    # Neue Frames erzeugen statt die gemeinsam genutzten zu verändern
+    new_rows = new_rows[df.columns].copy()
+    # Summen aus Rohdaten mit Nachkommastellen auf ganze Euro, wo die Tabelle ganzzahlig ist
+    # (noch leere Spalten füllt derive_grouped danach)
+    for column in schema.MONETARY_COLUMNS.get(name, {}):
+        if column in df.columns and df[column].dtype.kind in 'iu' and new_rows[column].notna().all():
+            new_rows[column] = new_rows[column].round().astype(df[column].dtype)
+    combined = pd.concat([df[~mask], new_rows], ignore_index=True)
+    return combined.sort_values(SORT_KEYS[name], kind='stable', ignore_index=True)
+
+
+def _apply_delta(df, keys, new_month, old_month, name):
+    """Addiert die Differenz (neuer - alter Monat) auf eine Summentabelle."""
+    delta = (new_month.groupby(keys)[HANDEL].sum()
+             .sub(old_month.groupby(keys)[HANDEL].sum(), fill_value=0))
+    existing = df.set_index(keys)
+    affected = existing.index.isin(delta.index)
+    updated = delta.add(existing.loc[affected, HANDEL], fill_value=0).reset_index()
+    for column in HANDEL:
+        updated[column] = updated[column].round().astype(schema.CANONICAL_DTYPE)
+    if 'Handelsvolumen' in df.columns:
+        updated = datasets.add_handelsvolumen(updated)
+    return _replace_rows(df, affected, updated, name)
+
+
+def derive_grouped(df_grouped, years):
+    """Berechnet Handelsbilanz, Rankings, Wachstum und Differenzen für einzelne Jahre neu.
+
+    Grundlage sind die Spalten ``*_wert`` der Jahre selbst und des jeweiligen
+    Vorjahres. Rankings werden innerhalb eines Jahres vergeben (absteigend,
+    bei Gleichstand Mittelwert der Plätze), das Wachstum ist die prozentuale
+    Veränderung zum Vorjahr; im ersten Jahr sind Wachstum und Differenz 0.
+    Bei einem noch unvollständigen Jahr wird der bisherige Jahresstand mit
+    dem ganzen Vorjahr verglichen.
+    """
+    df_grouped = df_grouped.copy()
+    for year in sorted(years):
+        current_mask = df_grouped['Jahr'] == year
+        current = df_grouped[current_mask]
+        previous = df_grouped[df_grouped['Jahr'] == year - 1].set_index('Land')
+
+        derived = pd.DataFrame(index=current.index)
+        derived['handelsbilanz'] = current['export_wert'] - current['import_wert']
+        derived['handelsbilanz_status'] = np.where(derived['handelsbilanz'] > 0, 'Überschuss', 'Defizit')
+
+        for metric in METRICS:
+            values = current[f'{metric}_wert']
+            derived[f'{metric}_ranking'] = ranking.rank_values(values, method='average')
+
+            if previous.empty:
+                differenz = pd.Series(0, index=current.index)
+                wachstum = pd.Series(0.0, index=current.index)
+            else:
+                previous_values = current['Land'].map(previous[f'{metric}_wert'])
+                differenz = (values - previous_values).fillna(0)
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    wachstum = (values / previous_values - 1) * 100
+                wachstum = wachstum.where(previous_values.notna(), 0.0)
+
+            derived[f'{metric}_wachstum'] = wachstum
+            derived[f'{metric}_wachstum_ranking'] = ranking.rank_values(wachstum, method='average')
+            derived[f'{metric}_differenz'] = differenz.round().astype(schema.CANONICAL_DTYPE)
+
+        for column in derived.columns:
+            df_grouped.loc[current_mask, column] = derived[column]
+    return schema.normalize('df_grouped', df_grouped)
+
+
+def ingest_month(records, write=False):
+    """Aktualisiert alle abgeleiteten Tabellen um einen Monat Rohdaten.
+
+    ``records`` enthält die Spalten :data:`RAW_COLUMNS` mit Werten in Euro
+    für genau einen Monat. Ist der Monat bereits vorhanden, wird er ersetzt;
+    das ist nur möglich, wenn seine Rohdaten (``handelsdaten``) vorliegen.
+    Mit ``write=True`` werden die betroffenen CSV-Dateien überschrieben.
+
+    Gibt die aktualisierten Datensätze zurück, die bereits veröffentlicht
+    wurden.
+    """
+    missing = set(RAW_COLUMNS) - set(records.columns)
+    if missing:
+        raise ValueError(f"Rohdaten unvollständig, es fehlen die Spalten: {sorted(missing)}")
+    periods = records[['Jahr', 'Monat']].drop_duplicates()
+    if len(periods) != 1:
+        raise ValueError("Die Rohdaten müssen genau einen Monat enthalten.")
+    year, month = (int(v) for v in periods.iloc[0])
+
+    new_month = schema.normalize('handelsdaten', records[RAW_COLUMNS].copy())
+
+    trade = datasets.get('trade_spec_country_and_year')
+    raw = _try_get('handelsdaten')
+    if raw is not None:
+        old_month = raw[(raw['Jahr'] == year) & (raw['Monat'] == month)]
+    else:
+        old_month = new_month.iloc[0:0]
+    month_exists = ((trade['Jahr'] == year) & (trade['Monat'] == month)).any()
+    if month_exists and old_month.empty:
+        raise ValueError(
+            f"Monat {month}/{year} ist bereits vorhanden, ohne dessen Rohdaten ist keine Korrektur möglich."
+        )
+
+    updated = {}
+
+    # ---------------- Monatstabellen: Zeilen des Monats ersetzen ------------------
+    by_country = new_month.groupby('Land')[HANDEL].sum()
+    countries = trade['Land'].drop_duplicates()
+    by_country = by_country.reindex(countries.tolist() + sorted(set(by_country.index) - set(countries)), fill_value=0)
+    month_rows = pd.DataFrame({
+        'Land': by_country.index,
+        'Jahr': year,
+        'Monat': month,
+        'export_wert': by_country['Ausfuhr: Wert'].values,
+        'import_wert': by_country['Einfuhr: Wert'].values,
+    })
+    month_rows['handelsvolumen_wert'] = month_rows['export_wert'] + month_rows['import_wert']
+    trade_mask = (trade['Jahr'] == year) & (trade['Monat'] == month)
+    updated['trade_spec_country_and_year'] = _replace_rows(trade, trade_mask, month_rows, 'trade_spec_country_and_year')
+
+    monthly = datasets.get('gesamt_deutschland_monthly')
+    total_row = month_rows[WERTE].sum().to_frame().T.assign(Jahr=year, Monat=month)
+    monthly_mask = (monthly['Jahr'] == year) & (monthly['Monat'] == month)
+    updated['gesamt_deutschland_monthly'] = _replace_rows(monthly, monthly_mask, total_row, 'gesamt_deutschland_monthly')
+
+    aggregated = datasets.get('aggregated_df')
+    goods_rows = new_month.groupby(['Code', 'Label'], as_index=False)[HANDEL].sum().assign(Jahr=year, Monat=month)
+    goods_rows['Handelsvolumen'] = goods_rows['Ausfuhr: Wert'] + goods_rows['Einfuhr: Wert']
+    aggregated_mask = (aggregated['Jahr'] == year) & (aggregated['Monat'] == month)
+    updated['aggregated_df'] = _replace_rows(aggregated, aggregated_mask, goods_rows, 'aggregated_df')
+
+    if raw is not None:
+        raw_rows = datasets.add_monat_name(new_month.copy())
+        raw_mask = (raw['Jahr'] == year) & (raw['Monat'] == month)
+        updated['handelsdaten'] = _replace_rows(raw, raw_mask, raw_rows.reindex(columns=raw.columns), 'handelsdaten')
+
+    # ---------------- Jahrestabellen: nur das betroffene Jahr neu berechnen ------------------
+    gesamt = datasets.get('gesamt_deutschland')
+    year_total = updated['gesamt_deutschland_monthly']
+    year_total = year_total[year_total['Jahr'] == year][WERTE].sum()
+    gesamt_row = pd.DataFrame([{
+        'Jahr': year,
+        'gesamt_export': year_total['export_wert'],
+        'gesamt_import': year_total['import_wert'],
+        'gesamt_handelsvolumen': year_total['handelsvolumen_wert'],
+    }])
+    updated['gesamt_deutschland'] = _replace_rows(gesamt, gesamt['Jahr'] == year, gesamt_row, 'gesamt_deutschland')
+
+    reduced = datasets.get('df_reduced')
+    aggregated = updated['aggregated_df']
+    reduced_rows = (aggregated[aggregated['Jahr'] == year]
+                    .groupby('Label', as_index=False)[HANDEL].sum().assign(Jahr=year))
+    updated['df_reduced'] = _replace_rows(reduced, reduced['Jahr'] == year, reduced_rows, 'df_reduced')
+
+    goods_year = _try_get('top10_goods_spec_country_and_year')
+    if goods_year is not None:
+        updated['top10_goods_spec_country_and_year'] = _apply_delta(
+            goods_year, ['Land', 'Jahr', 'Code', 'Label'], new_month, old_month, 'top10_goods_spec_country_and_year'
+        )
+    goods_all_time = datasets.get('top10_goods_spec_country')
+    updated['top10_goods_spec_country'] = _apply_delta(
+        goods_all_time, ['Land', 'Code', 'Label'], new_month, old_month, 'top10_goods_spec_country'
+    )
+
+    grouped = datasets.get('df_grouped')
+    trade = updated['trade_spec_country_and_year']
+    year_values = (trade[trade['Jahr'] == year]
+                   .groupby('Land', as_index=False)[WERTE].sum().assign(Jahr=year))
+    year_rows = year_values.reindex(columns=grouped.columns)
+    grouped = _replace_rows(grouped, grouped['Jahr'] == year, year_rows, 'df_grouped')
+    # Das Folgejahr hängt über Wachstum und Differenz vom geänderten Jahr ab
+    years = [y for y in (year, year + 1) if (grouped['Jahr'] == y).any()]
+    updated['df_grouped'] = derive_grouped(grouped, years)
+
+    # Zusammengesetzte Frames wieder auf die Datentypen des Schemas bringen
+    updated = {name: schema.downcast(name, df) for name, df in updated.items()}
+
+    if write:
+        for name, df in updated.items():
+            _write(name, df, year)
+
+    datasets.publish(updated)
+    return updated
+
+
+def _write(name, df, year):
+    """Schreibt einen Datensatz in der Einheit und Spaltenauswahl der Quelldatei zurück."""
+    df = schema.denormalize(name, df)
+    if name == 'handelsdaten':
+        df = df[df['Jahr'] == year].drop(columns=['Monat_Name'])
+        filename = f'Handelsdaten_{year}.csv'
+    else:
+        filename = datasets.DATASETS[name]['files'][0]
+        if name == 'top10_goods_spec_country_and_year':
+            df = df.drop(columns=['Handelsvolumen'])
+    path = os.path.join(datasets.DATA_DIR, filename)
+    tmp_path = path + '.tmp'
+    df.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Neuen Monat Rohdaten in alle abgeleiteten Tabellen übernehmen.")
+    parser.add_argument('csv', help="CSV-Datei mit den Rohdaten eines Monats")
+    parser.add_argument('--write', action='store_true', help="aktualisierte CSV-Dateien in data/ schreiben")
+    args = parser.parse_args()
+
+    records = pd.read_csv(args.csv, encoding='utf-8')
+    updated = ingest_month(records, write=args.write)
+    print(f"Aktualisiert: {', '.join(sorted(updated))}")
+
+
+if __name__ == "__main__":
+    main()
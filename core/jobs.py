@@ -0,0 +1,260 @@
+"""Hintergrund-Callbacks für rechenintensive Seiten ohne externen Broker.
+
+Im Normalbetrieb rechnen alle Callbacks direkt im Worker des Servers. Mit
+``BACKGROUND_CALLBACKS=1`` können Seiten mit vielen Mehrfachauswahlen ihre
+Berechnung stattdessen an einen lokalen Prozess-Pool abgeben
+(:func:`register_background`). Status, Fortschritt und Ergebnis jedes Jobs
+liegen in einer SQLite-Datei unter ``data/.cache``, sodass jeder
+Server-Prozess den Stand abfragen kann. Der Browser fragt per
+``dcc.Interval`` nach, bis das Ergebnis vorliegt.
+
+Ändert der Nutzer die Auswahl, bevor ein Job fertig ist, wird der alte Job
+desselben Browser-Tabs abgebrochen: noch wartende Jobs werden gar nicht erst
+gestartet, laufende brechen beim nächsten Fortschrittsschritt ab. Ein
+bereits fertiges Ergebnis für dieselben Eingaben und denselben Stand der
+Dateien (``Snapshot.fingerprint``) wird ohne neue Berechnung
+wiederverwendet.
+
+Die Rechenfunktion wird als ``func(progress, *args)`` aufgerufen, muss auf
+Modulebene stehen (pickle) und ruft ``progress(erledigt, gesamt)`` zwischen
+ihren Schritten auf.
+"""
+import json
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+import plotly.io.json
+from dash import dcc, html, no_update
+from dash.dependencies import Input, Output, State
+from dash.exceptions import PreventUpdate
+
+from core import datasets
+
+ENABLED = os.environ.get('BACKGROUND_CALLBACKS', '0') == '1'
+MAX_WORKERS = int(os.environ.get('BACKGROUND_WORKERS', 2))
+DB_PATH = os.path.join(datasets.CACHE_DIR, 'jobs.sqlite')
+
+# Abfrageintervall im Browser und Aufbewahrungsdauer der Ergebnisse
+POLL_INTERVAL_MS = 500
+RESULT_TTL = 3600
+
+_pool = None
+_futures = {}  # job_id -> (owner, future) der Jobs dieses Prozesses
+_lock = threading.Lock()
+
+
+class Cancelled(Exception):
+    """Der Job wurde durch eine neuere Anfrage ersetzt."""
+
+
+def _connect():
+    os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
+    conn = sqlite3.connect(DB_PATH, timeout=30, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS jobs (
+            id TEXT PRIMARY KEY,
+            owner TEXT,
+            key TEXT,
+            status TEXT NOT NULL,
+            progress REAL NOT NULL DEFAULT 0,
+            result TEXT,
+            error TEXT,
+            created REAL NOT NULL
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS jobs_owner ON jobs (owner, status)")
+    conn.execute("CREATE INDEX IF NOT EXISTS jobs_key ON jobs (key, status)")
+    return conn
+
+
+def _context():
+    """Startart der Pool-Prozesse: nicht ``fork`` aus dem laufenden Server.
+
+    Im Server laufen bereits Threads (Vorberechnung, ``datasets.watch``,
+    Flask-Worker); eine beim Fork gehaltene Sperre bliebe im Kind für immer
+    belegt. Der Forkserver lädt vorab nur dieses Modul statt des
+    Startskripts, damit in ihm selbst keine Threads der App laufen. Die
+    Rechenfunktion bekommt ihre Daten über die Argumente von ``prepare``.
+    """
+    if 'forkserver' not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('spawn')  # Windows
+    context = multiprocessing.get_context('forkserver')
+    context.set_forkserver_preload(['core.jobs'])
+    return context
+
+
+def _get_pool():
+    global _pool
+    with _lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=MAX_WORKERS, mp_context=_context())
+        return _pool
+
+
+def no_progress(done, total):
+    """Fortschritts-Funktion für den direkten Aufruf ohne Job."""
+
+
+class _Progress:
+    def __init__(self, conn, job_id):
+        self.conn = conn
+        self.job_id = job_id
+
+    def __call__(self, done, total):
+        progress = done / total if total else 0
+        cursor = self.conn.execute(
+            "UPDATE jobs SET progress = ? WHERE id = ? AND status = 'running'", (progress, self.job_id)
+        )
+        if cursor.rowcount == 0:
+            raise Cancelled(self.job_id)
+
+
+def _run(job_id, func, args):
+    """Führt einen Job im Pool-Prozess aus und schreibt das Ergebnis in die Datenbank."""
+    conn = _connect()
+    try:
+        cursor = conn.execute("UPDATE jobs SET status = 'running' WHERE id = ? AND status = 'queued'", (job_id,))
+        if cursor.rowcount == 0:
+            return
+        try:
+            result = func(_Progress(conn, job_id), *args)
+        except Cancelled:
+            return
+        except Exception as exc:
+            conn.execute(
+                "UPDATE jobs SET status = 'error', error = ? WHERE id = ? AND status = 'running'",
+                (f'{type(exc).__name__}: {exc}', job_id),
+            )
+            return
+        conn.execute(
+            "UPDATE jobs SET status = 'done', progress = 1, result = ? WHERE id = ? AND status = 'running'",
+            (plotly.io.json.to_json_plotly(result), job_id),
+        )
+    finally:
+        conn.close()
+
+
+def submit(owner, key, func, *args):
+    """Startet ``func(progress, *args)`` im Hintergrund und gibt die Job-ID zurück.
+
+    Aktive Jobs desselben ``owner`` werden abgebrochen. Liegt für ``key``
+    bereits ein fertiges Ergebnis vor, wird dessen Job-ID zurückgegeben.
+    """
+    conn = _connect()
+    try:
+        conn.execute("DELETE FROM jobs WHERE created < ?", (time.time() - RESULT_TTL,))
+        conn.execute(
+            "UPDATE jobs SET status = 'cancelled' WHERE owner = ? AND status IN ('queued', 'running')", (owner,)
+        )
+        row = conn.execute("SELECT id FROM jobs WHERE key = ? AND status = 'done' LIMIT 1", (key,)).fetchone()
+        if row:
+            return row[0]
+
+        job_id = uuid.uuid4().hex
+        conn.execute(
+            "INSERT INTO jobs (id, owner, key, status, created) VALUES (?, ?, ?, 'queued', ?)",
+            (job_id, owner, key, time.time()),
+        )
+    finally:
+        conn.close()
+
+    with _lock:
+        # Noch nicht gestartete Jobs desselben Tabs gar nicht erst ausführen
+        for job_owner, future in _futures.values():
+            if job_owner == owner:
+                future.cancel()
+    future = _get_pool().submit(_run, job_id, func, args)
+    with _lock:
+        _futures[job_id] = (owner, future)
+    future.add_done_callback(lambda _: _futures.pop(job_id, None))
+    return job_id
+
+
+def status(job_id):
+    """Status, Fortschritt (0–1), Ergebnis und Fehlertext eines Jobs oder ``None``."""
+    conn = _connect()
+    try:
+        row = conn.execute("SELECT status, progress, result, error FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    finally:
+        conn.close()
+    if row is None:
+        return None
+    state, progress, result, error = row
+    return {
+        'status': state,
+        'progress': progress,
+        'result': json.loads(result) if result is not None else None,
+        'error': error,
+    }
+
+
+def _ids(prefix):
+    return {
+        'client': f'{prefix}_job_client',
+        'job': f'{prefix}_job',
+        'interval': f'{prefix}_job_interval',
+        'progress': f'{prefix}_job_progress',
+    }
+
+
+def layout(prefix):
+    """Zusätzliche Komponenten einer Seite für den Hintergrundbetrieb (leer, wenn aus)."""
+    if not ENABLED:
+        return []
+    ids = _ids(prefix)
+    return [
+        # Kennung des Browser-Tabs, damit nur die eigenen alten Jobs abgebrochen werden;
+        # wird beim ersten Job vergeben, damit das Layout für alle Tabs gleich bleibt
+        dcc.Store(id=ids['client']),
+        dcc.Store(id=ids['job']),
+        dcc.Interval(id=ids['interval'], interval=POLL_INTERVAL_MS, disabled=True),
+        html.Div(id=ids['progress'], style={'marginTop': '10px', 'color': '#666'}),
+    ]
+
+
+def register_background(app, prefix, outputs, inputs, prepare, func):
+    """Registriert die Callbacks einer Seite im Hintergrundbetrieb.
+
+    ``prepare(*eingaben)`` läuft im Server mit dem aktuellen Snapshot und
+    liefert die Argumente für ``func(progress, *args)`` im Pool-Prozess.
+    ``func`` gibt die Werte für ``outputs`` zurück.
+    """
+    ids = _ids(prefix)
+    name = f'{func.__module__}.{func.__qualname__}'
+
+    @app.callback(
+        [Output(ids['job'], 'data'), Output(ids['client'], 'data')],
+        inputs,
+        State(ids['client'], 'data'),
+    )
+    def start_job(*values):
+        *values, client = values
+        client = client or uuid.uuid4().hex
+        with datasets.pinned() as snapshot:
+            # Fingerabdruck statt Versionsnummer: gilt auch nach Neustart und in anderen Workern
+            key = f'{name}:{snapshot.fingerprint}:{json.dumps(values, default=str)}'
+            return submit(client, key, func, *prepare(*values)), client
+
+    @app.callback(
+        outputs + [Output(ids['progress'], 'children'), Output(ids['interval'], 'disabled')],
+        Input(ids['interval'], 'n_intervals'),
+        Input(ids['job'], 'data'),
+    )
+    def poll_job(_, job_id):
+        job = status(job_id) if job_id else None
+        if job is None:
+            raise PreventUpdate
+        unchanged = [no_update] * len(outputs)
+        if job['status'] == 'done':
+            return job['result'] + ['', True]
+        if job['status'] == 'error':
+            return unchanged + [f"Berechnung fehlgeschlagen: {job['error']}", True]
+        if job['status'] == 'cancelled':
+            return unchanged + ['', True]
+        return unchanged + [f"Berechnung läuft … {job['progress']:.0%}", False]
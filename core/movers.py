@@ -0,0 +1,120 @@
+"""Auf- und Absteiger in Deutschlands Export-, Import- und Handelsvolumen-Ranking.
+
+Aus den Spalten ``*_ranking`` von ``df_grouped`` wird einmal je
+Datenversion eine Tabelle der Platzveränderungen zum Vorjahr abgeleitet
+(``Veränderung`` = Platz im Vorjahr - Platz im Jahr, positiv = aufgestiegen).
+Länder ohne Handel in einem der beiden Jahre bleiben außen vor, da sie sich
+nur die hinteren Plätze teilen.
+
+Je Kennzahl liegen zwei sortierte Indizes vor (Aufsteiger bzw. Absteiger,
+nach Jahr gruppiert) samt Zeilenbereich je Jahr; :func:`movers` liest
+daraus nur noch die ersten ``n`` passenden Zeilen eines Jahres::
+
+    movers.movers(2024, 'export', n=10, direction='absteiger')
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+from core import datasets
+
+METRICS = {
+    'export': ('export_ranking', 'export_wert'),
+    'import': ('import_ranking', 'import_wert'),
+    'handelsvolumen': ('handelsvolumen_ranking', 'handelsvolumen_wert'),
+}
+
+DIRECTIONS = ('aufsteiger', 'absteiger')
+
+COLUMNS = ['Land', 'Jahr', 'Platz', 'Platz_Vorjahr', 'Veränderung']
+
+
+def deltas(df, metric):
+    """Platzveränderungen zum Vorjahr für ``metric`` (Spalten siehe :data:`COLUMNS`)."""
+    rank_column, value_column = METRICS[metric]
+    df = df.sort_values(['Land', 'Jahr'], kind='stable')
+
+    land = df['Land'].to_numpy()
+    jahr = df['Jahr'].to_numpy(dtype=np.int64)
+    rank = df[rank_column].to_numpy(dtype=np.float64)
+    value = df[value_column].to_numpy(dtype=np.float64)
+
+    # Vorjahreszeile = vorige Zeile desselben Landes mit Jahr - 1
+    follows = np.r_[False, (land[1:] == land[:-1]) & (jahr[1:] == jahr[:-1] + 1)]
+    previous_rank = np.r_[np.nan, rank[:-1]]
+    previous_value = np.r_[0.0, value[:-1]]
+    valid = follows & ~np.isnan(rank) & ~np.isnan(previous_rank) & (value > 0) & (previous_value > 0)
+
+    return pd.DataFrame({
+        'Land': land[valid],
+        'Jahr': jahr[valid].astype(np.int16),
+        'Platz': rank[valid].astype(np.float32),
+        'Platz_Vorjahr': previous_rank[valid].astype(np.float32),
+        'Veränderung': (previous_rank[valid] - rank[valid]).astype(np.float32),
+    }, columns=COLUMNS)
+
+
+class _Index:
+    """Platzveränderungen einer Kennzahl mit sortierten Zeilenfolgen je Richtung und Jahr."""
+
+    def __init__(self, table):
+        self.table = table
+        jahr = table['Jahr'].to_numpy()
+        delta = table['Veränderung'].to_numpy()
+        platz = table['Platz'].to_numpy()
+
+        # Nach Jahr, dann größte Veränderung; bei Gleichstand der bessere aktuelle Platz zuerst
+        self.orders = {
+            'aufsteiger': np.lexsort((platz, -delta, jahr)),
+            'absteiger': np.lexsort((platz, delta, jahr)),
+        }
+        self.years = np.unique(jahr)
+        self.starts = np.searchsorted(jahr[self.orders['aufsteiger']], self.years, side='left')
+        self.ends = np.searchsorted(jahr[self.orders['aufsteiger']], self.years, side='right')
+
+    def lookup(self, year, n, direction, max_rank=None):
+        position = np.searchsorted(self.years, year)
+        if position >= len(self.years) or self.years[position] != year:
+            return self.table.iloc[:0]
+        rows = self.orders[direction][self.starts[position]:self.ends[position]]
+
+        # Nur echte Auf- bzw. Absteiger, optional nur Länder bis zu einem aktuellen Platz
+        sign = 1 if direction == 'aufsteiger' else -1
+        keep = self.table['Veränderung'].to_numpy()[rows] * sign > 0
+        if max_rank is not None:
+            keep &= self.table['Platz'].to_numpy()[rows] <= max_rank
+        return self.table.iloc[rows[keep][:n]].reset_index(drop=True)
+
+
+_lock = threading.Lock()
+
+
+@datasets.per_version
+def _indexes(snapshot):
+    return {}
+
+
+def index(metric, snapshot=None):
+    """Der vorberechnete :class:`_Index` für ``metric`` (``'export'``, ``'import'``, ``'handelsvolumen'``)."""
+    snapshot = snapshot or datasets.current()
+    stored = _indexes(snapshot)
+    if metric not in stored:
+        with _lock:
+            if metric not in stored:
+                with datasets.pinned(snapshot):
+                    stored[metric] = _Index(deltas(datasets.get('df_grouped'), metric))
+    return stored[metric]
+
+
+def movers(year, metric, n=10, direction='aufsteiger', max_rank=None):
+    """Die ``n`` größten Auf- bzw. Absteiger eines Jahres (Spalten siehe :data:`COLUMNS`).
+
+    Mit ``max_rank`` nur Länder, die im Jahr mindestens diesen Platz erreichen.
+    """
+    return index(metric).lookup(int(year), n, direction, max_rank)
+
+
+def years(metric='export'):
+    """Jahre mit Platzveränderungen (alle außer dem ersten Jahr der Daten)."""
+    return index(metric).years.tolist()
@@ -0,0 +1,243 @@
+"""Vorberechnete Standardansicht jeder Seite.
+
+Ohne Vorberechnung braucht der erste Aufruf einer Seite zwei Runden: Erst
+liefert ``render_graph`` das Layout, danach berechnen die Callbacks der Seite
+die Figuren für die Standardauswahl (z.B. 2024 oder "Islamische Republik
+Iran"). Mit :func:`layout` enthält das Layout die Ausgaben dieser Callbacks
+bereits; es wird einmal je Datenversion und Seite gebaut und danach aus dem
+Cache geliefert.
+
+Die Callbacks selbst bleiben registriert, der Browser schickt also
+weiterhin ihren ersten Aufruf. Ein vorberechnetes Layout enthält einen
+unsichtbaren ``dcc.Store`` mit dem ``fingerprint`` der Daten, aus denen es
+gebaut wurde; die vorberechneten Callbacks bekommen ihn als zusätzlichen
+``State``, den :func:`_skip_initial_call` vor dem Aufruf wieder entfernt.
+Nur wenn dieser Browser ein vorberechnetes Layout für die aktuellen Daten
+erhalten hat und genau die Standardwerte schickt, wird der erste Aufruf
+ohne Rechnung mit 204 (keine Änderung) beantwortet; ein normales Layout
+(z.B. vor :func:`defer`) oder eines von vor dem Neuladen der Daten rechnet
+wie ohne Vorberechnung. Vorberechnet werden Callbacks, deren Ein- und
+Ausgaben alle im Layout einer Seite liegen und die keinen ``State`` lesen
+(z.B. nicht der Start von Hintergrund-Jobs).
+
+Seiten, deren Daten erst im Hintergrund entstehen, werden mit :func:`defer`
+erst vorberechnet, wenn sie bereit sind; bis dahin gilt das normale
+Layout. Schlägt ein Callback einer Seite bei der Vorberechnung fehl, wird für diese
+Datenversion das normale Layout ausgeliefert und die ersten Aufrufe rechnen
+wie ohne Vorberechnung.
+
+Mit ``PRERENDER=1`` (Standard) werden beim Start alle Seiten im Hintergrund
+vorberechnet; sonst beim ersten Aufruf der jeweiligen Seite.
+"""
+import json
+import logging
+import os
+import threading
+
+import plotly.io.json
+from dash import dcc, html
+from dash.dependencies import ALL, State
+from dash.development.base_component import Component
+from flask import request
+
+from core import datasets
+
+ENABLED = os.environ.get('PRERENDER', '1') == '1'
+
+logger = logging.getLogger(__name__)
+
+_app = None
+_pages = {}  # Seite -> create_layout
+_callbacks = {}  # Seite -> Callback-Spezifikationen mit vorberechneten Ausgaben
+_owners = {}  # Ausgabe eines Callbacks -> Seite
+_conditions = {}  # Seite -> ready(), siehe defer
+_ready = threading.Event()
+_setup_lock = threading.Lock()
+_locks = {}
+
+# Kennzeichnung vorberechneter Layouts, als letzter State jedes vorberechneten Callbacks
+_MARKER = State({'prerender': ALL}, 'data')
+
+
+def _components(layout):
+    """Alle Komponenten mit ``id`` im Layout, nach ``id``."""
+    found = {}
+    stack = [layout]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, (list, tuple)):
+            stack.extend(node)
+        elif isinstance(node, Component):
+            if getattr(node, 'id', None) is not None:
+                found[node.id] = node
+            stack.append(getattr(node, 'children', None))
+    return found
+
+
+def _outputs(spec):
+    # "..a.figure...b.children.." bzw. "a.figure"
+    output = spec['output'].strip('.')
+    return [part.rsplit('.', 1) for part in output.split('...')]
+
+
+def _setup():
+    """Ordnet die Callbacks den Seiten zu.
+
+    Läuft einmal vor der ersten Anfrage, wenn Dash auch die mit
+    ``dash.callback`` registrierten Callbacks übernommen hat.
+    """
+    if _ready.is_set():
+        return
+    with _setup_lock:
+        if _ready.is_set():
+            return
+        for page, create_layout in _pages.items():
+            ids = set(_components(create_layout()))
+            _callbacks[page] = []
+            # Die Callback-Liste ist genau das, was der Browser unter
+            # /_dash-dependencies abruft
+            for spec in _app._callback_list:
+                if (spec.get('clientside_function') or spec['state'] or spec.get('long')
+                        or spec.get('prevent_initial_call')):
+                    continue
+                if all(i['id'] in ids for i in spec['inputs']) and all(o in ids for o, _ in _outputs(spec)):
+                    # Neue Liste: die von Dash beim Aufruf verwendete bleibt unverändert
+                    spec['state'] = spec['state'] + [_MARKER.to_dict()]
+                    _callbacks[page].append(spec)
+                    _owners[spec['output']] = page
+        _ready.set()
+
+
+def register(app, pages):
+    """Aktiviert die Vorberechnung für ``pages`` (Seitenname -> ``create_layout``)."""
+    global _app
+    _app = app
+    _pages.update(pages)
+    _locks.update({page: threading.Lock() for page in pages})
+    app.server.before_request(_setup)
+    app.server.before_request(_skip_initial_call)
+
+
+class _Failed(Exception):
+    """Ein Callback der Seite ließ sich nicht vorberechnen."""
+
+
+def defer(page, ready):
+    """Berechnet ``page`` erst vor, wenn ``ready()`` wahr ist (z.B. Ergebnisse eines Hintergrund-Baus)."""
+    _conditions[page] = ready
+
+
+def _render(page, snapshot):
+    """Layout von ``page`` mit den Ausgaben aller Callbacks und deren Standardeingaben."""
+    root = _pages[page]()
+    components = _components(root)
+    client = _app.server.test_client()
+    defaults = {}
+    for spec in _callbacks[page]:
+        # Standardwerte im Layout können numpy-Zahlen sein
+        values = json.loads(plotly.io.json.to_json_plotly(
+            [getattr(components[i['id']], i['property'], None) for i in spec['inputs']]
+        ))
+        payload = {
+            'output': spec['output'],
+            'inputs': [dict(i, value=value) for i, value in zip(spec['inputs'], values)],
+            'state': [],
+            'changedPropIds': [],
+        }
+        response = client.post('/_dash-update-component', data=json.dumps(payload), content_type='application/json')
+        if response.status_code not in (200, 204):
+            raise _Failed(f'{spec["output"]}: Status {response.status_code}')
+        defaults[spec['output']] = values
+        if response.status_code == 204:
+            continue  # PreventUpdate: Ausgabe bleibt wie im Layout
+        for component_id, props in json.loads(response.get_data())['response'].items():
+            for prop, value in props.items():
+                setattr(components[component_id], prop, value)
+    marker = dcc.Store(id={'prerender': page}, data=snapshot.fingerprint)
+    return html.Div([root, marker]), defaults
+
+
+@datasets.per_version
+def _rendered(snapshot):
+    return {}
+
+
+def _lookup(page, snapshot):
+    """Ergebnis der Vorberechnung von ``page`` (``None`` nach einem Fehler), rechnet bei Bedarf."""
+    rendered = _rendered(snapshot)
+    if page not in rendered:
+        if page in _conditions and not _conditions[page]():
+            return None  # Noch nicht bereit: nicht merken, später erneut versuchen
+        with _locks[page]:
+            if page not in rendered:
+                try:
+                    with datasets.pinned(snapshot):
+                        rendered[page] = _render(page, snapshot)
+                except Exception:
+                    # Für diese Datenversion normales Layout mit ersten Aufrufen
+                    logger.exception('Vorberechnung von %s fehlgeschlagen', page)
+                    rendered[page] = None
+    return rendered[page]
+
+
+def layout(page):
+    """Layout von ``page`` mit vorberechneten Ausgaben (aus dem Cache der Datenversion).
+
+    ``None`` für nicht angemeldete Seiten und wenn die Vorberechnung
+    fehlgeschlagen ist; dann gilt das normale Layout der Seite.
+    """
+    if page not in _pages:
+        return None
+    try:
+        _setup()
+        result = _lookup(page, datasets.current())
+    except Exception:
+        logger.exception('Vorberechnete Ansicht von %s nicht verfügbar', page)
+        return None
+    return result[0] if result else None
+
+
+def _skip_initial_call():
+    """Beantwortet den ersten Aufruf eines vorberechneten Callbacks ohne Rechnung (204).
+
+    Gilt nur, wenn das Layout im Browser für die aktuellen Daten
+    vorberechnet wurde (Kennzeichnung im ``State``) und der Browser genau die
+    Standardwerte schickt, mit denen vorberechnet wurde. Die Kennzeichnung
+    wird in jedem Fall aus der Anfrage entfernt, bevor Dash den Callback
+    aufruft.
+    """
+    if request.method != 'POST' or not request.path.endswith('_dash-update-component'):
+        return None
+    payload = request.get_json(silent=True) or {}
+    page = _owners.get(payload.get('output'))
+    if page is None:
+        return None
+    # Vorberechnete Callbacks haben sonst keinen State; get_json liefert bei
+    # jedem Aufruf dasselbe (hier geänderte) Objekt
+    marker = payload['state'].pop() if payload.get('state') else []
+    if payload.get('changedPropIds'):
+        return None
+    snapshot = datasets.current()
+    if (page, snapshot.fingerprint) not in {(item['id'].get('prerender'), item.get('value')) for item in marker}:
+        return None
+    result = _rendered(snapshot).get(page)
+    if not result:
+        return None
+    values = [i.get('value') for i in payload.get('inputs', [])]
+    if result[1].get(payload['output']) == values:
+        return '', 204
+    return None
+
+
+def build():
+    """Berechnet alle Seiten für die aktuelle Datenversion vor."""
+    # Eine erste Anfrage übernimmt die dash.callback-Callbacks und ruft _setup auf
+    _app.server.test_client().get('/_dash-dependencies')
+    for page in _pages:
+        layout(page)
+
+
+def build_in_background():
+    """Startet :func:`build` in einem Hintergrund-Thread, wenn ``PRERENDER=1``."""
+    if ENABLED:
+        threading.Thread(target=build, name='prerender', daemon=True).start()
@@ -0,0 +1,370 @@
+"""Typisierte Abfragen auf die Datensätze mit austauschbarem Speicher-Backend.
+
+Die Seiten filtern ihre Daten nicht selbst (``df[(df['Land'] == c) &
+(df['Jahr'] == y)]``), sondern rufen fachliche Abfragen auf::
+
+    queries.monthly('Frankreich', 2024)        # Monatswerte eines Landes
+    queries.yearly_by_good(['Kaffee', 'Tee'])  # Jahressummen je Ware
+    queries.top_n('export', 2024, 10, by='Land')
+    queries.yoy('Frankreich', 2024)            # Waren im Vergleich zum Vorjahr
+
+Alle Abfragen bauen auf einer einzigen Grundoperation auf,
+``Backend.rows(datensatz, where, columns)``. ``where`` bildet Spalten auf
+einen Wert (``=``), eine Liste von Werten (``IN``) oder einen ``range``
+(Bereich) ab. Jedes Backend liefert dieselben Zeilen in der Reihenfolge des
+Datensatzes mit fortlaufendem Index; die Figuren sind daher unabhängig vom
+Backend identisch.
+
+Backends (Auswahl über ``DATA_BACKEND``, zur Laufzeit mit :func:`use`):
+
+* ``pandas`` (Standard) – Zeilenmasken auf den DataFrames des Snapshots
+* ``mmap`` – jede Spalte als NumPy-Datei unter ``data/.cache``, per
+  ``np.load(mmap_mode='r')`` eingeblendet; Textspalten als Kategorie-Codes
+  mit vorsortiertem Zeilenindex je Wert
+* ``sqlite`` – die Datenbank aus :mod:`core.database`
+
+Ein Vergleich der Backends steht in ``benchmark_queries.py``.
+"""
+import hashlib
+import os
+import threading
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from core import database, datasets, schema
+
+# Spalten je Kennzahl in den verschiedenen Datensätzen
+METRICS = {
+    'export': {'wert': 'export_wert', 'handel': 'Ausfuhr: Wert'},
+    'import': {'wert': 'import_wert', 'handel': 'Einfuhr: Wert'},
+    'handelsvolumen': {'wert': 'handelsvolumen_wert', 'handel': 'Handelsvolumen'},
+}
+
+
+def _is_list(value):
+    return isinstance(value, (list, tuple, set, np.ndarray, pd.Index))
+
+
+def _where(**conditions):
+    # Nicht gesetzte Filter (None) filtern nicht
+    return {column: value for column, value in conditions.items() if value is not None}
+
+
+# ---------------- Backends ------------------
+
+class PandasBackend:
+    """Filtert die DataFrames des aktuellen Snapshots über Zeilenmasken."""
+
+    name = 'pandas'
+
+    def rows(self, dataset, where=None, columns=None):
+        df = datasets.get(dataset)
+        mask = np.ones(len(df), dtype=bool)
+        for column, value in (where or {}).items():
+            values = df[column]
+            if isinstance(value, range):
+                mask &= values.between(value.start, value.stop - 1).to_numpy()
+            elif _is_list(value):
+                mask &= values.isin(list(value)).to_numpy()
+            else:
+                mask &= (values == value).to_numpy()
+        columns = list(columns) if columns else list(df.columns)
+        return df.loc[mask, columns].reset_index(drop=True)
+
+
+class _Arrays:
+    """Spalten eines Datensatzes als eingeblendete NumPy-Arrays."""
+
+    def __init__(self, path):
+        meta = pd.read_pickle(os.path.join(path, 'meta.pkl'))
+        self.columns = meta['columns']
+        self.dtypes = meta['dtypes']
+        self.categories = meta['categories']
+        self.length = meta['length']
+        self.values = {}
+        self.order = {}
+        self.offsets = {}
+        for i, column in enumerate(self.columns):
+            self.values[column] = np.load(os.path.join(path, f'{i}.npy'), mmap_mode='r')
+            if column in self.categories:
+                self.order[column] = np.load(os.path.join(path, f'{i}.order.npy'), mmap_mode='r')
+                self.offsets[column] = np.load(os.path.join(path, f'{i}.offsets.npy'))
+        self.lookup = {
+            column: {value: code for code, value in enumerate(categories)}
+            for column, categories in self.categories.items()
+        }
+
+    def codes(self, column, value):
+        lookup = self.lookup[column]
+        values = list(value) if _is_list(value) else [value]
+        return sorted({lookup[v] for v in values if _hashable(v) and v in lookup})
+
+    def category_rows(self, column, value):
+        # Zeilen je Code liegen im vorsortierten Index hintereinander (aufsteigend)
+        order, offsets = self.order[column], self.offsets[column]
+        parts = [order[offsets[code]:offsets[code + 1]] for code in self.codes(column, value)]
+        if not parts:
+            return np.empty(0, dtype=np.int64)
+        return parts[0] if len(parts) == 1 else np.sort(np.concatenate(parts))
+
+    def mask(self, column, value, rows):
+        values = self.values[column] if rows is None else self.values[column][rows]
+        if column in self.categories:
+            return np.isin(values, self.codes(column, value))
+        if isinstance(value, range):
+            return (values >= value.start) & (values <= value.stop - 1)
+        if _is_list(value):
+            return np.isin(values, list(value))
+        return values == value
+
+    def frame(self, rows, columns):
+        data = {}
+        for column in columns:
+            values = self.values[column] if rows is None else self.values[column][rows]
+            if column in self.categories:
+                # Code -1 (fehlender Wert) trifft das angehängte NaN
+                categories = np.append(self.categories[column], np.nan).astype(object)
+                values = categories[values]
+            data[column] = pd.Series(np.array(values), dtype=self.dtypes[column])
+        return pd.DataFrame(data, columns=columns)
+
+
+def _hashable(value):
+    try:
+        hash(value)
+    except TypeError:
+        return False
+    return True
+
+
+class ArrayBackend:
+    """Liest Spalten aus eingeblendeten NumPy-Dateien (``mmap``).
+
+    Je Datensatz und Inhalt wird einmal ein Verzeichnis unter
+    :data:`ROOT` geschrieben; alle Worker blenden dieselben Dateien ein
+    und teilen sich den Seiten-Cache des Betriebssystems. Textspalten
+    werden als Kategorie-Codes gespeichert, zusammen mit einem stabil
+    sortierten Zeilenindex je Code: Ein Filter auf ``Land`` oder ``Label``
+    liest nur die Zeilen dieses Werts statt die ganze Spalte.
+    """
+
+    name = 'mmap'
+    ROOT = os.path.join(datasets.CACHE_DIR, f'arrays.v{schema.SCHEMA_VERSION}')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tables = datasets.per_version(lambda snapshot: {})
+
+    @staticmethod
+    def _fingerprint(df):
+        digest = hashlib.sha1(pd.util.hash_pandas_object(df, index=False).to_numpy()).hexdigest()
+        return f'{digest[:16]}.{len(df)}'
+
+    def _write(self, df, path):
+        tmp_path = f'{path}.{uuid.uuid4().hex}.tmp'
+        os.makedirs(tmp_path)
+        meta = {'columns': list(df.columns), 'dtypes': {}, 'categories': {}, 'length': len(df)}
+        for i, column in enumerate(df.columns):
+            values = df[column].to_numpy()
+            meta['dtypes'][column] = df[column].dtype
+            if values.dtype == object:
+                codes, categories = pd.factorize(values)
+                values = codes.astype(np.int32)
+                order = np.argsort(values, kind='stable')
+                # offsets[c]:offsets[c + 1] sind die Zeilen mit Code c (ohne -1)
+                offsets = np.searchsorted(values[order], np.arange(len(categories) + 1))
+                meta['categories'][column] = np.asarray(categories, dtype=object)
+                np.save(os.path.join(tmp_path, f'{i}.order.npy'), order)
+                np.save(os.path.join(tmp_path, f'{i}.offsets.npy'), offsets)
+            np.save(os.path.join(tmp_path, f'{i}.npy'), np.ascontiguousarray(values))
+        pd.to_pickle(meta, os.path.join(tmp_path, 'meta.pkl'))
+        try:
+            os.replace(tmp_path, path)
+        except OSError:
+            # Ein anderer Worker hat dasselbe Verzeichnis gerade geschrieben
+            for filename in os.listdir(tmp_path):
+                os.remove(os.path.join(tmp_path, filename))
+            os.rmdir(tmp_path)
+
+    def table(self, dataset):
+        """Die Arrays eines Datensatzes im aktuellen Snapshot (bei Bedarf geschrieben)."""
+        tables = self._tables(datasets.current())
+        if dataset not in tables:
+            with self._lock:
+                if dataset not in tables:
+                    df = datasets.get(dataset)
+                    path = os.path.join(self.ROOT, f'{dataset}.{self._fingerprint(df)}')
+                    if not os.path.exists(path):
+                        os.makedirs(self.ROOT, exist_ok=True)
+                        self._write(df, path)
+                    tables[dataset] = _Arrays(path)
+        return tables[dataset]
+
+    def rows(self, dataset, where=None, columns=None):
+        table = self.table(dataset)
+        where = dict(where or {})
+
+        # Mit dem kleinsten Kategorie-Filter beginnen, die übrigen nur auf dessen Zeilen prüfen
+        rows = None
+        indexed = [column for column in where if column in table.categories]
+        if indexed:
+            candidates = [table.category_rows(column, where[column]) for column in indexed]
+            best = min(range(len(indexed)), key=lambda i: len(candidates[i]))
+            rows = np.asarray(candidates[best])
+            del where[indexed[best]]
+        if where:
+            mask = np.ones(table.length if rows is None else len(rows), dtype=bool)
+            for column, value in where.items():
+                mask &= table.mask(column, value, rows)
+            rows = np.flatnonzero(mask) if rows is None else rows[mask]
+        return table.frame(rows, list(columns) if columns else table.columns)
+
+
+class SqliteBackend:
+    """Liest über :func:`core.database.select` aus der gemeinsamen SQLite-Datei."""
+
+    name = 'sqlite'
+
+    def rows(self, dataset, where=None, columns=None):
+        where = {column: list(value) if _is_list(value) else value for column, value in (where or {}).items()}
+        df = database.select(dataset, columns=list(columns) if columns else None, where=where)
+        # SQLite kennt nur 64-Bit-Zahlen; Datentypen wie im DataFrame herstellen
+        dtypes = datasets.get(dataset).dtypes
+        df = df.astype({column: dtypes[column] for column in df.columns if dtypes[column] != object})
+        return df.reset_index(drop=True)
+
+
+BACKENDS = {
+    'pandas': PandasBackend,
+    'mmap': ArrayBackend,
+    'sqlite': SqliteBackend,
+}
+
+_backend = None
+
+
+def use(name):
+    """Wählt das Backend für alle folgenden Abfragen (``pandas``, ``mmap`` oder ``sqlite``)."""
+    global _backend
+    if name not in BACKENDS:
+        raise ValueError(f"Unbekanntes Backend: {name!r} (erlaubt: {', '.join(BACKENDS)})")
+    _backend = BACKENDS[name]()
+    return _backend
+
+
+def backend():
+    """Das aktive Backend (beim ersten Aufruf aus ``DATA_BACKEND``)."""
+    return _backend or use(os.environ.get('DATA_BACKEND', 'pandas'))
+
+
+def rows(dataset, where=None, columns=None):
+    """Zeilen aus ``dataset``, gefiltert nach ``where`` (siehe Modulbeschreibung)."""
+    return backend().rows(dataset, where, columns)
+
+
+def table(dataset):
+    """Der ganze Datensatz, für Berechnungen über alle Zeilen (z.B. Rankings)."""
+    return rows(dataset)
+
+
+# ---------------- Länder ------------------
+
+def country_years(country, years=None):
+    """Jahreswerte aus ``df_grouped`` für ein Land (oder eine Liste von Ländern)."""
+    return rows('df_grouped', _where(Land=country, Jahr=years))
+
+
+def partners(year):
+    """Alle Handelspartner in ``year`` aus ``df_grouped``."""
+    return rows('df_grouped', {'Jahr': year})
+
+
+def monthly(country, year):
+    """Monatswerte des Handels mit ``country`` in ``year``.
+
+    Mit ``country=None`` die Monatswerte Deutschlands insgesamt. Land und
+    Jahr dürfen auch Listen sein (Stapelabfragen).
+    """
+    if country is None:
+        return rows('gesamt_deutschland_monthly', {'Jahr': year})
+    return rows('trade_spec_country_and_year', {'Land': country, 'Jahr': year})
+
+
+# ---------------- Waren ------------------
+
+def goods(year=None, good=None):
+    """Monatswerte je Ware für Deutschland insgesamt (``aggregated_df``)."""
+    return rows('aggregated_df', _where(Jahr=year, Label=good))
+
+
+def yearly_by_good(good):
+    """Jahressummen von Aus- und Einfuhr je Ware (Ware oder Liste von Waren)."""
+    df = goods(good=good)
+    return df.groupby(['Jahr', 'Label'], as_index=False).agg({'Ausfuhr: Wert': 'sum', 'Einfuhr: Wert': 'sum'})
+
+
+def country_goods(country=None, good=None, year=None):
+    """Warenwerte je Land und Jahr (``top10_goods_spec_country_and_year``)."""
+    return rows('top10_goods_spec_country_and_year', _where(Land=country, Label=good, Jahr=year))
+
+
+def details(year, good, country=None):
+    """Monatliche Einzelwerte aus den Handelsdaten."""
+    return rows('handelsdaten', _where(Jahr=year, Label=good, Land=country))
+
+
+# ---------------- Auswertungen ------------------
+
+def top_n(metric, year, n, by='Land', country=None, good=None):
+    """Die ``n`` größten Handelspartner (``by='Land'``) bzw. Waren (``by='Label'``).
+
+    ``metric`` ist ``export``, ``import`` oder ``handelsvolumen``.
+
+    * ``by='Land'``: Partner Deutschlands nach der Rangspalte in
+      ``df_grouped``, mit ``good`` die Partner für diese Ware.
+    * ``by='Label'``: Waren Deutschlands insgesamt, mit ``country`` die
+      Waren im Handel mit diesem Land. Ohne ``year`` über alle Jahre.
+
+    Ergebnis absteigend nach der Kennzahl sortiert.
+    """
+    column = METRICS[metric]['handel']
+    if by == 'Land' and good is None:
+        column = METRICS[metric]['wert']
+        df = partners(year)
+        # Gleichstände ergeben wie im Ranking mehr als n Zeilen
+        return df.loc[df[f'{metric}_ranking'] <= n, ['Land', column]].sort_values(by=column, ascending=False)
+    if by == 'Land':
+        df = country_goods(good=good, year=year)
+    elif by == 'Label' and country is None:
+        df = goods(year=year).groupby(['Jahr', 'Code', 'Label'], as_index=False).agg({'Ausfuhr: Wert': 'sum', 'Einfuhr: Wert': 'sum'})
+        df['Handelsvolumen'] = df['Ausfuhr: Wert'] + df['Einfuhr: Wert']
+    elif by == 'Label' and year is None:
+        df = rows('top10_goods_spec_country', {'Land': country})
+        df = df.groupby(['Code', 'Label'], as_index=False).agg({'Ausfuhr: Wert': 'sum', 'Einfuhr: Wert': 'sum'})
+    elif by == 'Label':
+        df = country_goods(country=country, year=year).groupby('Label', as_index=False).agg({'Ausfuhr: Wert': 'sum', 'Einfuhr: Wert': 'sum'})
+    else:
+        raise ValueError(f"Unbekannte Gruppierung: {by!r} (erlaubt: 'Land', 'Label')")
+    return df.sort_values(by=column, ascending=False).head(n)
+
+
+def yoy(country, year):
+    """Aus- und Einfuhr je Ware in ``year`` neben dem Vorjahr.
+
+    Spalten ``Label``, ``Ausfuhr: Wert_current``, ``Ausfuhr: Wert_previous``
+    usw. Für ein Land fehlen Waren ohne Handel in einem der Jahre nicht,
+    sondern stehen mit 0 in der Tabelle; für Deutschland insgesamt
+    (``country=None``) nur Waren, die in beiden Jahren vorkommen.
+    """
+    if country is None:
+        df = rows('df_reduced', {'Jahr': [year, year - 1]})
+        return pd.merge(df[df['Jahr'] == year], df[df['Jahr'] == year - 1], on='Label', suffixes=('_current', '_previous'))
+
+    df = country_goods(country=country, year=[year, year - 1])
+    current, previous = [
+        df[df['Jahr'] == y].groupby('Label', as_index=False).agg({'Ausfuhr: Wert': 'sum', 'Einfuhr: Wert': 'sum'})
+        for y in (year, year - 1)
+    ]
+    return pd.merge(current, previous, on='Label', suffixes=('_current', '_previous'), how='outer').fillna(0)
@@ -0,0 +1,126 @@
+"""Vektorisierte Rankings je Jahr für beliebige Kennzahlen.
+
+Ersetzt die extern vorberechneten Spalten ``*_ranking`` und
+``*_wachstum_ranking`` in ``df_grouped``: Plätze werden innerhalb jeder
+Gruppe (standardmäßig je ``Jahr``) mit einer einzigen Sortierung über alle
+Gruppen vergeben, ohne Python-Schleife über Jahre oder Länder. Damit lassen
+sich Rankings auch für Teilmengen (z.B. nur EU-Länder) oder eigene
+Kennzahlen wie ``handelsbilanz`` interaktiv berechnen.
+
+Regeln bei Gleichstand (wie bei ``pandas.Series.rank``):
+
+* ``average`` – Mittelwert der belegten Plätze (Standard, wie die CSV-Daten)
+* ``min`` – niedrigster Platz (1, 2, 2, 4)
+* ``max`` – höchster Platz (1, 3, 3, 4)
+* ``dense`` – Plätze ohne Lücken (1, 2, 2, 3)
+* ``first`` – Reihenfolge im DataFrame entscheidet
+"""
+import numpy as np
+import pandas as pd
+
+TIE_METHODS = ('average', 'min', 'max', 'dense', 'first')
+
+# EU-Mitgliedstaaten (ohne Deutschland) in der Schreibweise der Daten
+EU_LAENDER = [
+    'Belgien (ab 1999)', 'Bulgarien', 'Dänemark', 'Estland (ab 1992)', 'Finnland',
+    'Frankreich', 'Griechenland', 'Irland', 'Italien', 'Kroatien (ab 05/1992)',
+    'Lettland (ab 1992)', 'Litauen (ab 1992)', 'Luxemburg (ab 1999)', 'Malta',
+    'Niederlande', 'Österreich', 'Polen', 'Portugal', 'Rumänien', 'Schweden',
+    'Slowakei (ab 1993)', 'Slowenien (ab 05/1992)', 'Spanien', 'Tschechien (ab 1993)',
+    'Ungarn', 'Zypern',
+]
+
+# Vordefinierte Teilmengen für Ranking-Auswahlen (None = alle Länder)
+SUBSETS = {
+    'alle': None,
+    'eu': EU_LAENDER,
+}
+
+
+def rank_values(values, groups=None, ascending=False, method='average'):
+    """Vergibt Plätze für ``values`` innerhalb von ``groups``.
+
+    ``values`` und ``groups`` sind gleich lange Arrays; ohne ``groups`` wird
+    über alle Werte gerankt. Fehlende Werte (NaN) erhalten keinen Platz.
+    Gibt ein ``float64``-Array zurück (wie ``pandas.Series.rank``).
+    """
+    if method not in TIE_METHODS:
+        raise ValueError(f"Unbekannte Regel bei Gleichstand: {method!r} (erlaubt: {', '.join(TIE_METHODS)})")
+
+    values = np.asarray(values, dtype=np.float64)
+    if groups is None:
+        codes = np.zeros(len(values), dtype=np.int64)
+    else:
+        codes = pd.factorize(np.asarray(groups))[0]
+
+    result = np.full(len(values), np.nan)
+    valid = np.flatnonzero(~np.isnan(values))
+    if not len(valid):
+        return result
+
+    keys = values[valid] if ascending else -values[valid]
+    # lexsort ist stabil: bei Gleichstand bleibt die ursprüngliche Reihenfolge ('first')
+    order = valid[np.lexsort((keys, codes[valid]))]
+    sorted_codes = codes[order]
+    sorted_values = values[order]
+
+    n = len(order)
+    positions = np.arange(n)
+    new_group = np.empty(n, dtype=bool)
+    new_group[0] = True
+    new_group[1:] = sorted_codes[1:] != sorted_codes[:-1]
+    group_start = np.maximum.accumulate(np.where(new_group, positions, 0))
+    position = positions - group_start
+
+    if method == 'first':
+        ranks = position + 1.0
+    else:
+        new_run = new_group.copy()
+        new_run[1:] |= sorted_values[1:] != sorted_values[:-1]
+        run_id = np.cumsum(new_run) - 1
+        run_start = position[new_run]
+        # Letzter Platz eines Gleichstands: Ende der Gruppe oder Beginn des nächsten Laufs - 1
+        last_in_run = np.append(new_run[1:], True)
+        run_end = position[last_in_run]
+
+        if method == 'min':
+            ranks = run_start[run_id] + 1.0
+        elif method == 'max':
+            ranks = run_end[run_id] + 1.0
+        elif method == 'average':
+            ranks = (run_start[run_id] + run_end[run_id]) / 2 + 1.0
+        else:  # dense
+            dense = np.cumsum(new_run)
+            ranks = (dense - np.maximum.accumulate(np.where(new_group, dense, 0)) + 1).astype(np.float64)
+
+    result[order] = ranks
+    return result
+
+
+def rank(df, metric, by='Jahr', ascending=False, method='average', countries=None):
+    """Ranking einer Kennzahl je Gruppe (Standard: je Jahr, größter Wert = Platz 1).
+
+    ``metric`` ist ein Spaltenname. Mit ``countries`` wird nur innerhalb
+    dieser Länder gerankt (z.B. :data:`EU_LAENDER`); alle übrigen Zeilen
+    erhalten NaN. Gibt eine Series mit dem Index von ``df`` zurück.
+    """
+    values = df[metric].to_numpy(dtype=np.float64)
+    if countries is not None:
+        values = np.where(df['Land'].isin(countries).to_numpy(), values, np.nan)
+    groups = df[by].to_numpy() if by is not None else None
+    ranks = rank_values(values, groups, ascending=ascending, method=method)
+    return pd.Series(ranks, index=df.index, name=f'{metric}_ranking')
+
+
+def rank_table(df, metrics, by='Jahr', ascending=False, method='average', countries=None, suffix='_ranking'):
+    """Rankings mehrerer Kennzahlen auf einmal.
+
+    Gibt einen DataFrame mit je einer Spalte ``<metric><suffix>`` zurück; bei
+    ``countries`` enthält er nur die Zeilen dieser Länder.
+    """
+    if countries is not None:
+        df = df[df['Land'].isin(countries)]
+    table = pd.DataFrame(index=df.index)
+    for metric in metrics:
+        table[f'{metric}{suffix}'] = rank(df, metric, by=by, ascending=ascending, method=method)
+    return table
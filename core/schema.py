@@ -0,0 +1,157 @@
+"""Schema der Datensätze: Einheiten und Datentypen der Spalten.
+
+Alle Geldbeträge werden beim Laden einmal in die kanonische Einheit Euro
+umgerechnet. Die Quell-Einheit jeder Spalte ist hier deklariert, damit kein
+Seitenmodul mehr selbst mit 1000 multiplizieren oder eine eigene Kopie der
+Wertspalten anlegen muss. Nur Spalten in Tausend Euro werden dabei wie
+bisher in den Seiten gerundet und fehlende Werte als 0 behandelt; Spalten in
+Euro werden nur dann zu ``int64``, wenn das verlustfrei möglich ist, und
+behalten sonst ihre Lücken und Nachkommastellen.
+
+Die übrigen Zahlenspalten werden beim Laden auf den kleinsten sicheren
+Datentyp verkleinert (:func:`downcast`): Jahre ``int16``, Monate ``int8``,
+Plätze ``int32`` (bzw. ``float32`` bei halben Plätzen oder Lücken) und
+Wachstumsraten ``float32``. Geldspalten behalten 64 Bit, damit Summen
+nicht überlaufen.
+"""
+import numpy as np
+
+# Ändern, sobald sich das Schema ändert: macht den binären Cache ungültig
+SCHEMA_VERSION = 3
+
+CANONICAL_UNIT = 'EUR'
+CANONICAL_DTYPE = np.int64
+
+# Umrechnungsfaktoren in die kanonische Einheit
+UNIT_FACTORS = {
+    'EUR': 1,
+    'TEUR': 1000,
+}
+
+_HANDEL = ['Ausfuhr: Wert', 'Einfuhr: Wert']
+_WERTE = ['export_wert', 'import_wert', 'handelsvolumen_wert']
+
+# Datensatz -> {Spalte: Quell-Einheit}
+MONETARY_COLUMNS = {
+    'gesamt_deutschland': dict.fromkeys(['gesamt_export', 'gesamt_import', 'gesamt_handelsvolumen'], 'EUR'),
+    'gesamt_deutschland_monthly': dict.fromkeys(_WERTE, 'EUR'),
+    'df_grouped': dict.fromkeys(
+        _WERTE + ['handelsbilanz', 'export_differenz', 'import_differenz', 'handelsvolumen_differenz'], 'EUR'
+    ),
+    'df_reduced': dict.fromkeys(_HANDEL, 'EUR'),
+    'aggregated_df': dict.fromkeys(_HANDEL + ['Handelsvolumen'], 'EUR'),
+    'top10_goods_spec_country': dict.fromkeys(_HANDEL, 'EUR'),
+    'trade_spec_country_and_year': dict.fromkeys(_WERTE, 'EUR'),
+    # Diese Datei liefert Tausend Euro
+    'top10_goods_spec_country_and_year': dict.fromkeys(_HANDEL, 'TEUR'),
+    'handelsdaten': dict.fromkeys(_HANDEL, 'EUR'),
+}
+
+
+# Spalte -> Ganzzahltyp (nur ohne fehlende Werte und im Wertebereich)
+INTEGER_COLUMNS = {
+    'Jahr': np.int16,
+    'Monat': np.int8,
+}
+RANK_DTYPE = np.int32
+RANK_SUFFIX = '_ranking'
+# Wachstumsraten in Prozent; float32 hält rund 7 gültige Stellen
+GROWTH_DTYPE = np.float32
+GROWTH_SUFFIX = '_wachstum'
+
+
+def unit(name, column):
+    """Einheit einer Spalte nach der Normalisierung (``None`` für Nicht-Geldspalten)."""
+    return CANONICAL_UNIT if column in MONETARY_COLUMNS.get(name, {}) else None
+
+
+def normalize(name, df):
+    """Rechnet alle Geldspalten eines Datensatzes in Euro um.
+
+    Spalten in Tausend Euro werden wie bisher in den Seitenmodulen mit 0 für
+    fehlende Werte umgerechnet und als ganze Euro (int64) gespeichert.
+    Spalten in Euro bleiben unverändert, außer sie sind lückenlos
+    ganzzahlig und werden dann verlustfrei zu int64. Die Umrechnung erfolgt
+    spaltenweise in-place auf dem frisch geladenen DataFrame, es entsteht
+    keine zusätzliche Kopie des gesamten Frames.
+    """
+    for column, source_unit in MONETARY_COLUMNS.get(name, {}).items():
+        if column not in df.columns:
+            continue
+        factor = UNIT_FACTORS[source_unit]
+        if factor != 1:
+            df[column] = (df[column].fillna(0) * factor).round().astype(CANONICAL_DTYPE)
+        elif df[column].dtype != CANONICAL_DTYPE and _fits(df[column], CANONICAL_DTYPE):
+            df[column] = df[column].astype(CANONICAL_DTYPE)
+    return downcast(name, df)
+
+
+def _fits(values, dtype):
+    if values.isna().any():
+        return False
+    info = np.iinfo(dtype)
+    return bool(((values % 1 == 0) & values.between(info.min, info.max)).all())
+
+
+def _target_dtype(column, values):
+    """Kleinster sicherer Datentyp für ``values`` (``None``: unverändert lassen)."""
+    if values.dtype.kind not in 'iuf':
+        return None
+    if column in INTEGER_COLUMNS:
+        return INTEGER_COLUMNS[column] if _fits(values, INTEGER_COLUMNS[column]) else None
+    if column.endswith(RANK_SUFFIX):
+        if _fits(values, RANK_DTYPE):
+            return RANK_DTYPE
+        # Halbe Plätze (Gleichstand) und Lücken sind in float32 exakt darstellbar
+        if ((values.dropna() * 2) % 1 == 0).all() and values.abs().max() < 2 ** 23:
+            return np.float32
+        return None
+    if column.endswith(GROWTH_SUFFIX):
+        return GROWTH_DTYPE
+    return None
+
+
+def downcast(name, df):
+    """Verkleinert die Zahlenspalten eines Datensatzes auf den kleinsten sicheren Datentyp.
+
+    Spalten, die nicht in ihren Zieltyp passen (z.B. fehlende Jahre), bleiben
+    unverändert. Wie :func:`normalize` spaltenweise in-place.
+    """
+    for column in df.columns:
+        if column in MONETARY_COLUMNS.get(name, {}):
+            continue
+        dtype = _target_dtype(column, df[column])
+        if dtype is not None and df[column].dtype != dtype:
+            df[column] = df[column].astype(dtype)
+    return df
+
+
+def memory_usage(df):
+    """Speicherbedarf von ``df`` in Bytes: ``(vorher, nachher)``.
+
+    ``vorher`` ist der Bedarf mit den 64-Bit-Zahlentypen, die das Einlesen
+    der CSV-Dateien liefert, ``nachher`` der tatsächliche Bedarf.
+    """
+    after = int(df.memory_usage(index=True, deep=True).sum())
+    before = after + sum(
+        len(df) * (8 - df[column].dtype.itemsize)
+        for column in df.columns if df[column].dtype.kind in 'iuf'
+    )
+    return before, after
+
+
+def denormalize(name, df):
+    """Gegenstück zu :func:`normalize`: rechnet Geldspalten in die Quell-Einheit zurück.
+
+    Wird beim Zurückschreiben der CSV-Dateien verwendet und gibt eine Kopie
+    zurück. Ganzzahlige Ergebnisse bleiben ganzzahlig.
+    """
+    df = df.copy()
+    for column, source_unit in MONETARY_COLUMNS.get(name, {}).items():
+        if column not in df.columns or UNIT_FACTORS[source_unit] == 1:
+            continue
+        values = df[column] / UNIT_FACTORS[source_unit]
+        if (values % 1 == 0).all():
+            values = values.astype(CANONICAL_DTYPE)
+        df[column] = values
+    return df
@@ -0,0 +1,187 @@
+"""Serverseitige Suche über Länder- und Warennamen.
+
+Die Länder- und Warenauswahlen haben bisher alle Optionen (rund 240 Länder
+bzw. 100 lange Warenbezeichnungen) im Layout jeder Seite mitgeschickt.
+Mit :func:`dropdown` enthält das Layout nur noch die gewählten Werte und
+die ersten Einträge; beim Tippen liefert ein Callback passende Optionen aus
+einem vorab gebauten Index nach. Derselbe Index steht unter
+``GET /api/search?dataset=...&spalte=...&q=...`` zur Verfügung.
+
+Der Index je Datensatz und Spalte wird einmal je Datenversion gebaut und
+kombiniert
+
+* eine Präfixsuche an allen Wortanfängen (sortierte Liste + ``bisect``) und
+* eine unscharfe Suche über Trigramme (Tippfehler, Wortteile).
+
+Verglichen wird ohne Groß-/Kleinschreibung und ohne Umlaute: "oster",
+"Öster" und "Oesterreich" finden alle "Österreich".
+"""
+import bisect
+import re
+import threading
+import unicodedata
+from collections import defaultdict
+
+from dash import dcc
+from dash.dependencies import Input, Output, State
+from dash.exceptions import PreventUpdate
+from flask import abort, jsonify, request
+
+from core import datasets
+
+# Durchsuchbare Spalten (nur Namen, keine Werte)
+COLUMNS = ('Land', 'Label')
+
+# Maximale Anzahl Treffer je Suche bzw. Optionen ohne Suchbegriff
+LIMIT = 30
+
+# Mindestanteil gemeinsamer Trigramme für unscharfe Treffer
+MIN_SIMILARITY = 0.4
+
+_UMSCHREIBUNGEN = str.maketrans({'ß': 'ss'})
+_DIGRAPHEN = re.compile(r'([aou])e')
+
+
+def fold(text):
+    """Normalform für den Vergleich: klein, ohne Akzente, ``ae/oe/ue`` wie ``a/o/u``."""
+    text = unicodedata.normalize('NFKD', str(text).casefold().translate(_UMSCHREIBUNGEN))
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return _DIGRAPHEN.sub(r'\1', text)
+
+
+def _trigrams(text):
+    padded = f'  {text} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class Index:
+    """Such-Index über eine Liste von Namen."""
+
+    def __init__(self, names):
+        self.names = sorted({str(name) for name in names})
+        self.folded = [fold(name) for name in self.names]
+
+        # Präfixsuche: jeder Wortanfang als Schlüssel auf den Namen
+        starts = sorted(
+            (folded[match.start():], i)
+            for i, folded in enumerate(self.folded)
+            for match in re.finditer(r'\w+', folded)
+        )
+        self.prefix_keys = [key for key, _ in starts]
+        self.prefix_ids = [i for _, i in starts]
+
+        self.trigrams = defaultdict(list)
+        for i, folded in enumerate(self.folded):
+            for trigram in _trigrams(folded):
+                self.trigrams[trigram].append(i)
+
+    def search(self, query, limit=LIMIT):
+        """Namen passend zu ``query``, beste Treffer zuerst."""
+        query = fold(query).strip()
+        if not query:
+            return self.names[:limit]
+
+        # Rang 0: Name beginnt mit der Eingabe, 1: ein Wort beginnt damit
+        scores = {}
+        lo = bisect.bisect_left(self.prefix_keys, query)
+        hi = bisect.bisect_left(self.prefix_keys, query + '\uffff')
+        for i in self.prefix_ids[lo:hi]:
+            scores[i] = (0 if self.folded[i].startswith(query) else 1, 0.0)
+
+        # Rang 2: unscharfe Treffer nach Anteil gemeinsamer Trigramme
+        query_trigrams = _trigrams(query)
+        shared = defaultdict(int)
+        for trigram in query_trigrams:
+            for i in self.trigrams.get(trigram, ()):
+                shared[i] += 1
+        for i, count in shared.items():
+            similarity = count / len(query_trigrams)
+            if i not in scores and similarity >= MIN_SIMILARITY:
+                scores[i] = (2, -similarity)
+
+        ranked = sorted(scores, key=lambda i: (scores[i], self.folded[i]))
+        return [self.names[i] for i in ranked[:limit]]
+
+
+_lock = threading.Lock()
+
+
+@datasets.per_version
+def _indexes(snapshot):
+    # Wird bei der ersten Suche je Datensatz und Spalte gefüllt
+    return {}
+
+
+def index(dataset, column):
+    """Such-Index über ``column`` von ``dataset`` im aktuellen Snapshot."""
+    if dataset not in datasets.DATASETS or column not in COLUMNS:
+        raise KeyError((dataset, column))
+    indexes = _indexes()
+    key = (dataset, column)
+    if key not in indexes:
+        with _lock:
+            if key not in indexes:
+                indexes[key] = Index(datasets.get(dataset)[column].dropna().unique())
+    return indexes[key]
+
+
+def _options(names, search_value=None):
+    # Dash filtert die Optionen zusätzlich im Browser; "search" sorgt dafür,
+    # dass auch Treffer ohne Umlaute oder mit Tippfehlern sichtbar bleiben
+    return [
+        {'label': name, 'value': name, 'search': f'{name} {fold(name)} {search_value or ""}'}
+        for name in names
+    ]
+
+
+def _selected(value):
+    if value is None:
+        return []
+    return list(value) if isinstance(value, (list, tuple)) else [value]
+
+
+def options(dataset, column, value=None, search_value=None):
+    """Optionen für ``value`` und die besten Treffer zu ``search_value``.
+
+    Auch für Callbacks, die den Wert eines solchen Dropdowns setzen: Werte
+    ohne passende Option zeigt ``dcc.Dropdown`` nicht an.
+    """
+    # Gewählte Werte müssen in den Optionen bleiben
+    names = _selected(value)
+    names += [name for name in index(dataset, column).search(search_value or '') if name not in names]
+    return _options(names, search_value)
+
+
+def dropdown(id, dataset, column, value=None, **kwargs):
+    """``dcc.Dropdown`` ohne vollständige Optionsliste (siehe :func:`register_dropdown`)."""
+    return dcc.Dropdown(id=id, options=options(dataset, column, value), value=value, **kwargs)
+
+
+def register_dropdown(app, id, dataset, column):
+    """Lädt die Optionen des Dropdowns ``id`` beim Tippen vom Server nach."""
+
+    @app.callback(
+        Output(id, 'options'),
+        Input(id, 'search_value'),
+        State(id, 'value'),
+        prevent_initial_call=True,
+    )
+    def search_options(search_value, value):
+        if search_value is None:
+            raise PreventUpdate
+        return options(dataset, column, value, search_value)
+
+
+def register_routes(server):
+    """Registriert ``GET /api/search`` auf ``server`` (``app.server``)."""
+
+    @server.route('/api/search')
+    def api_search():
+        dataset = request.args.get('dataset', '')
+        column = request.args.get('spalte', 'Land')
+        try:
+            limit = min(int(request.args.get('limit', LIMIT)), 200)
+            search_index = index(dataset, column)
+        except (KeyError, ValueError):
+            abort(404)
+        return jsonify({'treffer': search_index.search(request.args.get('q', ''), limit)})
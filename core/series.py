@@ -0,0 +1,146 @@
+"""Monatliche Zeitreihen aller Länder und Waren als dichte Matrix.
+
+Für Auswertungen über alle Reihen (Prognosen, Zerlegungen, Korrelationen)
+werden die Monatswerte einmal je Datenversion in eine Matrix
+``Reihe × Monat`` umgeformt::
+
+    m = series.matrix('land')
+    m.values['export'][m.row('Frankreich')]   # Exportwerte aller Monate
+
+Reihen sind die Länder aus ``trade_spec_country_and_year`` (``'land'``),
+die Waren aus ``aggregated_df`` (``'ware'``) und der Handel Deutschlands
+insgesamt aus ``gesamt_deutschland_monthly`` (``'gesamt'``, eine Reihe
+``'Deutschland'``). ``'land_ware'`` enthält je Paar aus Land und Ware eine
+Reihe aus den Rohdaten ``handelsdaten`` (Name ``(Land, Label)``, nur wenige
+Jahre). Monate ohne Zeile in den Daten zählen als 0.
+"""
+import hashlib
+import threading
+
+import numpy as np
+import pandas as pd
+
+from core import datasets
+
+KINDS = {
+    'land': {
+        'dataset': 'trade_spec_country_and_year',
+        'column': 'Land',
+        'metrics': {'export': 'export_wert', 'import': 'import_wert', 'handelsvolumen': 'handelsvolumen_wert'},
+    },
+    'ware': {
+        'dataset': 'aggregated_df',
+        'column': 'Label',
+        'metrics': {'export': 'Ausfuhr: Wert', 'import': 'Einfuhr: Wert', 'handelsvolumen': 'Handelsvolumen'},
+    },
+    'gesamt': {
+        'dataset': 'gesamt_deutschland_monthly',
+        'column': None,
+        'metrics': {'export': 'export_wert', 'import': 'import_wert', 'handelsvolumen': 'handelsvolumen_wert'},
+    },
+    'land_ware': {
+        'dataset': 'handelsdaten',
+        'column': ['Land', 'Label'],
+        'metrics': {'export': 'Ausfuhr: Wert', 'import': 'Einfuhr: Wert'},
+    },
+}
+
+# Name der einzigen Reihe von Datensätzen ohne Namensspalte
+GESAMT = 'Deutschland'
+
+
+class Matrix:
+    """Monatswerte aller Reihen einer Art.
+
+    ``names`` sind die Reihen (sortiert; ``MultiIndex`` bei mehreren
+    Namensspalten), ``periods`` die Monate als
+    ``PeriodIndex`` und ``values`` bildet jede Kennzahl auf ein
+    ``float64``-Array der Form ``(len(names), len(periods))`` ab.
+    """
+
+    def __init__(self, kind, names, periods, values):
+        self.kind = kind
+        self.names = names
+        self.periods = periods
+        self.values = values
+        self._rows = {name: i for i, name in enumerate(names)}
+
+    def __contains__(self, name):
+        return name in self._rows
+
+    def row(self, name):
+        """Zeilennummer der Reihe ``name`` (``KeyError``, wenn es sie nicht gibt)."""
+        return self._rows[name]
+
+    def fingerprint(self):
+        """Prüfsumme über alle Werte, z.B. als Schlüssel für Dateien unter ``data/.cache``."""
+        digest = hashlib.sha1(self.kind.encode())
+        digest.update('\0'.join(map(str, self.names)).encode())
+        digest.update(str(self.periods[0]).encode() if len(self.periods) else b'')
+        for metric in sorted(self.values):
+            digest.update(np.ascontiguousarray(self.values[metric]).tobytes())
+        return digest.hexdigest()[:16]
+
+
+def _build(df, kind):
+    spec = KINDS[kind]
+    if spec['column'] is None:
+        codes, names = np.zeros(len(df), dtype=np.int64), pd.Index([GESAMT])
+    elif isinstance(spec['column'], list):
+        # Je Spalte einzeln faktorisieren und die Codes kombinieren (schneller als ein MultiIndex)
+        combined, levels = np.zeros(len(df), dtype=np.int64), []
+        keep = np.ones(len(df), dtype=bool)
+        for column in spec['column']:
+            column_codes, uniques = pd.factorize(df[column], sort=True)
+            keep &= column_codes >= 0
+            combined = combined * len(uniques) + column_codes
+            levels.append(uniques)
+        # Zeilen ohne Namen (Code -1) auslassen, ohne den großen Frame unnötig zu kopieren
+        if not keep.all():
+            df, combined = df[keep], combined[keep]
+        used, codes = np.unique(combined, return_inverse=True)
+        level_codes = []
+        for uniques in reversed(levels):
+            level_codes.insert(0, used % len(uniques))
+            used = used // len(uniques)
+        names = pd.MultiIndex(levels=levels, codes=level_codes, names=spec['column'])
+    else:
+        df = df[df[spec['column']].notna()]
+        codes, names = pd.factorize(df[spec['column']], sort=True)
+        names = pd.Index(names)
+
+    # Monat als fortlaufende Nummer ab dem ersten Monat der Daten
+    months = df['Jahr'].to_numpy(dtype=np.int64) * 12 + df['Monat'].to_numpy(dtype=np.int64) - 1
+    first = months.min() if len(months) else 0
+    columns = months - first
+    n_months = int(columns.max()) + 1 if len(columns) else 0
+    periods = pd.period_range(pd.Period(year=int(first // 12), month=int(first % 12) + 1, freq='M'), periods=n_months, freq='M')
+
+    # Mehrere Zeilen je Reihe und Monat (z.B. mehrere Codes einer Ware) addieren
+    cells = codes.astype(np.int64) * n_months + columns
+    values = {
+        metric: np.bincount(cells, weights=df[column].to_numpy(dtype=np.float64),
+                            minlength=len(names) * n_months).reshape(len(names), n_months)
+        for metric, column in spec['metrics'].items()
+    }
+    return Matrix(kind, names, periods, values)
+
+
+_lock = threading.Lock()
+
+
+@datasets.per_version
+def _matrices(snapshot):
+    return {}
+
+
+def matrix(kind, snapshot=None):
+    """Die Matrix der Reihen ``kind`` (siehe :data:`KINDS`) für den Snapshot."""
+    snapshot = snapshot or datasets.current()
+    matrices = _matrices(snapshot)
+    if kind not in matrices:
+        with _lock:
+            if kind not in matrices:
+                with datasets.pinned(snapshot):
+                    matrices[kind] = _build(datasets.get(KINDS[kind]['dataset']), kind)
+    return matrices[kind]
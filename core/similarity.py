@@ -0,0 +1,150 @@
+"""Ähnliche Länder nach Warenstruktur und Handelsverlauf.
+
+Jedes Land bekommt zwei normierte Profilvektoren:
+
+* ``'waren'``: Anteile der Waren an Deutschlands Exporten in das Land und
+  Importen aus dem Land über alle Jahre (``top10_goods_spec_country_and_year``).
+* ``'verlauf'``: jährliche Export- und Importwerte (``df_grouped``) relativ
+  zum Mittel des Landes, also die Form des Verlaufs unabhängig von der Größe.
+
+Beide werden zentriert und auf Länge 1 gebracht; die Ähnlichkeit zweier
+Länder ist das Skalarprodukt (Kosinus). Für alle Länder zugleich ist das
+ein Matrixprodukt ``V @ V.T``. ``'gesamt'`` ist der Mittelwert beider.
+
+Aus den Matrizen wird einmal je Datenversion eine Nachbartabelle mit den
+:data:`NEIGHBOURS` ähnlichsten Ländern je Land gebaut; :func:`similar` liest
+daraus nur die Zeilen eines Landes::
+
+    similarity.similar('Frankreich', n=5, basis='waren')
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+from core import datasets
+
+# Länder je Land in der Nachbartabelle
+NEIGHBOURS = 20
+
+BASES = {'gesamt': 'Gesamt', 'waren': 'Warenstruktur', 'verlauf': 'Handelsverlauf'}
+
+# Gewichte der Profile in 'gesamt'
+WEIGHTS = {'waren': 0.5, 'verlauf': 0.5}
+
+
+def _normalize(vectors):
+    # Zentrieren und auf Länge 1 bringen; Länder ohne Handel bleiben Nullvektoren
+    vectors = vectors - vectors.mean(axis=1, keepdims=True)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+
+def _pivot(df, index, columns, values, countries):
+    # Dichte Matrizen Land × Spalte (fehlende Zellen = 0) je Wertspalte, über Codes statt pivot_table
+    rows = countries.get_indexer(df[index])
+    codes, labels = pd.factorize(df[columns], sort=True)
+    keep = (rows >= 0) & (codes >= 0)
+    cells = rows[keep] * len(labels) + codes[keep]
+    shape = (len(countries), len(labels))
+    return [
+        np.bincount(cells, weights=df[column].to_numpy(dtype=np.float64)[keep],
+                    minlength=shape[0] * shape[1]).reshape(shape)
+        for column in values
+    ]
+
+
+def profiles(snapshot=None):
+    """Die Länder (``Index``) und ihre normierten Profilvektoren je Basis (``'waren'``, ``'verlauf'``)."""
+    with datasets.pinned(snapshot):
+        goods = datasets.get('top10_goods_spec_country_and_year')
+        grouped = datasets.get('df_grouped')
+
+    countries = pd.Index(sorted(set(grouped['Land'].dropna()) | set(goods['Land'].dropna())))
+
+    # Warenstruktur: Anteile je Ware, Export und Import getrennt
+    shares = []
+    for matrix in _pivot(goods, 'Land', 'Label', ['Ausfuhr: Wert', 'Einfuhr: Wert'], countries):
+        totals = matrix.sum(axis=1, keepdims=True)
+        shares.append(np.divide(matrix, totals, out=np.zeros_like(matrix), where=totals > 0))
+
+    # Verlauf: Jahreswerte relativ zum Mittel des Landes
+    trajectories = []
+    for matrix in _pivot(grouped, 'Land', 'Jahr', ['export_wert', 'import_wert'], countries):
+        means = matrix.mean(axis=1, keepdims=True)
+        trajectories.append(np.divide(matrix, means, out=np.zeros_like(matrix), where=means > 0))
+
+    return countries, {
+        'waren': _normalize(np.hstack(shares)),
+        'verlauf': _normalize(np.hstack(trajectories)),
+    }
+
+
+def _neighbours(countries, matrix, n):
+    # Die n ähnlichsten Länder je Zeile, ohne das Land selbst und ohne Länder ohne Profil
+    has_profile = np.abs(matrix).sum(axis=1) > 0
+    matrix = np.where(has_profile[:, None] & has_profile[None, :], matrix, -np.inf)
+    np.fill_diagonal(matrix, -np.inf)
+
+    n = min(n, len(countries) - 1)
+    if n <= 0:
+        return pd.DataFrame(columns=['Land', 'Rang', 'Nachbar', 'Ähnlichkeit'])
+    candidates = np.argpartition(-matrix, n - 1, axis=1)[:, :n]
+    order = np.argsort(-np.take_along_axis(matrix, candidates, axis=1), axis=1, kind='stable')
+    nearest = np.take_along_axis(candidates, order, axis=1)
+    similarity = np.take_along_axis(matrix, nearest, axis=1)
+
+    table = pd.DataFrame({
+        'Land': np.repeat(countries.to_numpy(), n),
+        'Rang': np.tile(np.arange(1, n + 1, dtype=np.int16), len(countries)),
+        'Nachbar': countries.to_numpy()[nearest.ravel()],
+        'Ähnlichkeit': similarity.ravel().astype(np.float32),
+    })
+    return table[np.isfinite(table['Ähnlichkeit'])].reset_index(drop=True)
+
+
+class _Table:
+    """Nachbartabellen je Basis, nach Land sortiert (Abfrage per Binärsuche)."""
+
+    def __init__(self, snapshot):
+        countries, vectors = profiles(snapshot)
+        matrices = {basis: v @ v.T for basis, v in vectors.items()}
+        matrices['gesamt'] = sum(WEIGHTS[basis] * matrices[basis] for basis in WEIGHTS)
+
+        self.tables = {basis: _neighbours(countries, matrix, NEIGHBOURS) for basis, matrix in matrices.items()}
+        self._keys = {basis: table['Land'].to_numpy() for basis, table in self.tables.items()}
+
+    def rows(self, basis, country):
+        """Zeilenbereich ``(start, ende)`` der Nachbarn von ``country``."""
+        keys = self._keys[basis]
+        return np.searchsorted(keys, country, 'left'), np.searchsorted(keys, country, 'right')
+
+
+_lock = threading.Lock()
+
+
+@datasets.per_version
+def _tables(snapshot):
+    return {}
+
+
+def table(snapshot=None):
+    """Die vorberechneten Nachbartabellen (:class:`_Table`) für den Snapshot."""
+    snapshot = snapshot or datasets.current()
+    stored = _tables(snapshot)
+    if 'table' not in stored:
+        with _lock:
+            if 'table' not in stored:
+                stored['table'] = _Table(snapshot)
+    return stored['table']
+
+
+def similar(country, n=10, basis='gesamt'):
+    """Die ``n`` ähnlichsten Länder zu ``country`` (Spalten ``Rang``, ``Nachbar``, ``Ähnlichkeit``).
+
+    ``basis`` ist ``'gesamt'``, ``'waren'`` oder ``'verlauf'``. Leer, wenn das
+    Land unbekannt ist oder kein Profil hat.
+    """
+    neighbours = table()
+    start, end = neighbours.rows(basis, country)
+    return neighbours.tables[basis].iloc[start:min(end, start + n)][['Rang', 'Nachbar', 'Ähnlichkeit']].reset_index(drop=True)
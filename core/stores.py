@@ -0,0 +1,113 @@
+"""Kompaktes Spaltenformat für Daten in ``dcc.Store``.
+
+``df.to_dict('records')`` wiederholt jeden Spaltennamen in jeder Zeile und
+schickt Texte wie Länder- oder Warennamen bei jedem Vorkommen erneut mit.
+:func:`encode` legt die Daten stattdessen spaltenweise ab:
+
+* Zahlenspalten als ein Array je Spalte,
+* Textspalten als Codes (Ganzzahlen) plus Liste der einzelnen Werte,
+* mit ``binary=True`` als Base64-kodierte Little-Endian-Arrays in der
+  kleinsten passenden Breite (z.B. ``int16`` für Jahre, ``uint8`` für Codes).
+
+Beispiel::
+
+    dcc.Store(id='daten', data=stores.encode(df, binary=True))
+
+    df = stores.decode(daten)  # im Callback
+
+Im Browser dekodiert ``window.stores.decode`` (``assets/stores.js``) dasselbe
+Format für Clientside-Callbacks in ein Objekt aus Spalten-Arrays.
+"""
+import base64
+
+import numpy as np
+import pandas as pd
+
+FORMAT = 'spalten/1'
+
+# Ganzzahl-Breiten in Reihenfolge der Präferenz für binäre Spalten
+_INT_TYPES = (np.uint8, np.int8, np.uint16, np.int16, np.uint32, np.int32)
+
+# Größte Ganzzahl, die float64 (und JavaScript) exakt darstellt
+_MAX_SAFE_INT = 2 ** 53
+
+
+def _narrowest(values):
+    """Kleinster Typ, der alle Ganzzahlen in ``values`` exakt aufnimmt."""
+    if len(values) == 0:
+        return np.dtype(np.uint8)
+    low, high = values.min(), values.max()
+    for dtype in _INT_TYPES:
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return np.dtype(dtype)
+    if -_MAX_SAFE_INT <= low and high <= _MAX_SAFE_INT:
+        return np.dtype(np.float64)
+    raise ValueError('Ganzzahlen außerhalb von ±2**53 lassen sich nicht verlustfrei binär ablegen')
+
+
+def _pack(values, binary):
+    values = np.asarray(values)
+    if not binary:
+        return {'values': values.tolist()}
+    dtype = _narrowest(values) if values.dtype.kind in 'iub' else np.dtype(np.float64)
+    data = values.astype(dtype.newbyteorder('<'), copy=False).tobytes()
+    return {'dtype': dtype.name, 'b64': base64.b64encode(data).decode('ascii')}
+
+
+def _unpack(spec):
+    if 'b64' in spec:
+        dtype = np.dtype(spec['dtype']).newbyteorder('<')
+        return np.frombuffer(base64.b64decode(spec['b64']), dtype=dtype)
+    return np.asarray(spec['values'])
+
+
+def encode(df, categorical=None, binary=False):
+    """Kodiert ``df`` für einen ``dcc.Store``.
+
+    ``categorical`` sind die als Codes abzulegenden Spalten (Standard: alle
+    Text- und Kategorie-Spalten). Fehlende Werte in solchen Spalten erhalten
+    den Code ``-1``.
+    """
+    if categorical is None:
+        categorical = [
+            column for column in df.columns
+            if df[column].dtype == object or isinstance(df[column].dtype, pd.CategoricalDtype)
+        ]
+
+    columns = {}
+    for column in df.columns:
+        series = df[column]
+        if column in categorical:
+            codes, categories = pd.factorize(series, sort=True)
+            spec = _pack(codes, binary)
+            spec['categories'] = categories.tolist()
+        elif series.dtype.kind in 'iufb':
+            spec = _pack(series.to_numpy(), binary)
+            spec['type'] = series.dtype.name
+        else:
+            # Sonstige Typen (z.B. Datumswerte) unverändert als Liste
+            spec = {'values': series.astype(object).where(series.notna(), None).tolist()}
+        columns[str(column)] = spec
+
+    return {'format': FORMAT, 'length': len(df), 'columns': columns}
+
+
+def decode(payload):
+    """Stellt den DataFrame aus einem mit :func:`encode` erzeugten Store wieder her.
+
+    Als Codes abgelegte Spalten kommen als ``category`` zurück.
+    """
+    if not isinstance(payload, dict) or payload.get('format') != FORMAT:
+        raise ValueError(f'Kein Store im Format {FORMAT!r}')
+
+    data = {}
+    for column, spec in payload['columns'].items():
+        values = _unpack(spec)
+        if 'categories' in spec:
+            data[column] = pd.Categorical.from_codes(values.astype(np.int64), spec['categories'])
+        elif 'type' in spec:
+            data[column] = values.astype(spec['type'])
+        else:
+            data[column] = values
+    return pd.DataFrame(data, index=pd.RangeIndex(payload['length']))
@@ -1,70 +1,43 @@
 from dash import dcc, html
 from dash.dependencies import Input, Output
-import pandas as pd
 import plotly.graph_objects as go
-import numpy as np
-import os
-
-# Sicherstellen, dass der richtige Dateipfad verwendet wird
-csv_path = os.path.join(os.path.dirname(__file__), '../data/top10_goods_spec_country_and_year.csv')
-df = pd.read_csv(csv_path)
-
-# Werte durch 1000 teilen und als Integer speichern, mit Rundung
-df[['Ausfuhr: Wert', 'Einfuhr: Wert']] = (df[['Ausfuhr: Wert', 'Einfuhr: Wert']] * 1000).astype(int)
-
-# Einzigartige Länder und Jahre alphabetisch bzw. numerisch sortieren
-länder_options = sorted(df['Land'].unique())
-jahre_options = sorted(df['Jahr'].unique())
-
-# Funktion zur Formatierung der x-Achsen-Werte
-def formatter(value):
-    if value >= 1e9:
-        return f'{value / 1e9:.1f} Mrd'
-    elif value >= 1e6:
-        return f'{value / 1e6:.1f} Mio'
-    elif value >= 1e3:
-        return f'{value / 1e3:.1f} K'
-    else:
-        return f'{int(value)}'
-
-# Funktion zur Berechnung der Schrittweite der Achse
-def calculate_tick_step(max_value):
-    if max_value < 5e6:
-        step = 1e6
-    elif max_value < 10e6:
-        step = 2e6
-    elif max_value < 50e6:
-        step = 5e6
-    elif max_value < 100e6:
-        step = 10e6
-    elif max_value < 250e6:
-        step = 20e6
-    elif max_value < 500e6:
-        step = 50e6
-    elif max_value < 1e9:
-        step = 100e6
-    elif max_value < 5e9:
-        step = 200e6
-    elif max_value < 10e9:
-        step = 500e6
-    elif max_value < 50e9:
-        step = 5e9
-    elif max_value < 100e9:
-        step = 10e9
-    elif max_value < 250e9:
-        step = 20e9
-    else:
-        step = 50e9
-    return step
+
+from core import axes, batch, callbacks, datasets, export, figures, queries, search
+
+
+# Figur-Gerüst für die Export- bzw. Import-Balken (wird einmal gebaut und validiert)
+def top10_figure(color, hover_label, xaxis_title):
+    @figures.template
+    def build():
+        fig = go.Figure()
+        fig.add_trace(go.Bar(
+            orientation='h',
+            marker_color=color,
+            hovertemplate=f'{hover_label}: %{{x:,.0f}} €<extra></extra>'
+        ))
+        fig.update_layout(
+            xaxis_title=xaxis_title,
+            yaxis_title="Warenkategorie",
+            xaxis=dict(tickmode='array'),
+        )
+        return fig
+    return build
+
+export_figure = top10_figure('blue', 'Exportwert', "Exportwert (Euro)")
+import_figure = top10_figure('red', 'Importwert', "Importwert (Euro)")
 
 # Layout-Funktion für das Dash-Modul
 def create_layout():
+    df = datasets.get('top10_goods_spec_country_and_year')
+    jahre_options = sorted(df['Jahr'].unique())
+
     return html.Div([
         html.H1("Top 10 Handelswaren zwischen Deutschland und einem ausgewählten Land in einem bestimmten Jahr"),
 
-        dcc.Dropdown(
+        search.dropdown(
             id='land_dropdown_top10_goods_year',
-            options=[{'label': land, 'value': land} for land in länder_options],
+            dataset='top10_goods_spec_country_and_year',
+            column='Land',
             value='Islamische Republik Iran',
             clearable=False,
             style={'width': '50%', 'margin-bottom': '10px'}
@@ -80,62 +53,70 @@ def create_layout():
 
         dcc.Graph(id='export_graph_top10_goods_year'),
         dcc.Graph(id='import_graph_top10_goods_year'),
+
+        export.links('LA_top10_goods_for_spec_country_and_year'),
     ])
 
 # Callback-Funktion registrieren
+# Export- und Import-Figur aus den Warensummen eines Landes und Jahres
+def build_outputs(aggregated_country_df, selected_country, selected_year):
+    top_10_exports = aggregated_country_df.sort_values(by='Ausfuhr: Wert', ascending=False).head(10)
+    max_export = top_10_exports['Ausfuhr: Wert'].max()
+    export_tick_vals, export_tick_text = axes.linear(max_export, labels='kurz')
+
+    top_10_imports = aggregated_country_df.sort_values(by='Einfuhr: Wert', ascending=False).head(10)
+    max_import = top_10_imports['Einfuhr: Wert'].max()
+    import_tick_vals, import_tick_text = axes.linear(max_import, labels='kurz')
+
+    # Export-Plot
+    export_fig = export_figure(
+        data=[{'x': top_10_exports['Ausfuhr: Wert'], 'y': top_10_exports['Label']}],
+        layout={
+            'title': {'text': f"Top 10 Exportprodukte aus Deutschland nach {selected_country} ({selected_year})"},
+            'xaxis': {'tickvals': export_tick_vals, 'ticktext': export_tick_text},
+        }
+    )
+
+    # Import-Plot
+    import_fig = import_figure(
+        data=[{'x': top_10_imports['Einfuhr: Wert'], 'y': top_10_imports['Label']}],
+        layout={
+            'title': {'text': f"Top 10 Importprodukte aus {selected_country} nach Deutschland ({selected_year})"},
+            'xaxis': {'tickvals': import_tick_vals, 'ticktext': import_tick_text},
+        }
+    )
+
+    return export_fig, import_fig
+
+# Stapelabfrage: Warensummen aller (Land, Jahr)-Paare in einer Gruppierung
+def batch_outputs(inputs):
+    countries, years = sorted({country for country, _ in inputs}), sorted({year for _, year in inputs})
+
+    filtered_df = batch.select(queries.country_goods(country=countries, year=years), ['Land', 'Jahr'], inputs)
+    aggregated = filtered_df.groupby(['Land', 'Jahr', 'Label'], as_index=False).agg({'Ausfuhr: Wert': 'sum', 'Einfuhr: Wert': 'sum'})
+    groups = batch.split(aggregated, ['Land', 'Jahr'], inputs)
+
+    for selected_country, selected_year in inputs:
+        aggregated_country_df = groups[(selected_country, selected_year)].drop(columns=['Land', 'Jahr'])
+        yield build_outputs(aggregated_country_df, selected_country, selected_year)
+
 def register_callbacks(app):
+    search.register_dropdown(app, 'land_dropdown_top10_goods_year', 'top10_goods_spec_country_and_year', 'Land')
+    batch.register('LA_top10_goods_for_spec_country_and_year', batch_outputs, ['Land', 'Jahr'])
+    export.register(app, 'LA_top10_goods_for_spec_country_and_year', 'top10_goods_spec_country_and_year', {
+        'Land': Input('land_dropdown_top10_goods_year', 'value'),
+        'Jahr': Input('jahr_dropdown_top10_goods_year', 'value'),
+    })
+
     @app.callback(
         [Output('export_graph_top10_goods_year', 'figure'),
          Output('import_graph_top10_goods_year', 'figure')],
         [Input('land_dropdown_top10_goods_year', 'value'),
          Input('jahr_dropdown_top10_goods_year', 'value')]
     )
+    @callbacks.cached()
     def update_graphs(selected_country, selected_year):
-        filtered_df = df[(df['Land'] == selected_country) & (df['Jahr'] == selected_year)]
+        filtered_df = queries.country_goods(country=selected_country, year=selected_year)
         aggregated_country_df = filtered_df.groupby(['Label'], as_index=False).agg({'Ausfuhr: Wert': 'sum', 'Einfuhr: Wert': 'sum'})
 
-        top_10_exports = aggregated_country_df.sort_values(by='Ausfuhr: Wert', ascending=False).head(10)
-        max_export = top_10_exports['Ausfuhr: Wert'].max()
-        export_step = calculate_tick_step(max_export)
-        rounded_export_max = np.ceil(max_export / export_step) * export_step
-        export_tick_vals = np.arange(0, rounded_export_max + 1, export_step)
-
-        top_10_imports = aggregated_country_df.sort_values(by='Einfuhr: Wert', ascending=False).head(10)
-        max_import = top_10_imports['Einfuhr: Wert'].max()
-        import_step = calculate_tick_step(max_import)
-        rounded_import_max = np.ceil(max_import / import_step) * import_step
-        import_tick_vals = np.arange(0, rounded_import_max + 1, import_step)
-
-        # Export-Plot
-        export_fig = go.Figure()
-        export_fig.add_trace(go.Bar(
-            x=top_10_exports['Ausfuhr: Wert'],
-            y=top_10_exports['Label'],
-            orientation='h',
-            marker_color='blue',
-            hovertemplate='Exportwert: %{x:,.0f} €<extra></extra>'
-        ))
-        export_fig.update_layout(
-            title=f"Top 10 Exportprodukte aus Deutschland nach {selected_country} ({selected_year})",
-            xaxis_title="Exportwert (Euro)",
-            yaxis_title="Warenkategorie",
-            xaxis=dict(tickmode='array', tickvals=export_tick_vals, ticktext=[formatter(val) for val in export_tick_vals]),
-        )
-
-        # Import-Plot
-        import_fig = go.Figure()
-        import_fig.add_trace(go.Bar(
-            x=top_10_imports['Einfuhr: Wert'],
-            y=top_10_imports['Label'],
-            orientation='h',
-            marker_color='red',
-            hovertemplate='Importwert: %{x:,.0f} €<extra></extra>'
-        ))
-        import_fig.update_layout(
-            title=f"Top 10 Importprodukte aus {selected_country} nach Deutschland ({selected_year})",
-            xaxis_title="Importwert (Euro)",
-            yaxis_title="Warenkategorie",
-            xaxis=dict(tickmode='array', tickvals=import_tick_vals, ticktext=[formatter(val) for val in import_tick_vals]),
-        )
-
-        return export_fig, import_fig
+        return build_outputs(aggregated_country_df, selected_country, selected_year)
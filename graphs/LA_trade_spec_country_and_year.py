@@ -1,52 +1,53 @@
 import dash
 from dash import dcc, html
-import pandas as pd
 import plotly.graph_objects as go
-import os
-import numpy as np
-import math
 
-# Relativer Pfad zur CSV-Datei
-csv_path = os.path.join(os.path.dirname(__file__), "../data/trade_spec_country_and_year.csv")
-csv_path_grouped = os.path.join(os.path.dirname(__file__), "../data/df_grouped.csv")
+from core import axes, batch, callbacks, datasets, decomposition, export, figures, queries, search
 
-# Daten laden
-df = pd.read_csv(csv_path)
-df_grouped = pd.read_csv(csv_path_grouped)
-
-# Falls die Daten nicht korrekt geladen wurden, abbrechen
-if df.empty or df_grouped.empty:
-    raise ValueError("CSV-Dateien konnten nicht geladen werden oder sind leer.")
 
 # Werte mit 1000 multiplizieren, um die Originalwerte zu erhalten
 #df[['export_wert', 'import_wert', 'handelsvolumen_wert']] = df[['export_wert', 'import_wert', 'handelsvolumen_wert']].fillna(0) * 1000
 
-# Funktion zur Bestimmung der optimalen Schrittgröße für die Y-Achse
-def determine_step_size(max_value):
-    thresholds = [5e6, 10e6, 50e6, 100e6, 250e6, 500e6, 1e9, 5e9, 10e9, 50e9, 100e9]
-    steps = [1e6, 5e6, 10e6, 25e6, 50e6, 100e6, 250e6, 500e6, 1e9, 2e9, 10e9]
-    for i, threshold in enumerate(thresholds):
-        if max_value < threshold:
-            return steps[i]
-    return 25e9
-
-# Funktion zur Y-Achsen-Formatierung
-def formatter(value):
-    if value >= 1e9:
-        return f'{value / 1e9:.2f} Mrd €'
-    elif value >= 1e6:
-        return f'{value / 1e6:.0f} Mio €'
-    else:
-        return f'{value:,.0f} €'
+# Figur-Gerüst (wird einmal gebaut und validiert)
+@figures.template
+def monthly_figure():
+    fig = go.Figure()
+
+    # Linien für Export, Import und Handelsvolumen
+    for name, color in zip(
+        ['Exportvolumen', 'Importvolumen', 'Gesamthandelsvolumen'],
+        ['#1f77b4', '#ff7f0e', '#2ca02c']
+    ):
+        fig.add_trace(go.Scatter(
+            mode='lines+markers',
+            name=name,
+            line=dict(width=2, color=color),
+            hovertemplate=f'<b>{name}</b><br>Monat: %{{x}}<br>Wert: %{{y:,.0f}} €<extra></extra>'
+        ))
+
+    fig.update_layout(
+        xaxis_title='Monat',
+        yaxis_title='Wert in €',
+        xaxis=dict(
+            tickmode='array',
+            tickvals=list(range(1, 13)),
+            ticktext=axes.MONATE_KURZ
+        ),
+        legend=dict(title='Kategorie', bgcolor='rgba(255,255,255,0.7)')
+    )
+    return fig
 
 # Funktion zur Erstellung des Layouts
 def create_layout():
+    df = datasets.get('trade_spec_country_and_year')
+
     return html.Div([
         html.H1("Monatlicher Handelsverlauf Deutschlands mit ausgewähltem Land"),
 
-        dcc.Dropdown(
+        search.dropdown(
             id='la_trade_spec_country_dropdown_country',
-            options=[{'label': country, 'value': country} for country in sorted(df['Land'].dropna().unique())],
+            dataset='trade_spec_country_and_year',
+            column='Land',
             value='Islamische Republik Iran' if 'Islamische Republik Iran' in df['Land'].values else df['Land'].dropna().unique()[0],
             clearable=False,
             style={'width': '50%'}
@@ -63,72 +64,95 @@ def create_layout():
         html.Div(id='la_trade_spec_country_info_text', style={'margin-top': '20px', 'font-size': '16px', 'font-weight': 'bold'}),
 
         dcc.Graph(id='la_trade_spec_country_graph'),
+
+        # Zerlegung der Monatswerte in Trend, Saison und Rest
+        dcc.RadioItems(
+            id='la_trade_spec_country_decomposition_metric',
+            options=decomposition.METRIC_OPTIONS,
+            value='export',
+            inline=True
+        ),
+
+        dcc.Graph(id='la_trade_spec_country_decomposition_graph'),
+
+        export.links('LA_trade_spec_country_and_year'),
     ])
 
+# Figur und Infotext aus den bereits gefilterten Daten eines Landes und Jahres
+def build_outputs(df_filtered, df_selected, selected_country, selected_year):
+    # Falls keine Daten vorhanden sind, leeren Graph zurückgeben
+    if df_filtered.empty:
+        return go.Figure(), "Keine Daten für dieses Land und Jahr verfügbar."
+
+    # Achsenskala berechnen
+    max_value = df_filtered[['export_wert', 'import_wert', 'handelsvolumen_wert']].values.max()
+    tickvals, ticktext = axes.linear(max_value)
+
+    fig = monthly_figure(
+        data=[{'x': df_filtered['Monat'], 'y': df_filtered[col]}
+              for col in ['export_wert', 'import_wert', 'handelsvolumen_wert']],
+        layout={
+            'title': {'text': f'Monatlicher Export-, Import- und Handelsverlauf Deutschlands mit {selected_country} im Jahr {selected_year}'},
+            'yaxis': {'tickvals': tickvals, 'ticktext': ticktext},
+        }
+    )
+
+    # Handelsbilanz-Info anzeigen
+    if not df_selected.empty:
+        status = df_selected['handelsbilanz_status'].values[0]
+        handelsbilanz = df_selected['handelsbilanz'].values[0] / 1e9
+        
+        info_text = f"Deutschlands Handelsbilanzstatus mit {selected_country} im ausgewählten Jahr: {status} ({handelsbilanz:.2f} Mrd €)" # ({handelsbilanz} €)
+    else:
+        info_text = "Keine Daten zur Handelsbilanz verfügbar."
+
+    return fig, info_text
+
+# Stapelabfrage: alle (Land, Jahr)-Paare mit einem Filter- und Gruppierungsschritt
+def batch_outputs(inputs):
+    countries, years = sorted({country for country, _ in inputs}), sorted({year for _, year in inputs})
+
+    groups = batch.split(queries.monthly(countries, years), ['Land', 'Jahr'], inputs)
+    selected = batch.split(queries.country_years(countries, years), ['Land', 'Jahr'], inputs)
+
+    for selected_country, selected_year in inputs:
+        key = (selected_country, selected_year)
+        yield build_outputs(groups[key], selected[key], selected_country, selected_year)
+
 # Callback für das Update des Graphen
 def register_callbacks(app):
+    search.register_dropdown(app, 'la_trade_spec_country_dropdown_country', 'trade_spec_country_and_year', 'Land')
+    batch.register('LA_trade_spec_country_and_year', batch_outputs, ['Land', 'Jahr'])
+    export.register(app, 'LA_trade_spec_country_and_year', 'trade_spec_country_and_year', {
+        'Land': dash.Input('la_trade_spec_country_dropdown_country', 'value'),
+        'Jahr': dash.Input('la_trade_spec_country_dropdown_year', 'value'),
+    })
+
     @app.callback(
         [dash.Output('la_trade_spec_country_graph', 'figure'),
          dash.Output('la_trade_spec_country_info_text', 'children')],
         [dash.Input('la_trade_spec_country_dropdown_country', 'value'),
          dash.Input('la_trade_spec_country_dropdown_year', 'value')]
     )
+    @callbacks.cached()
     def update_graph(selected_country, selected_year):
-        # Daten filtern für das ausgewählte Land und Jahr
-        df_filtered = df[(df['Land'] == selected_country) & (df['Jahr'] == selected_year)]
-
-        # Falls keine Daten vorhanden sind, leeren Graph zurückgeben
-        if df_filtered.empty:
-            return go.Figure(), "Keine Daten für dieses Land und Jahr verfügbar."
-
-        fig = go.Figure()
-
-        # Linien für Export, Import und Handelsvolumen
-        for col, name, color in zip(
-            ['export_wert', 'import_wert', 'handelsvolumen_wert'],
-            ['Exportvolumen', 'Importvolumen', 'Gesamthandelsvolumen'],
-            ['#1f77b4', '#ff7f0e', '#2ca02c']
-        ):
-            fig.add_trace(go.Scatter(
-                x=df_filtered['Monat'],
-                y=df_filtered[col],
-                mode='lines+markers',
-                name=name,
-                line=dict(width=2, color=color),
-                hovertemplate=f'<b>{name}</b><br>Monat: %{{x}}<br>Wert: %{{y:,.0f}} €<extra></extra>'
-            ))
-
-        # Achsenskala berechnen
-        max_value = df_filtered[['export_wert', 'import_wert', 'handelsvolumen_wert']].values.max()
-        step_size = determine_step_size(max_value)
-        rounded_max = math.ceil(max_value / step_size) * step_size
-        tickvals = np.arange(0, rounded_max + 1, step_size)
-        ticktext = [formatter(val) for val in tickvals]
-
-        fig.update_layout(
-            title=f'Monatlicher Export-, Import- und Handelsverlauf Deutschlands mit {selected_country} im Jahr {selected_year}',
-            xaxis_title='Monat',
-            yaxis_title='Wert in €',
-            xaxis=dict(
-                tickmode='array',
-                tickvals=list(range(1, 13)),
-                ticktext=['Jan', 'Feb', 'Mär', 'Apr', 'Mai', 'Jun', 'Jul', 'Aug', 'Sep', 'Okt', 'Nov', 'Dez']
-            ),
-            yaxis=dict(
-                tickvals=tickvals,
-                ticktext=ticktext
-            ),
-            legend=dict(title='Kategorie', bgcolor='rgba(255,255,255,0.7)')
-        )
+        # Daten für das ausgewählte Land und Jahr
+        df_filtered = queries.monthly(selected_country, selected_year)
+        df_selected = queries.country_years(selected_country, selected_year)
+
+        return build_outputs(df_filtered, df_selected, selected_country, selected_year)
 
-        # Handelsbilanz-Info anzeigen
-        df_selected = df_grouped[(df_grouped['Land'] == selected_country) & (df_grouped['Jahr'] == selected_year)]
-        if not df_selected.empty:
-            status = df_selected['handelsbilanz_status'].values[0]
-            handelsbilanz = df_selected['handelsbilanz'].values[0] / 1e9
-            
-            info_text = f"Deutschlands Handelsbilanzstatus mit {selected_country} im ausgewählten Jahr: {status} ({handelsbilanz:.2f} Mrd €)" # ({handelsbilanz} €)
-        else:
-            info_text = "Keine Daten zur Handelsbilanz verfügbar."
-
-        return fig, info_text
+    @app.callback(
+        dash.Output('la_trade_spec_country_decomposition_graph', 'figure'),
+        [dash.Input('la_trade_spec_country_dropdown_country', 'value'),
+         dash.Input('la_trade_spec_country_dropdown_year', 'value'),
+         dash.Input('la_trade_spec_country_decomposition_metric', 'value')]
+    )
+    @callbacks.cached()
+    def update_decomposition(selected_country, selected_year, selected_metric):
+        # Komponenten sind für alle Länder vorberechnet, hier wird nur die Zeile gelesen
+        df_components = decomposition.frame('land', selected_country, selected_metric, selected_year)
+        return decomposition.figure(
+            df_components,
+            f'Trend, Saison und Rest im Handel Deutschlands mit {selected_country} im Jahr {selected_year}'
+        )
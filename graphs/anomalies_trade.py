@@ -0,0 +1,205 @@
+import dash
+from dash import dash_table, dcc, html
+import numpy as np
+import plotly.graph_objects as go
+
+from core import anomalies, axes, callbacks, datasets, figures, search
+
+# Zeilen der Hinweistabelle des ausgewählten Jahres
+TOP_N = 100
+
+TABLE_COLUMNS = [
+    {'name': 'Art', 'id': 'Art'},
+    {'name': 'Land', 'id': 'Land'},
+    {'name': 'Ware', 'id': 'Ware'},
+    {'name': 'Monat', 'id': 'Monat'},
+    {'name': 'Kennzahl', 'id': 'Kennzahl'},
+    {'name': 'Wert (Mio €)', 'id': 'Wert', 'type': 'numeric'},
+    {'name': 'Vorjahresmonat (Mio €)', 'id': 'Vorjahreswert', 'type': 'numeric'},
+    {'name': 'z-Wert', 'id': 'z', 'type': 'numeric'},
+]
+
+# Figur-Gerüst: Monatswerte und markierte auffällige Monate
+@figures.template
+def anomalies_figure():
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        mode='lines',
+        name='Monatswert',
+        line=dict(width=2, color='#1f77b4'),
+        hovertemplate='<b>Monatswert</b><br>Monat: %{x}<br>Wert: %{y:,.0f} €<extra></extra>'
+    ))
+    fig.add_trace(go.Scatter(
+        mode='markers',
+        name='Auffälliger Monat',
+        marker=dict(size=11, color='#d62728', symbol='circle-open', line=dict(width=3)),
+        hovertemplate='<b>Auffälliger Monat</b><br>Monat: %{x}<br>Wert: %{y:,.0f} €<br>z-Wert: %{customdata:.1f}<extra></extra>'
+    ))
+    fig.update_layout(
+        xaxis_title='Monat',
+        yaxis_title='Wert in €',
+        legend=dict(title='Kategorie', bgcolor='rgba(255,255,255,0.7)')
+    )
+    return fig
+
+def _table(id):
+    return dash_table.DataTable(
+        id=id,
+        columns=TABLE_COLUMNS,
+        page_size=15,
+        sort_action='native',
+        style_table={'overflowX': 'auto'},
+        style_cell={'textAlign': 'left', 'font-family': 'sans-serif', 'font-size': '14px'},
+        style_header={'fontWeight': 'bold'},
+    )
+
+def _rows(df):
+    # Tabellenzeilen: Monat als Text, Werte in Mio €
+    return [
+        {
+            'Art': row.Art,
+            'Land': row.Land if isinstance(row.Land, str) else '',
+            'Ware': row.Ware if isinstance(row.Ware, str) else '',
+            'Monat': f'{row.Jahr}-{row.Monat:02d}',
+            'Kennzahl': row.Kennzahl,
+            'Wert': round(row.Wert / 1e6, 1),
+            'Vorjahreswert': round(row.Vorjahreswert / 1e6, 1),
+            'z': round(row.z, 1),
+        }
+        for row in df.itertuples(index=False)
+    ]
+
+# Funktion zur Erstellung des Layouts
+def create_layout():
+    df = datasets.get('trade_spec_country_and_year')
+    df_goods = datasets.get('aggregated_df')
+
+    return html.Div([
+        html.H1("Auffällige Monate im Handel Deutschlands"),
+
+        html.H3("Hinweise des ausgewählten Jahres"),
+
+        dcc.Dropdown(
+            id='anomalies_year_dropdown',
+            options=[{'label': str(j), 'value': j} for j in sorted(df['Jahr'].dropna().unique())],
+            value=df['Jahr'].dropna().max(),  # Standardmäßig das aktuellste Jahr
+            clearable=False,
+            style={'width': '50%'}
+        ),
+
+        html.Div(id='anomalies_year_info_text', style={'margin-top': '20px', 'font-size': '16px', 'font-weight': 'bold'}),
+
+        _table('anomalies_year_table'),
+
+        html.H3("Verlauf eines Landes oder einer Ware", style={'margin-top': '40px'}),
+
+        dcc.RadioItems(
+            id='anomalies_kind_radio',
+            options=[{'label': 'Land', 'value': 'land'}, {'label': 'Ware', 'value': 'ware'}],
+            value='land',
+            inline=True
+        ),
+
+        html.Div(
+            search.dropdown(
+                id='anomalies_country_dropdown',
+                dataset='trade_spec_country_and_year',
+                column='Land',
+                value='Islamische Republik Iran' if 'Islamische Republik Iran' in df['Land'].values else df['Land'].dropna().unique()[0],
+                clearable=False,
+                style={'width': '50%'}
+            ),
+            id='anomalies_country_container'
+        ),
+
+        html.Div(
+            search.dropdown(
+                id='anomalies_good_dropdown',
+                dataset='aggregated_df',
+                column='Label',
+                value='Mineralische Brennstoffe usw.' if 'Mineralische Brennstoffe usw.' in df_goods['Label'].values else df_goods['Label'].dropna().unique()[0],
+                clearable=False,
+                style={'width': '50%'}
+            ),
+            id='anomalies_good_container',
+            style={'display': 'none'}
+        ),
+
+        dcc.RadioItems(
+            id='anomalies_metric_radio',
+            options=[{'label': anomalies.KENNZAHL[metric], 'value': metric} for metric in anomalies.METRICS],
+            value='export',
+            inline=True
+        ),
+
+        dcc.Graph(id='anomalies_graph'),
+
+        _table('anomalies_series_table'),
+    ])
+
+def register_callbacks(app):
+    search.register_dropdown(app, 'anomalies_country_dropdown', 'trade_spec_country_and_year', 'Land')
+    search.register_dropdown(app, 'anomalies_good_dropdown', 'aggregated_df', 'Label')
+
+    @app.callback(
+        [dash.Output('anomalies_year_table', 'data'),
+         dash.Output('anomalies_year_info_text', 'children')],
+        [dash.Input('anomalies_year_dropdown', 'value')]
+    )
+    @callbacks.cached()
+    def update_year_table(selected_year):
+        df_alerts = anomalies.alerts(year=selected_year)
+        info_text = (f"{len(df_alerts)} auffällige Monate im Jahr {selected_year} "
+                     f"(|z| ≥ {anomalies.Z_THRESHOLD:g}), die {min(len(df_alerts), TOP_N)} stärksten:")
+        return _rows(df_alerts.head(TOP_N)), info_text
+
+    # Nur die Auswahl der gewählten Art (Land oder Ware) anzeigen
+    @app.callback(
+        [dash.Output('anomalies_country_container', 'style'),
+         dash.Output('anomalies_good_container', 'style')],
+        [dash.Input('anomalies_kind_radio', 'value')]
+    )
+    def toggle_dropdowns(kind):
+        hidden = {'display': 'none'}
+        return ({}, hidden) if kind == 'land' else (hidden, {})
+
+    @app.callback(
+        [dash.Output('anomalies_graph', 'figure'),
+         dash.Output('anomalies_series_table', 'data')],
+        [dash.Input('anomalies_kind_radio', 'value'),
+         dash.Input('anomalies_country_dropdown', 'value'),
+         dash.Input('anomalies_good_dropdown', 'value'),
+         dash.Input('anomalies_metric_radio', 'value')]
+    )
+    @callbacks.cached()
+    def update_series(kind, selected_country, selected_good, selected_metric):
+        name = selected_country if kind == 'land' else selected_good
+        df_scores = anomalies.series_scores(kind, name, selected_metric)
+        if df_scores is None:
+            return go.Figure(), []
+
+        # Hinweise der Reihe selbst und ihrer Land-Waren-Paare aus den Handelsdaten
+        if kind == 'land':
+            df_alerts = anomalies.alerts(country=name)
+        else:
+            df_alerts = anomalies.alerts(good=name)
+        df_own = df_alerts[(df_alerts['Art'] == anomalies.ART[kind])
+                           & (df_alerts['Kennzahl'] == anomalies.KENNZAHL[selected_metric])]
+
+        months = df_scores['Periode'].astype(str)
+        periods = df_scores['Periode'].dt
+        flagged = np.isin(periods.year * 100 + periods.month,
+                          df_own['Jahr'].astype(int) * 100 + df_own['Monat'].astype(int))
+
+        tickvals, ticktext = axes.linear(df_scores['wert'].max())
+        fig = anomalies_figure(
+            data=[
+                {'x': months, 'y': df_scores['wert']},
+                {'x': months[flagged], 'y': df_scores['wert'][flagged], 'customdata': np.round(df_scores['z'][flagged], 1)},
+            ],
+            layout={
+                'title': {'text': f'{anomalies.KENNZAHL[selected_metric]} Deutschlands – {name}: auffällige Monate'},
+                'yaxis': {'tickvals': tickvals, 'ticktext': ticktext},
+            }
+        )
+        return fig, _rows(df_alerts)
@@ -0,0 +1,136 @@
+from dash import dcc, html
+from dash.dependencies import Input, Output
+import plotly.graph_objects as go
+
+from core import callbacks, concentration, datasets, figures, search
+
+# Angezeigte Waren im Ranking
+TOP_N = 20
+
+LEVEL_COLORS = {'gering': '#2ca02c', 'mäßig': '#ff7f0e', 'hoch': '#d62728'}
+
+RICHTUNGEN = {
+    'import': 'Importe (Abhängigkeit von Herkunftsländern)',
+    'export': 'Exporte (Abhängigkeit von Abnehmerländern)',
+}
+
+# Figur-Gerüst des Rankings: HHI-Balken je Ware, eingefärbt nach Einstufung
+@figures.template
+def ranking_figure():
+    fig = go.Figure(go.Bar(
+        orientation='h',
+        hovertemplate='<b>%{y}</b><br>HHI: %{x:,.0f}<br>Größtes Land: %{customdata[0]} (%{customdata[1]:.1f} %)<extra></extra>'
+    ))
+    # Grenzen der Einstufung
+    for bound, _ in concentration.LEVELS[:-1]:
+        fig.add_vline(x=bound, line_dash='dash', line_color='grey')
+    fig.update_layout(
+        height=700,
+        xaxis_title='Herfindahl-Hirschman-Index (0 bis 10 000)',
+        yaxis=dict(title='Warenkategorie', autorange='reversed'),
+    )
+    return fig
+
+# Figur-Gerüst des Verlaufs einer Ware: HHI der Importe und Exporte je Jahr
+@figures.template
+def history_figure():
+    fig = go.Figure()
+    for name, color in [('Importe', '#d62728'), ('Exporte', '#1f77b4')]:
+        fig.add_trace(go.Scatter(
+            mode='lines+markers',
+            name=name,
+            line=dict(width=2, color=color),
+            hovertemplate=f'<b>{name}</b><br>Jahr: %{{x}}<br>HHI: %{{y:,.0f}}<extra></extra>'
+        ))
+    fig.update_layout(
+        xaxis_title='Jahr',
+        yaxis_title='Herfindahl-Hirschman-Index',
+        legend=dict(title='Richtung', bgcolor='rgba(255,255,255,0.7)')
+    )
+    return fig
+
+# Funktion zur Erstellung des Layouts
+def create_layout():
+    df = datasets.get('top10_goods_spec_country_and_year')
+
+    return html.Div([
+        html.H1("Abhängigkeitsrisiko Deutschlands nach Waren (Marktkonzentration)"),
+
+        dcc.Dropdown(
+            id='concentration_year_dropdown',
+            options=[{'label': str(j), 'value': j} for j in sorted(df['Jahr'].dropna().unique())],
+            value=df['Jahr'].dropna().max(),  # Standardmäßig das aktuellste Jahr
+            clearable=False,
+            style={'width': '50%'}
+        ),
+
+        dcc.RadioItems(
+            id='concentration_flow_radio',
+            options=[{'label': label, 'value': flow} for flow, label in RICHTUNGEN.items()],
+            value='import',
+            inline=True
+        ),
+
+        html.Div(id='concentration_info_text', style={'margin-top': '20px', 'font-size': '16px', 'font-weight': 'bold'}),
+
+        dcc.Graph(id='concentration_ranking_graph'),
+
+        html.H3("Verlauf einer Ware", style={'margin-top': '40px'}),
+
+        search.dropdown(
+            id='concentration_good_dropdown',
+            dataset='top10_goods_spec_country_and_year',
+            column='Label',
+            value='Mineralische Brennstoffe usw.' if 'Mineralische Brennstoffe usw.' in df['Label'].values else df['Label'].dropna().unique()[0],
+            clearable=False,
+            style={'width': '50%'}
+        ),
+
+        dcc.Graph(id='concentration_history_graph'),
+    ])
+
+def register_callbacks(app):
+    search.register_dropdown(app, 'concentration_good_dropdown', 'top10_goods_spec_country_and_year', 'Label')
+
+    @app.callback(
+        [Output('concentration_ranking_graph', 'figure'),
+         Output('concentration_info_text', 'children')],
+        [Input('concentration_year_dropdown', 'value'),
+         Input('concentration_flow_radio', 'value')]
+    )
+    @callbacks.cached()
+    def update_ranking(selected_year, selected_flow):
+        # Kennzahlen sind je Datenversion vorberechnet, hier wird nur sortiert und ausgeschnitten
+        df_ranking = concentration.ranking(selected_year, selected_flow)
+        if df_ranking.empty:
+            return go.Figure(), "Keine Daten für dieses Jahr verfügbar."
+        df_top = df_ranking.head(TOP_N)
+
+        fig = ranking_figure(
+            data=[{
+                'x': df_top[f'{selected_flow}_hhi'],
+                'y': df_top['Label'],
+                'marker': {'color': df_top[f'{selected_flow}_stufe'].map(LEVEL_COLORS).fillna('grey').tolist()},
+                'customdata': list(zip(df_top[f'{selected_flow}_top_land'], df_top[f'{selected_flow}_top_anteil'].round(1))),
+            }],
+            layout={'title': {'text': f'Top {TOP_N} Waren nach Konzentration der {RICHTUNGEN[selected_flow].split(" ")[0]} im Jahr {selected_year}'}}
+        )
+
+        high = (df_ranking[f'{selected_flow}_stufe'] == 'hoch').sum()
+        info_text = f"{high} von {len(df_ranking)} Warenkategorien sind im Jahr {selected_year} hoch konzentriert (HHI über {concentration.LEVELS[1][0]})."
+        return fig, info_text
+
+    @app.callback(
+        Output('concentration_history_graph', 'figure'),
+        Input('concentration_good_dropdown', 'value')
+    )
+    @callbacks.cached()
+    def update_history(selected_good):
+        df_good = concentration.history(selected_good)
+        if df_good.empty:
+            return go.Figure()
+
+        return history_figure(
+            data=[{'x': df_good['Jahr'], 'y': df_good[f'{flow}_hhi']} for flow in ('import', 'export')],
+            layout={'title': {'text': f'Konzentration der Importe und Exporte: {selected_good}'}}
+        )
@@ -0,0 +1,138 @@
+import dash
+from dash import dcc, html
+import numpy as np
+import plotly.graph_objects as go
+
+from core import callbacks, correlation, figures, search
+
+KENNZAHLEN = [
+    {'label': 'Export', 'value': 'export'},
+    {'label': 'Import', 'value': 'import'},
+    {'label': 'Handelsvolumen', 'value': 'handelsvolumen'},
+]
+
+STANDARD_LAENDER = ['Frankreich', 'Niederlande', 'Vereinigte Staaten von Amerika', 'China', 'Italien', 'Polen', 'Islamische Republik Iran']
+STANDARD_WAREN = ['Kraftfahrzeuge, Landfahrzeuge', 'Maschinen, Apparate, mechanische Geräte', 'Elektrotechnische Erzeugnisse',
+                  'Pharmazeutische Erzeugnisse', 'Mineralische Brennstoffe usw.', 'Eisen und Stahl']
+
+# Figur-Gerüst: Heatmap von -1 bis 1 mit Werten in den Zellen
+@figures.template
+def correlation_figure():
+    fig = go.Figure(go.Heatmap(
+        zmin=-1,
+        zmax=1,
+        colorscale='RdBu',
+        reversescale=True,
+        texttemplate='%{z:.2f}',
+        colorbar=dict(title='Korrelation'),
+        hovertemplate='<b>%{y}</b> – <b>%{x}</b><br>Korrelation: %{z:.2f}<extra></extra>'
+    ))
+    fig.update_layout(
+        height=700,
+        xaxis=dict(tickangle=-45),
+        yaxis=dict(autorange='reversed')
+    )
+    return fig
+
+# Funktion zur Erstellung des Layouts
+def create_layout():
+    return html.Div([
+        html.H1("Korrelation der monatlichen Handelsverläufe"),
+
+        dcc.RadioItems(
+            id='correlation_kind_radio',
+            options=[{'label': 'Länder', 'value': 'land'}, {'label': 'Waren', 'value': 'ware'}],
+            value='land',
+            inline=True
+        ),
+
+        html.Div(
+            search.dropdown(
+                id='correlation_countries_dropdown',
+                dataset='trade_spec_country_and_year',
+                column='Land',
+                value=STANDARD_LAENDER,
+                multi=True,
+                style={'width': '70%'}
+            ),
+            id='correlation_countries_container'
+        ),
+
+        html.Div(
+            search.dropdown(
+                id='correlation_goods_dropdown',
+                dataset='aggregated_df',
+                column='Label',
+                value=STANDARD_WAREN,
+                multi=True,
+                style={'width': '70%'}
+            ),
+            id='correlation_goods_container',
+            style={'display': 'none'}
+        ),
+
+        dcc.RadioItems(
+            id='correlation_metric_radio',
+            options=KENNZAHLEN,
+            value='export',
+            inline=True
+        ),
+
+        dcc.RadioItems(
+            id='correlation_transform_radio',
+            options=[{'label': label, 'value': transform} for transform, label in correlation.TRANSFORMS.items()],
+            value='vorjahr',
+            inline=True
+        ),
+
+        html.Div(id='correlation_info_text', style={'margin-top': '20px', 'font-size': '16px', 'font-weight': 'bold'}),
+
+        dcc.Graph(id='correlation_graph'),
+    ])
+
+def register_callbacks(app):
+    search.register_dropdown(app, 'correlation_countries_dropdown', 'trade_spec_country_and_year', 'Land')
+    search.register_dropdown(app, 'correlation_goods_dropdown', 'aggregated_df', 'Label')
+
+    # Nur die Auswahl der gewählten Art (Länder oder Waren) anzeigen
+    @app.callback(
+        [dash.Output('correlation_countries_container', 'style'),
+         dash.Output('correlation_goods_container', 'style')],
+        [dash.Input('correlation_kind_radio', 'value')]
+    )
+    def toggle_dropdowns(kind):
+        hidden = {'display': 'none'}
+        return ({}, hidden) if kind == 'land' else (hidden, {})
+
+    @app.callback(
+        [dash.Output('correlation_graph', 'figure'),
+         dash.Output('correlation_info_text', 'children')],
+        [dash.Input('correlation_kind_radio', 'value'),
+         dash.Input('correlation_countries_dropdown', 'value'),
+         dash.Input('correlation_goods_dropdown', 'value'),
+         dash.Input('correlation_metric_radio', 'value'),
+         dash.Input('correlation_transform_radio', 'value')]
+    )
+    @callbacks.cached()
+    def update_graph(kind, selected_countries, selected_goods, selected_metric, selected_transform):
+        selected = (selected_countries if kind == 'land' else selected_goods) or []
+        if len(selected) < 2:
+            return go.Figure(), "Bitte mindestens zwei Länder bzw. Waren auswählen."
+
+        # Ausschnitt aus der je Datenversion einmal berechneten Matrix
+        df_corr = correlation.subset(kind, selected, selected_metric, selected_transform)
+        names = df_corr.index.tolist()
+
+        fig = correlation_figure(
+            data=[{'x': names, 'y': names, 'z': np.round(df_corr.to_numpy(), 3)}],
+            layout={'title': {'text': f'Korrelation der {correlation.TRANSFORMS[selected_transform]} ({selected_metric.capitalize()})'}}
+        )
+
+        # Stärkstes Paar außerhalb der Diagonale nennen
+        values = df_corr.to_numpy(copy=True)
+        np.fill_diagonal(values, np.nan)
+        if np.isnan(values).all():
+            return fig, "Keine Korrelation berechenbar."
+        i, j = np.unravel_index(np.nanargmax(values), values.shape)
+        info_text = f"Stärkster Gleichlauf: {names[i]} und {names[j]} ({values[i, j]:.2f})"
+        return fig, info_text
@@ -1,46 +1,86 @@
-from dash import dcc, html, callback
-from dash.dependencies import Input, Output
-import pandas as pd
+from dash import dash_table, dcc, html, callback
+from dash.dependencies import Input, Output, State
 import plotly.graph_objects as go
-import numpy as np
-import math
-
-# Daten laden
-df_grouped = pd.read_csv('data/df_grouped.csv')
-
-# Einzigartige Länder alphabetisch sortieren
-länder_options = sorted(df_grouped['Land'].unique())
-
-# Funktion zur Formatierung der Y-Achse
-def formatter(value):
-    if value >= 1e9:
-        return f'{value / 1e9:.1f} Mrd'
-    elif value >= 1e6:
-        return f'{value / 1e6:.0f} Mio'
-    elif value >= 1e3:
-        return f'{value / 1e3:.0f} K'
-    else:
-        return str(value)
+
+from core import axes, callbacks, export, figures, queries, search, similarity
+
+# Vorgeschlagene ähnliche Länder und wie viele davon mit „Vergleichen“ übernommen werden
+SIMILAR_N = 10
+SIMILAR_COMPARE_N = 3
+
+
+# Figur-Gerüst für alle drei Vergleichsgrafiken (eine Linie je Land)
+@figures.template
+def comparison_figure():
+    fig = go.Figure(go.Scatter(mode='lines+markers', line=dict(width=2)))
+    fig.update_layout(
+        xaxis_title='Jahr',
+        yaxis_title='Wert in €',
+        legend=dict(title='Kategorie', bgcolor='rgba(255,255,255,0.7)')
+    )
+    return fig
 
 # Layout für die Multi-Page-App
 def create_layout():
+    länder = search.index('df_grouped', 'Land').names
+
     return html.Div([
         html.H1("Vergleich der Handelsverläufe mehrerer Länder mit Deutschland"),
 
-        dcc.Dropdown(
+        # Optionen lädt der im Hauptmodul registrierte Such-Callback nach
+        search.dropdown(
             id='land_dropdown',
-            options=[{'label': land, 'value': land} for land in länder_options],
+            dataset='df_grouped',
+            column='Land',
             value=['Islamische Republik Iran', "Irak", "Katar"],  # Standardwert
             multi=True,  # Mehrfachauswahl aktivieren
             clearable=False,
             style={'width': '60%'}
         ),
 
+        # Ähnliche Länder finden (Warenstruktur und/oder Handelsverlauf)
+        html.Div([
+            html.H3("Ähnliche Länder finden"),
+
+            search.dropdown(
+                id='similar_country_dropdown',
+                dataset='df_grouped',
+                column='Land',
+                value='Islamische Republik Iran' if 'Islamische Republik Iran' in länder else länder[0],
+                clearable=False,
+                style={'width': '60%'}
+            ),
+
+            dcc.RadioItems(
+                id='similar_basis_radio',
+                options=[{'label': label, 'value': basis} for basis, label in similarity.BASES.items()],
+                value='gesamt',
+                inline=True
+            ),
+
+            dash_table.DataTable(
+                id='similar_countries_table',
+                columns=[
+                    {'name': 'Rang', 'id': 'Rang', 'type': 'numeric'},
+                    {'name': 'Land', 'id': 'Nachbar'},
+                    {'name': 'Ähnlichkeit', 'id': 'Ähnlichkeit', 'type': 'numeric'},
+                ],
+                style_table={'width': '60%'},
+                style_cell={'textAlign': 'left', 'font-family': 'sans-serif', 'font-size': '14px'},
+                style_header={'fontWeight': 'bold'},
+            ),
+
+            html.Button(f"Mit den {SIMILAR_COMPARE_N} ähnlichsten Ländern vergleichen", id='similar_compare_button', n_clicks=0,
+                        style={'margin-top': '10px'}),
+        ], style={'margin-top': '20px'}),
+
         html.Div([
             dcc.Graph(id='export_comparison_graph'),
             dcc.Graph(id='import_comparison_graph'),
             dcc.Graph(id='trade_comparison_graph'),
-        ])
+        ]),
+
+        export.links('country_comparison'),
     ])
 
 # Callback für die Aktualisierung der Graphen
@@ -50,97 +90,42 @@ def create_layout():
      Output('trade_comparison_graph', 'figure')],
     Input('land_dropdown', 'value')
 )
+@callbacks.cached()
 def update_graph(selected_countries):
     if not selected_countries:
         return go.Figure(), go.Figure(), go.Figure()  # Leere Diagramme, falls keine Auswahl
 
-    # Initialisieren der einzelnen Diagramme
-    export_fig = go.Figure()
-    import_fig = go.Figure()
-    trade_fig = go.Figure()
-
-    for country in selected_countries:
-        df_country = df_grouped[
-            (df_grouped['Land'] == country) &
-            (df_grouped['Jahr'] >= 2008) &
-            (df_grouped['Jahr'] <= 2024)
-        ]
-
-        # Export Graph
-        export_fig.add_trace(go.Scatter(
-            x=df_country['Jahr'],
-            y=df_country['export_wert'],
-            mode='lines+markers',
-            name=f"Exportvolumen ({country})",
-            line=dict(width=2),
-            hovertemplate=f'<b>Exportvolumen ({country})</b><br>Jahr: %{{x}}<br>Wert: %{{y:,.0f}} €<extra></extra>'
-        ))
-
-        # Import Graph
-        import_fig.add_trace(go.Scatter(
-            x=df_country['Jahr'],
-            y=df_country['import_wert'],
-            mode='lines+markers',
-            name=f"Importvolumen ({country})",
-            line=dict(width=2),
-            hovertemplate=f'<b>Importvolumen ({country})</b><br>Jahr: %{{x}}<br>Wert: %{{y:,.0f}} €<extra></extra>'
-        ))
-
-        # Trade Volume Graph
-        trade_fig.add_trace(go.Scatter(
-            x=df_country['Jahr'],
-            y=df_country['handelsvolumen_wert'],
-            mode='lines+markers',
-            name=f"Gesamthandelsvolumen ({country})",
-            line=dict(width=2),
-            hovertemplate=f'<b>Gesamthandelsvolumen ({country})</b><br>Jahr: %{{x}}<br>Wert: %{{y:,.0f}} €<extra></extra>'
-        ))
+    df_selected = queries.country_years(selected_countries)
+    df_countries = {
+        country: df_selected[(df_selected['Land'] == country) & df_selected['Jahr'].between(2008, 2024)]
+        for country in selected_countries
+    }
 
     # Maximale Werte bestimmen
-    max_value = df_grouped[df_grouped['Land'].isin(selected_countries)][
-        ['export_wert', 'import_wert', 'handelsvolumen_wert']
-    ].values.max()
-
-    # Dynamische Skalierung der Y-Achse
-    if max_value < 10e6:
-        step = 5e6
-    elif max_value < 50e6:
-        step = 10e6
-    elif max_value < 100e6:
-        step = 25e6
-    elif max_value < 250e6:
-        step = 50e6
-    elif max_value < 500e6:
-        step = 100e6
-    elif max_value < 1e9:
-        step = 250e6
-    elif max_value < 5e9:
-        step = 500e6
-    elif max_value < 10e9:
-        step = 1e9
-    elif max_value < 50e9:
-        step = 5e9
-    elif max_value < 100e9:
-        step = 10e9
-    else:
-        step = 25e9
-
-    rounded_max = math.ceil(max_value / step) * step
-
-    tickvals = np.arange(0, rounded_max + step, step)
-    ticktext = [formatter(val) for val in tickvals]
-
-    # Update für alle drei Graphen
-    for fig in [export_fig, import_fig, trade_fig]:
-        fig.update_layout(
-            xaxis_title='Jahr',
-            yaxis_title='Wert in €',
-            yaxis=dict(
-                tickvals=tickvals,
-                ticktext=ticktext
-            ),
-            legend=dict(title='Kategorie', bgcolor='rgba(255,255,255,0.7)')
+    max_value = df_selected[['export_wert', 'import_wert', 'handelsvolumen_wert']].values.max()
+
+    # Y-Achsen-Ticks setzen
+    tickvals, ticktext = axes.linear(max_value, labels='kompakt')
+
+    # Export-, Import- und Handelsvolumen-Graph aus demselben Gerüst
+    export_fig, import_fig, trade_fig = [
+        comparison_figure(
+            data=[
+                {
+                    'x': df_country['Jahr'],
+                    'y': df_country[col],
+                    'name': f"{name} ({country})",
+                    'hovertemplate': f'<b>{name} ({country})</b><br>Jahr: %{{x}}<br>Wert: %{{y:,.0f}} €<extra></extra>',
+                }
+                for country, df_country in df_countries.items()
+            ],
+            layout={'yaxis': {'tickvals': tickvals, 'ticktext': ticktext}}
+        )
+        for col, name in zip(
+            ['export_wert', 'import_wert', 'handelsvolumen_wert'],
+            ['Exportvolumen', 'Importvolumen', 'Gesamthandelsvolumen']
         )
+    ]
 
     return export_fig, import_fig, trade_fig
 
@@ -152,3 +137,39 @@ def update_graph(selected_countries):
 #          Output('trade_comparison_graph', 'figure')],
 #         Input('land_dropdown', 'value')
 #     )(update_graph)
+
+# Datenexport der Seite und Vorschläge ähnlicher Länder
+def register_callbacks(app):
+    search.register_dropdown(app, 'similar_country_dropdown', 'df_grouped', 'Land')
+    export.register(app, 'country_comparison', 'df_grouped', {
+        'Land': Input('land_dropdown', 'value'),
+    })
+
+    @app.callback(
+        Output('similar_countries_table', 'data'),
+        [Input('similar_country_dropdown', 'value'),
+         Input('similar_basis_radio', 'value')]
+    )
+    @callbacks.cached()
+    def update_similar(selected_country, selected_basis):
+        # Nur Nachschlagen in der vorberechneten Nachbartabelle
+        df_similar = similarity.similar(selected_country, SIMILAR_N, selected_basis)
+        return [
+            {'Rang': int(row.Rang), 'Nachbar': row.Nachbar, 'Ähnlichkeit': round(float(row.Ähnlichkeit), 3)}
+            for row in df_similar.itertuples(index=False)
+        ]
+
+    # Ausgewähltes Land und seine ähnlichsten Länder in den Vergleich übernehmen
+    # (die Optionen mitliefern, sonst zeigt das Dropdown nicht geladene Länder nicht an)
+    @app.callback(
+        [Output('land_dropdown', 'value'),
+         Output('land_dropdown', 'options', allow_duplicate=True)],
+        Input('similar_compare_button', 'n_clicks'),
+        [State('similar_country_dropdown', 'value'),
+         State('similar_basis_radio', 'value')],
+        prevent_initial_call=True
+    )
+    def compare_similar(n_clicks, selected_country, selected_basis):
+        df_similar = similarity.similar(selected_country, SIMILAR_COMPARE_N, selected_basis)
+        selected_countries = [selected_country] + df_similar['Nachbar'].tolist()
+        return selected_countries, search.options('df_grouped', 'Land', selected_countries)
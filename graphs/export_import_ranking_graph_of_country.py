@@ -1,80 +1,129 @@
 from dash import dcc, html
 from dash.dependencies import Input, Output
-import pandas as pd
 import plotly.graph_objects as go
-import numpy as np
 
-# Load data (Ensure the correct path!)
-df_grouped = pd.read_csv('data/df_grouped.csv')
+from core import axes, callbacks, datasets, export, figures, queries, ranking, search
 
-# Unique sorted country list
-länder_options = sorted(df_grouped['Land'].unique())
+# Kennzahl -> (Wertspalte, Bezeichnung, Farbe)
+RANKING_METRICS = {
+    'export': ('export_wert', 'Export-Ranking', '#1f77b4'),
+    'import': ('import_wert', 'Import-Ranking', '#2ca02c'),
+    'handelsvolumen': ('handelsvolumen_wert', 'Handelsvolumen-Ranking', '#ff7f0e'),
+    'handelsbilanz': ('handelsbilanz', 'Handelsbilanz-Ranking', '#d62728'),
+}
+
+TIE_LABELS = {
+    'average': 'Mittlerer Platz',
+    'min': 'Bester Platz',
+    'max': 'Schlechtester Platz',
+    'dense': 'Ohne Lücken',
+    'first': 'Reihenfolge der Daten',
+}
+
+# Figur-Gerüst (eine Linie je gewählter Kennzahl)
+@figures.template
+def ranking_figure():
+    fig = go.Figure(go.Scatter(mode='lines+markers', line=dict(width=2)))
+    fig.update_layout(
+        xaxis_title='Jahr',
+        yaxis_title='Ranking (niedriger = besser)',
+        legend=dict(title='Kategorie', bgcolor='rgba(255,255,255,0.7)')
+    )
+    return fig
 
 # Define layout function
 def create_layout():
+    df_grouped = datasets.get('df_grouped')
+
     return html.Div([
         html.H1("Platzierung im Export- und Importranking Deutschlands (2008-2024)"),
-        dcc.Dropdown(
+        search.dropdown(
             id='land_dropdown_ranking',
-            options=[{'label': land, 'value': land} for land in länder_options],
+            dataset='df_grouped',
+            column='Land',
             value='Islamische Republik Iran',  # Default value
             clearable=False,
             style={'width': '50%'}
         ),
+        dcc.Checklist(
+            id='ranking_metrics_checklist',
+            options=[{'label': name, 'value': key} for key, (_, name, _) in RANKING_METRICS.items()],
+            value=['export', 'import', 'handelsvolumen'],
+            inline=True,
+            style={'margin-top': '10px'}
+        ),
+        dcc.RadioItems(
+            id='ranking_subset_radio',
+            options=[{'label': 'Alle Länder', 'value': 'alle'}, {'label': 'Nur EU-Länder', 'value': 'eu'}],
+            value='alle',
+            inline=True,
+            style={'margin-top': '10px'}
+        ),
+        dcc.Dropdown(
+            id='ranking_tie_dropdown',
+            options=[{'label': f'Gleichstand: {label}', 'value': method} for method, label in TIE_LABELS.items()],
+            value='average',
+            clearable=False,
+            style={'width': '50%', 'margin-top': '10px'}
+        ),
         dcc.Graph(id='ranking_graph'),
+
+        export.links('export_import_ranking_graph_of_country'),
     ])
 
 # Register callback function
 def register_callbacks(app):
+    search.register_dropdown(app, 'land_dropdown_ranking', 'df_grouped', 'Land')
+    export.register(app, 'export_import_ranking_graph_of_country', 'df_grouped', {
+        'Land': Input('land_dropdown_ranking', 'value'),
+    })
+
     @app.callback(
         Output('ranking_graph', 'figure'),
-        Input('land_dropdown_ranking', 'value')
+        Input('land_dropdown_ranking', 'value'),
+        Input('ranking_metrics_checklist', 'value'),
+        Input('ranking_subset_radio', 'value'),
+        Input('ranking_tie_dropdown', 'value')
     )
-    def update_ranking_graph(selected_country):
-        df_country = df_grouped[(df_grouped['Land'] == selected_country) &
-                                (df_grouped['Jahr'] >= 2008) &
-                                (df_grouped['Jahr'] <= 2024)]
-
-        #df_country['export_ranking'] = df_country['export_ranking'].astype(int)
-        #df_country['import_ranking'] = df_country['import_ranking'].astype(int)
-        #df_country['handelsvolumen_ranking'] = df_country['handelsvolumen_ranking'].astype(int)
-
-        df_country.loc[:, 'export_ranking'] = df_country['export_ranking'].astype(int)
-        df_country.loc[:, 'import_ranking'] = df_country['import_ranking'].astype(int)
-        df_country.loc[:, 'handelsvolumen_ranking'] = df_country['handelsvolumen_ranking'].astype(int)
-
-
-        fig = go.Figure()
-
-        for col, name, color in zip(
-            ['export_ranking', 'import_ranking', 'handelsvolumen_ranking'],
-            ['Export-Ranking', 'Import-Ranking', 'Handelsvolumen-Ranking'],
-            ['#1f77b4', '#2ca02c', '#ff7f0e']
-        ):
-            fig.add_trace(go.Scatter(
-                x=df_country['Jahr'],
-                y=df_country[col],
-                mode='lines+markers',
-                name=name,
-                line=dict(width=2, color=color),
-                hovertemplate=f'<b>{name}</b><br>Jahr: %{{x}}<br>Platzierung: %{{y}}<extra></extra>'
-            ))
-
-        min_ranking = df_country[['export_ranking', 'import_ranking', 'handelsvolumen_ranking']].min().min()
-        max_ranking = df_country[['export_ranking', 'import_ranking', 'handelsvolumen_ranking']].max().max()
-
-        step_size = max(1, (max_ranking - min_ranking) // 10)
-        tickvals = np.arange(min_ranking, max_ranking + step_size, step_size)
-
-        fig.update_layout(
-            title=f'Platzierung von {selected_country} im Export- und Importranking (2008-2024)',
-            xaxis_title='Jahr',
-            yaxis_title='Ranking (niedriger = besser)',
-            yaxis=dict(
-                tickvals=tickvals,
-                range=[max_ranking + 2, min_ranking - 2],
-            ),
-            legend=dict(title='Kategorie', bgcolor='rgba(255,255,255,0.7)')
+    @callbacks.cached()
+    def update_ranking_graph(selected_country, selected_metrics, subset, tie_method):
+        metrics = [key for key in RANKING_METRICS if key in (selected_metrics or [])]
+        countries = ranking.SUBSETS.get(subset)
+
+        if not metrics or (countries is not None and selected_country not in countries):
+            return go.Figure(layout=dict(title=f'Keine Platzierung für {selected_country} in der gewählten Auswahl'))
+
+        # Rankings je Jahr innerhalb der gewählten Ländergruppe neu berechnen
+        df_subset = queries.table('df_grouped') if countries is None else queries.country_years(countries)
+        columns = [f'{key}_ranking' for key in metrics]
+        ranks = ranking.rank_table(df_subset, [RANKING_METRICS[key][0] for key in metrics], method=tie_method)
+        ranks.columns = columns
+
+        country_mask = ((df_subset['Land'] == selected_country) &
+                        (df_subset['Jahr'] >= 2008) &
+                        (df_subset['Jahr'] <= 2024))
+        df_country = df_subset.loc[country_mask, ['Jahr']].join(ranks[country_mask])
+        df_country[columns] = df_country[columns].astype(int)
+
+        tickvals, y_range = axes.ranking(df_country[columns])
+
+        traces = []
+        for key in metrics:
+            _, name, color = RANKING_METRICS[key]
+            traces.append({
+                'x': df_country['Jahr'],
+                'y': df_country[f'{key}_ranking'],
+                'name': name,
+                'line': {'color': color},
+                'hovertemplate': f'<b>{name}</b><br>Jahr: %{{x}}<br>Platzierung: %{{y}}<extra></extra>',
+            })
+
+        fig = ranking_figure(
+            data=traces,
+            layout={
+                'title': {'text': f'Platzierung von {selected_country} im Export- und Importranking (2008-2024)'},
+                'yaxis': {'tickvals': tickvals, 'range': y_range},
+            }
         )
 
         return fig
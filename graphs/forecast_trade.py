@@ -0,0 +1,153 @@
+import dash
+from dash import dcc, html
+import plotly.graph_objects as go
+
+from core import axes, callbacks, datasets, figures, forecast, search
+
+KENNZAHLEN = [('export', 'Export', '#1f77b4'), ('import', 'Import', '#ff7f0e')]
+
+# Figur-Gerüst: je Kennzahl Band, Verlauf und Prognose (wird einmal gebaut und validiert)
+@figures.template
+def forecast_figure():
+    fig = go.Figure()
+
+    for _, name, color in KENNZAHLEN:
+        fig.add_trace(go.Scatter(
+            name=f'{name} Prognoseband',
+            fill='toself',
+            line=dict(width=0),
+            fillcolor=color,
+            opacity=0.2,
+            hoverinfo='skip',
+            showlegend=False
+        ))
+        fig.add_trace(go.Scatter(
+            mode='lines',
+            name=name,
+            line=dict(width=2, color=color),
+            hovertemplate=f'<b>{name}</b><br>Monat: %{{x}}<br>Wert: %{{y:,.0f}} €<extra></extra>'
+        ))
+        fig.add_trace(go.Scatter(
+            mode='lines',
+            name=f'{name} (Prognose)',
+            line=dict(width=2, color=color, dash='dash'),
+            hovertemplate=f'<b>{name} (Prognose)</b><br>Monat: %{{x}}<br>Wert: %{{y:,.0f}} €<extra></extra>'
+        ))
+
+    fig.update_layout(
+        xaxis_title='Monat',
+        yaxis_title='Wert in €',
+        legend=dict(title='Kategorie', bgcolor='rgba(255,255,255,0.7)')
+    )
+    return fig
+
+# Funktion zur Erstellung des Layouts
+def create_layout():
+    df = datasets.get('trade_spec_country_and_year')
+    df_goods = datasets.get('aggregated_df')
+
+    return html.Div([
+        html.H1("Prognose der monatlichen Export- und Importwerte"),
+
+        dcc.RadioItems(
+            id='forecast_kind_radio',
+            options=[{'label': 'Land', 'value': 'land'}, {'label': 'Ware', 'value': 'ware'}],
+            value='land',
+            inline=True
+        ),
+
+        html.Div(
+            search.dropdown(
+                id='forecast_country_dropdown',
+                dataset='trade_spec_country_and_year',
+                column='Land',
+                value='Islamische Republik Iran' if 'Islamische Republik Iran' in df['Land'].values else df['Land'].dropna().unique()[0],
+                clearable=False,
+                style={'width': '50%'}
+            ),
+            id='forecast_country_container'
+        ),
+
+        html.Div(
+            search.dropdown(
+                id='forecast_good_dropdown',
+                dataset='aggregated_df',
+                column='Label',
+                value='Mineralische Brennstoffe usw.' if 'Mineralische Brennstoffe usw.' in df_goods['Label'].values else df_goods['Label'].dropna().unique()[0],
+                clearable=False,
+                style={'width': '50%'}
+            ),
+            id='forecast_good_container',
+            style={'display': 'none'}
+        ),
+
+        html.Div(id='forecast_info_text', style={'margin-top': '20px', 'font-size': '16px', 'font-weight': 'bold'}),
+
+        dcc.Graph(id='forecast_graph'),
+    ])
+
+def register_callbacks(app):
+    search.register_dropdown(app, 'forecast_country_dropdown', 'trade_spec_country_and_year', 'Land')
+    search.register_dropdown(app, 'forecast_good_dropdown', 'aggregated_df', 'Label')
+
+    # Nur die Auswahl der gewählten Art (Land oder Ware) anzeigen
+    @app.callback(
+        [dash.Output('forecast_country_container', 'style'),
+         dash.Output('forecast_good_container', 'style')],
+        [dash.Input('forecast_kind_radio', 'value')]
+    )
+    def toggle_dropdowns(kind):
+        hidden = {'display': 'none'}
+        return ({}, hidden) if kind == 'land' else (hidden, {})
+
+    @app.callback(
+        [dash.Output('forecast_graph', 'figure'),
+         dash.Output('forecast_info_text', 'children')],
+        [dash.Input('forecast_kind_radio', 'value'),
+         dash.Input('forecast_country_dropdown', 'value'),
+         dash.Input('forecast_good_dropdown', 'value')]
+    )
+    def update_graph(kind, selected_country, selected_good):
+        # Direkt angepasste Ergebnisse nur cachen, bis die Prognosen aller Reihen vorliegen
+        return build_graph(kind, selected_country, selected_good, forecast.ready())
+
+    @callbacks.cached()
+    def build_graph(kind, selected_country, selected_good, ready):
+        name = selected_country if kind == 'land' else selected_good
+        results = {metric: forecast.forecast(kind, name, metric) for metric, _, _ in KENNZAHLEN}
+
+        if any(result is None for result in results.values()):
+            return go.Figure(), f"Keine Daten für {name} verfügbar."
+
+        # Band als geschlossene Fläche: obere Grenze hin, untere zurück
+        data = []
+        for metric, _, _ in KENNZAHLEN:
+            result = results[metric]
+            months = result['prognose'].index.astype(str).tolist()
+            data += [
+                {'x': months + months[::-1], 'y': result['oben'].tolist() + result['unten'].tolist()[::-1]},
+                {'x': result['verlauf'].index.astype(str), 'y': result['verlauf'].values},
+                # Prognose am letzten Ist-Monat anschließen
+                {'x': [str(result['verlauf'].index[-1])] + months,
+                 'y': [result['verlauf'].values[-1]] + result['prognose'].tolist()},
+            ]
+
+        max_value = max(max(result['verlauf'].max(), result['oben'].max()) for result in results.values())
+        tickvals, ticktext = axes.linear(max_value)
+
+        ziel = results['export']['prognose'].index[-1]
+        fig = forecast_figure(
+            data=data,
+            layout={
+                'title': {'text': f'Export- und Importprognose Deutschlands für {name} bis {ziel.strftime("%m/%Y")}'},
+                'yaxis': {'tickvals': tickvals, 'ticktext': ticktext},
+            }
+        )
+
+        summen = {metric: results[metric]['prognose'].sum() / 1e9 for metric, _, _ in KENNZAHLEN}
+        info_text = (f"Prognose für die nächsten {forecast.HORIZON} Monate: Export {summen['export']:.2f} Mrd €, "
+                     f"Import {summen['import']:.2f} Mrd € (Holt-Winters mit gedämpftem Trend und Saison")
+        if results['export']['quelle'] == 'direkt' and forecast.ENABLED:
+            info_text += "; die Modelle aller Reihen werden noch im Hintergrund berechnet"
+        info_text += ")"
+        return fig, info_text
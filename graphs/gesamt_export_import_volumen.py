@@ -1,15 +1,12 @@
 import dash
 from dash import dcc, html
-import pandas as pd
 import plotly.graph_objects as go
-import numpy as np
+
+from core import axes, datasets, export
 
 def create_layout():
-    # CSV file path
-    data_file = 'data/1gesamt_deutschland.csv'
-    
     # Read data
-    df_gesamt_deutschland = pd.read_csv(data_file)
+    df_gesamt_deutschland = datasets.get('gesamt_deutschland')
 
     # Create the graph
     fig = go.Figure()
@@ -31,8 +28,7 @@ def create_layout():
 
     # Calculate Y-axis tick values
     max_value = df_gesamt_deutschland[['gesamt_export', 'gesamt_import', 'gesamt_handelsvolumen']].values.max()
-    tick_step = 500e9  # 500 Mrd as step size
-    tickvals = np.arange(0, max_value + tick_step, tick_step)
+    tickvals, ticktext = axes.linear(max_value, step=500e9, labels='ganz')  # 500 Mrd as step size
 
     # Layout settings
     fig.update_layout(
@@ -42,13 +38,18 @@ def create_layout():
         yaxis=dict(
             tickformat=',',
             tickvals=tickvals,
-            ticktext=[f"{val/1e9:.0f} Mrd" for val in tickvals]
+            ticktext=ticktext
         ),
         legend=dict(title='Kategorie', bgcolor='rgba(255,255,255,0.7)')
     )
 
     return html.Div([
         html.H1("Deutschlands Handelsentwicklung"),
-        dcc.Graph(figure=fig)
+        dcc.Graph(figure=fig),
+
+        export.links('gesamt_export_import_volumen'),
     ])
 
+# Datenexport der Seite
+def register_callbacks(app):
+    export.register(app, 'gesamt_export_import_volumen', 'gesamt_deutschland', {})
@@ -1,25 +1,40 @@
 import dash
 from dash import dcc, html
 from dash.dependencies import Input, Output
-import pandas as pd
 import plotly.graph_objects as go
-import numpy as np
-import math
-
-# CSV-Datei einlesen
-data_file = 'data/gesamt_deutschland_monthly.csv'
-gesamt_deutschland_monthly = pd.read_csv(data_file)
-
-# Funktion zur Formatierung der Y-Achse
-def formatter(value):
-    if value >= 1e9:
-        return f'{value / 1e9:.0f} Mrd'
-    elif value >= 1e6:
-        return f'{value / 1e6:.0f} Mio'
-    else:
-        return str(value)
+
+from core import axes, callbacks, datasets, decomposition, export, figures, queries, series, stores
+
+
+# Figur-Gerüst (wird einmal gebaut und validiert)
+@figures.template
+def monthly_figure():
+    fig = go.Figure()
+    for name, color in zip(
+        ['Exportvolumen', 'Importvolumen', 'Gesamthandelsvolumen'],
+        ['#1f77b4', '#ff7f0e', '#2ca02c']
+    ):
+        fig.add_trace(go.Scatter(
+            mode='lines+markers',
+            name=name,
+            line=dict(width=2, color=color),
+            hovertemplate=f'<b>{name}</b><br>Monat: %{{x}}<br>Wert: %{{y:,.0f}} €<extra></extra>'
+        ))
+    fig.update_layout(
+        xaxis_title='Monat',
+        yaxis_title='Wert in €',
+        xaxis=dict(
+            tickmode='array',
+            tickvals=list(range(1, 13)),
+            ticktext=axes.MONATE_KURZ
+        ),
+        legend=dict(title='Kategorie', bgcolor='rgba(255,255,255,0.7)')
+    )
+    return fig
 
 def create_layout():
+    gesamt_deutschland_monthly = datasets.get('gesamt_deutschland_monthly')
+
     return html.Div([
         html.H1("Monatlicher Handelsverlauf Deutschlands"),
 
@@ -33,54 +48,59 @@ def create_layout():
 
         dcc.Graph(id='monatlicher_handel_graph'),
 
-        dcc.Store(id='monatlicher_handel_data', data=gesamt_deutschland_monthly.to_dict('records'))
+        # Zerlegung der Monatswerte in Trend, Saison und Rest
+        dcc.RadioItems(
+            id='monatlicher_handel_zerlegung_kennzahl',
+            options=decomposition.METRIC_OPTIONS,
+            value='export',
+            inline=True
+        ),
+
+        dcc.Graph(id='monatlicher_handel_zerlegung_graph'),
+
+        dcc.Store(id='monatlicher_handel_data', data=stores.encode(gesamt_deutschland_monthly, binary=True)),
+
+        export.links('monthly_trade'),
     ])
 
 # Callback-Funktion für die Aktualisierung des Graphen
 def register_callbacks(app):
+    export.register(app, 'monthly_trade', 'gesamt_deutschland_monthly', {
+        'Jahr': Input('jahr_dropdown', 'value'),
+    })
+
     @app.callback(
         Output('monatlicher_handel_graph', 'figure'),
         Input('jahr_dropdown', 'value')
     )
+    @callbacks.cached()
     def update_graph(year_selected):
-        df_year_monthly = gesamt_deutschland_monthly[gesamt_deutschland_monthly['Jahr'] == year_selected]
-
-        fig = go.Figure()
-
-        for col, name, color in zip(
-            ['export_wert', 'import_wert', 'handelsvolumen_wert'],
-            ['Exportvolumen', 'Importvolumen', 'Gesamthandelsvolumen'],
-            ['#1f77b4', '#ff7f0e', '#2ca02c']
-        ):
-            fig.add_trace(go.Scatter(
-                x=df_year_monthly['Monat'],
-                y=df_year_monthly[col],
-                mode='lines+markers',
-                name=name,
-                line=dict(width=2, color=color),
-                hovertemplate=f'<b>{name}</b><br>Monat: %{{x}}<br>Wert: %{{y:,.0f}} €<extra></extra>'
-            ))
+        df_year_monthly = queries.monthly(None, year_selected)
 
         # Maximale Werte bestimmen und Y-Achse skalieren
         max_value = df_year_monthly[['export_wert', 'import_wert', 'handelsvolumen_wert']].values.max()
-        rounded_max = math.ceil(max_value / 50e9) * 50e9
-        tickvals = np.arange(0, rounded_max + 1, 25e9)
-        ticktext = [formatter(val) for val in tickvals]
-
-        fig.update_layout(
-            title=f'Monatlicher Export-, Import- und Handelsverlauf Deutschlands im Jahr {year_selected}',
-            xaxis_title='Monat',
-            yaxis_title='Wert in €',
-            xaxis=dict(
-                tickmode='array',
-                tickvals=list(range(1, 13)),
-                ticktext=['Jan', 'Feb', 'Mär', 'Apr', 'Mai', 'Jun', 'Jul', 'Aug', 'Sep', 'Okt', 'Nov', 'Dez']
-            ),
-            yaxis=dict(
-                tickvals=tickvals,
-                ticktext=ticktext
-            ),
-            legend=dict(title='Kategorie', bgcolor='rgba(255,255,255,0.7)')
+        tickvals, ticktext = axes.linear(max_value, step=25e9, labels='ganz')
+
+        fig = monthly_figure(
+            data=[{'x': df_year_monthly['Monat'], 'y': df_year_monthly[col]}
+                  for col in ['export_wert', 'import_wert', 'handelsvolumen_wert']],
+            layout={
+                'title': {'text': f'Monatlicher Export-, Import- und Handelsverlauf Deutschlands im Jahr {year_selected}'},
+                'yaxis': {'tickvals': tickvals, 'ticktext': ticktext},
+            }
         )
 
         return fig
+
+    @app.callback(
+        Output('monatlicher_handel_zerlegung_graph', 'figure'),
+        [Input('jahr_dropdown', 'value'),
+         Input('monatlicher_handel_zerlegung_kennzahl', 'value')]
+    )
+    @callbacks.cached()
+    def update_decomposition(year_selected, metric_selected):
+        df_components = decomposition.frame('gesamt', series.GESAMT, metric_selected, year_selected)
+        return decomposition.figure(
+            df_components,
+            f'Trend, Saison und Rest im Handel Deutschlands im Jahr {year_selected}'
+        )
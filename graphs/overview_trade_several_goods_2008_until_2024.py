@@ -1,26 +1,8 @@
 import dash
 from dash import dcc, html
-import pandas as pd
 import plotly.graph_objects as go
-import os
-import numpy as np
-import math
 
-# Relativer Pfad zur CSV-Datei
-csv_path = os.path.join(os.path.dirname(__file__), "../data/aggregated_df.csv")
-
-# Daten laden
-df = pd.read_csv(csv_path)
-
-# Sicherstellen, dass notwendige Spalten vorhanden sind
-if df.empty or not {'Jahr', 'Label', 'Ausfuhr: Wert', 'Einfuhr: Wert'}.issubset(df.columns):
-    raise ValueError("Die CSV-Datei konnte nicht korrekt geladen werden oder enthält nicht alle benötigten Spalten.")
-
-# Daten aggregieren: monatliche Werte zu jährlichen Summen je Ware
-df_yearly = df.groupby(['Jahr', 'Label'], as_index=False).agg({
-    'Ausfuhr: Wert': 'sum',
-    'Einfuhr: Wert': 'sum'
-})
+from core import axes, callbacks, datasets, export, figures, jobs, queries, search
 
 # Liste der Farben für Konsistenz
 colors = [
@@ -32,35 +14,45 @@ colors = [
     "#20b2aa", "#ff69b4", "#b8860b", "#008080", "#adff2f"
 ]
 
-# Farben Waren zuordnen
-unique_labels = sorted(df_yearly['Label'].dropna().unique())
-color_dict = {label: colors[i % len(colors)] for i, label in enumerate(unique_labels)}
-
-# Hilfsfunktionen für Y-Achsen
-def determine_step_size(max_value):
-    thresholds = [5e6, 10e6, 50e6, 100e6, 250e6, 500e6, 1e9, 5e9, 10e9, 50e9, 100e9]
-    steps = [1e6, 5e6, 10e6, 25e6, 50e6, 100e6, 250e6, 500e6, 1e9, 2e9, 10e9]
-    for i, threshold in enumerate(thresholds):
-        if max_value < threshold:
-            return steps[i]
-    return 25e9
-
-def formatter(value):
-    if value >= 1e9:
-        return f'{value / 1e9:.2f} Mrd €'
-    elif value >= 1e6:
-        return f'{value / 1e6:.0f} Mio €'
-    else:
-        return f'{value:,.0f} €'
+# Farben den Waren zuordnen (einmal je Datenversion)
+@datasets.per_version
+def color_dict(snapshot):
+    df = snapshot['aggregated_df']
+
+    # Sicherstellen, dass notwendige Spalten vorhanden sind
+    if df.empty or not {'Jahr', 'Label', 'Ausfuhr: Wert', 'Einfuhr: Wert'}.issubset(df.columns):
+        raise ValueError("Die CSV-Datei konnte nicht korrekt geladen werden oder enthält nicht alle benötigten Spalten.")
+
+    unique_labels = sorted(df['Label'].dropna().unique())
+    return {label: colors[i % len(colors)] for i, label in enumerate(unique_labels)}
+
+# Figur-Gerüst für Export- bzw. Importgrafik, eine Linie je Ware (wird einmal gebaut und validiert)
+def goods_figure(title, yaxis_title):
+    @figures.template
+    def build():
+        fig = go.Figure(go.Scatter(mode='lines+markers', line=dict(width=2)))
+        fig.update_layout(
+            title=title,
+            xaxis_title='Jahr',
+            yaxis_title=yaxis_title,
+            xaxis=dict(tickmode='array'),
+            legend=dict(title='Waren')
+        )
+        return fig
+    return build
+
+export_figure = goods_figure('Jährliche Exporte aus Deutschland (alle Länder)', 'Exportwert in €')
+import_figure = goods_figure('Jährliche Importe nach Deutschland (aus allen Ländern)', 'Importwert in €')
 
 # Layout-Funktion
 def create_layout():
     return html.Div([
         html.H1("Gesamter Export- und Importverlauf der Waren (jährliche Werte)"),
 
-        dcc.Dropdown(
+        search.dropdown(
             id='overview_goods_dropdown',
-            options=[{'label': label, 'value': label} for label in unique_labels],
+            dataset='aggregated_df',
+            column='Label',
             value=['Mineralische Brennstoffe usw.', 'Kraftfahrzeuge, Landfahrzeuge'],
             multi=True,
             clearable=False,
@@ -69,88 +61,92 @@ def create_layout():
 
         html.Div(id='overview_goods_info_text', style={'margin-top': '20px', 'font-size': '16px', 'font-weight': 'bold'}),
 
+        *jobs.layout('overview_goods'),
+
         dcc.Graph(id='overview_goods_export_graph'),
         dcc.Graph(id='overview_goods_import_graph'),
+
+        export.links('overview_trade_several_goods_2008_until_2024'),
     ])
 
-# Callback-Funktion
-def register_callbacks(app):
-    @app.callback(
-        [dash.Output('overview_goods_export_graph', 'figure'),
-         dash.Output('overview_goods_import_graph', 'figure'),
-         dash.Output('overview_goods_info_text', 'children')],
-        [dash.Input('overview_goods_dropdown', 'value')]
+# Eingaben für build_graphs aus dem aktuellen Snapshot
+def graph_args(selected_goods):
+    # Monatliche Werte zu jährlichen Summen je Ware
+    df_filtered = queries.yearly_by_good(selected_goods)
+    return df_filtered, selected_goods, color_dict()
+
+# Figuren berechnen; läuft im Hintergrundbetrieb in einem Pool-Prozess (siehe core.jobs)
+def build_graphs(progress, df_filtered, selected_goods, color_dict):
+    if df_filtered.empty:
+        return go.Figure(), go.Figure(), "Keine Daten für die ausgewählten Waren verfügbar."
+
+    max_export = df_filtered['Ausfuhr: Wert'].max()
+    max_import = df_filtered['Einfuhr: Wert'].max()
+
+    # Linien je Ware vorbereiten
+    export_traces = []
+    import_traces = []
+    for i, label in enumerate(selected_goods):
+        progress(i, len(selected_goods))
+        df_label = df_filtered[df_filtered['Label'] == label]
+        color = color_dict.get(label, '#000000')
+
+        export_traces.append({
+            'x': df_label['Jahr'],
+            'y': df_label['Ausfuhr: Wert'],
+            'name': f"{label} - Export",
+            'line': {'color': color},
+            'hovertemplate': f'<b>{label} - Export</b><br>Jahr: %{{x}}<br>Wert: %{{y:,.0f}} €<extra></extra>',
+        })
+        import_traces.append({
+            'x': df_label['Jahr'],
+            'y': df_label['Einfuhr: Wert'],
+            'name': f"{label} - Import",
+            'line': {'color': color},
+            'hovertemplate': f'<b>{label} - Import</b><br>Jahr: %{{x}}<br>Wert: %{{y:,.0f}} €<extra></extra>',
+        })
+
+    # Achsen formatieren
+    tickvals_export, ticktext_export = axes.linear(max_export)
+    tickvals_import, ticktext_import = axes.linear(max_import)
+    jahre = sorted(df_filtered['Jahr'].unique())
+
+    fig_export = export_figure(
+        data=export_traces,
+        layout={'xaxis': {'tickvals': jahre}, 'yaxis': {'tickvals': tickvals_export, 'ticktext': ticktext_export}}
+    )
+    fig_import = import_figure(
+        data=import_traces,
+        layout={'xaxis': {'tickvals': jahre}, 'yaxis': {'tickvals': tickvals_import, 'ticktext': ticktext_import}}
     )
-    def update_graphs(selected_goods):
-        df_filtered = df_yearly[df_yearly['Label'].isin(selected_goods)]
-
-        if df_filtered.empty:
-            return go.Figure(), go.Figure(), "Keine Daten für die ausgewählten Waren verfügbar."
-
-        # Graphen vorbereiten
-        fig_export = go.Figure()
-        fig_import = go.Figure()
-
-        max_export = df_filtered['Ausfuhr: Wert'].max()
-        max_import = df_filtered['Einfuhr: Wert'].max()
-
-        for label in selected_goods:
-            df_label = df_filtered[df_filtered['Label'] == label]
-            color = color_dict.get(label, '#000000')
-
-            fig_export.add_trace(go.Scatter(
-                x=df_label['Jahr'],
-                y=df_label['Ausfuhr: Wert'],
-                mode='lines+markers',
-                name=f"{label} - Export",
-                line=dict(width=2, color=color),
-                hovertemplate=f'<b>{label} - Export</b><br>Jahr: %{{x}}<br>Wert: %{{y:,.0f}} €<extra></extra>'
-            ))
-
-            fig_import.add_trace(go.Scatter(
-                x=df_label['Jahr'],
-                y=df_label['Einfuhr: Wert'],
-                mode='lines+markers',
-                name=f"{label} - Import",
-                line=dict(width=2, color=color),
-                hovertemplate=f'<b>{label} - Import</b><br>Jahr: %{{x}}<br>Wert: %{{y:,.0f}} €<extra></extra>'
-            ))
-
-        # Achsen formatieren
-        step_size_export = determine_step_size(max_export)
-        rounded_max_export = math.ceil(max_export / step_size_export) * step_size_export
-        tickvals_export = np.arange(0, rounded_max_export + 1, step_size_export)
-        ticktext_export = [formatter(val) for val in tickvals_export]
-
-        step_size_import = determine_step_size(max_import)
-        rounded_max_import = math.ceil(max_import / step_size_import) * step_size_import
-        tickvals_import = np.arange(0, rounded_max_import + 1, step_size_import)
-        ticktext_import = [formatter(val) for val in tickvals_import]
-
-        fig_export.update_layout(
-            title='Jährliche Exporte aus Deutschland (alle Länder)',
-            xaxis_title='Jahr',
-            yaxis_title='Exportwert in €',
-            xaxis=dict(tickmode='array', tickvals=sorted(df_filtered['Jahr'].unique())),
-            yaxis=dict(tickvals=tickvals_export, ticktext=ticktext_export),
-            legend=dict(title='Waren')
-        )
 
-        fig_import.update_layout(
-            title='Jährliche Importe nach Deutschland (aus allen Ländern)',
-            xaxis_title='Jahr',
-            yaxis_title='Importwert in €',
-            xaxis=dict(tickmode='array', tickvals=sorted(df_filtered['Jahr'].unique())),
-            yaxis=dict(tickvals=tickvals_import, ticktext=ticktext_import),
-            legend=dict(title='Waren')
-        )
+    # Handelsbilanz-Berechnung
+    total_export = df_filtered['Ausfuhr: Wert'].sum() / 1e9
+    total_import = df_filtered['Einfuhr: Wert'].sum() / 1e9
+    handelsbilanz = total_export - total_import
+    status = "Handelsüberschuss" if handelsbilanz > 0 else "Handelsdefizit" if handelsbilanz < 0 else "Ausgeglichene Handelsbilanz"
 
-        # Handelsbilanz-Berechnung
-        total_export = df_filtered['Ausfuhr: Wert'].sum() / 1e9
-        total_import = df_filtered['Einfuhr: Wert'].sum() / 1e9
-        handelsbilanz = total_export - total_import
-        status = "Handelsüberschuss" if handelsbilanz > 0 else "Handelsdefizit" if handelsbilanz < 0 else "Ausgeglichene Handelsbilanz"
+    info_text = f"Gesamter Export: {total_export:.2f} Mrd €, Gesamter Import: {total_import:.2f} Mrd € → {status}: {handelsbilanz:.2f} Mrd € (für die ausgewählten Waren von 2008–2024)"
 
-        info_text = f"Gesamter Export: {total_export:.2f} Mrd €, Gesamter Import: {total_import:.2f} Mrd € → {status}: {handelsbilanz:.2f} Mrd € (für die ausgewählten Waren von 2008–2024)"
+    return fig_export, fig_import, info_text
 
-        return fig_export, fig_import, info_text
+# Callback-Funktion
+def register_callbacks(app):
+    search.register_dropdown(app, 'overview_goods_dropdown', 'aggregated_df', 'Label')
+    export.register(app, 'overview_trade_several_goods_2008_until_2024', 'aggregated_df', {
+        'Label': dash.Input('overview_goods_dropdown', 'value'),
+    })
+
+    outputs = [dash.Output('overview_goods_export_graph', 'figure'),
+               dash.Output('overview_goods_import_graph', 'figure'),
+               dash.Output('overview_goods_info_text', 'children')]
+    inputs = [dash.Input('overview_goods_dropdown', 'value')]
+
+    if jobs.ENABLED:
+        jobs.register_background(app, 'overview_goods', outputs, inputs, graph_args, build_graphs)
+        return
+
+    @app.callback(outputs, inputs)
+    @callbacks.cached()
+    def update_graphs(selected_goods):
+        return build_graphs(jobs.no_progress, *graph_args(selected_goods))
@@ -1,53 +1,40 @@
 import dash
 from dash import dcc, html
-import pandas as pd
 import plotly.graph_objects as go
-import os
-import numpy as np
-import math
-
-# Relativer Pfad zur CSV-Datei
-csv_path = os.path.join(os.path.dirname(__file__), "../data/aggregated_df.csv")
-
-# Daten laden
-df = pd.read_csv(csv_path)
-
-# Monatliche Werte in jährliche Werte aggregieren
-df_yearly = df.groupby(['Jahr', 'Label'], as_index=False).agg({
-    'Ausfuhr: Wert': 'sum',
-    'Einfuhr: Wert': 'sum'
-})
-
-# Werte auf Originalniveau bringen, falls nötig
-df_yearly[['Ausfuhr: Wert', 'Einfuhr: Wert']] = df_yearly[['Ausfuhr: Wert', 'Einfuhr: Wert']].fillna(0)
-
-# Funktion zur optimalen Y-Achsen-Schrittweite
-def determine_step_size(max_value):
-    thresholds = [5e6, 10e6, 50e6, 100e6, 250e6, 500e6, 1e9, 5e9, 10e9, 50e9, 100e9]
-    steps = [1e6, 5e6, 10e6, 25e6, 50e6, 100e6, 250e6, 500e6, 1e9, 2e9, 10e9]
-    for i, threshold in enumerate(thresholds):
-        if max_value < threshold:
-            return steps[i]
-    return 25e9
-
-# Formatierung der Y-Achse
-def formatter(value):
-    if value >= 1e9:
-        return f'{value / 1e9:.2f} Mrd €'
-    elif value >= 1e6:
-        return f'{value / 1e6:.0f} Mio €'
-    else:
-        return f'{value:,.0f} €'
+
+from core import axes, callbacks, datasets, export, figures, queries, search
+
+# Figur-Gerüst mit Export- und Importlinie (wird einmal gebaut und validiert)
+@figures.template
+def trade_figure():
+    fig = go.Figure()
+    for name, color in zip(['Exportwert', 'Importwert'], ['#1f77b4', '#ff7f0e']):
+        fig.add_trace(go.Scatter(
+            mode='lines+markers',
+            name=name,
+            line=dict(width=2, color=color),
+            hovertemplate=f'<b>{name}</b><br>Jahr: %{{x}}<br>Wert: %{{y:,.0f}} €<extra></extra>'
+        ))
+    fig.update_layout(
+        xaxis_title='Jahr',
+        yaxis_title='Wert in €',
+        xaxis=dict(tickmode='array'),
+        legend=dict(title='Kategorie', bgcolor='rgba(255,255,255,0.7)')
+    )
+    return fig
 
 # Layout-Funktion
 def create_layout():
+    df = datasets.get('aggregated_df')
+
     return html.Div([
         html.H1("Gesamtüberblick: Ex- und Importe einer Ware (2008–2024)"),
 
-        dcc.Dropdown(
+        search.dropdown(
             id='overview_trade_spec_good_dropdown_good_only',
-            options=[{'label': good, 'value': good} for good in sorted(df_yearly['Label'].dropna().unique())],
-            value='Mineralische Brennstoffe usw.' if 'Mineralische Brennstoffe usw.' in df_yearly['Label'].values else df_yearly['Label'].dropna().unique()[0],
+            dataset='aggregated_df',
+            column='Label',
+            value='Mineralische Brennstoffe usw.' if 'Mineralische Brennstoffe usw.' in df['Label'].values else df['Label'].dropna().unique()[0],
             clearable=False,
             style={'width': '50%'}
         ),
@@ -55,58 +42,45 @@ def create_layout():
         html.Div(id='overview_trade_spec_good_info_text_good_only', style={'margin-top': '20px', 'font-size': '16px', 'font-weight': 'bold'}),
 
         dcc.Graph(id='overview_trade_spec_good_graph_good_only'),
+
+        export.links('overview_trade_spec_good_2008_until_2024'),
     ])
 
 # Callback-Registrierung
 def register_callbacks(app):
+    search.register_dropdown(app, 'overview_trade_spec_good_dropdown_good_only', 'aggregated_df', 'Label')
+    export.register(app, 'overview_trade_spec_good_2008_until_2024', 'aggregated_df', {
+        'Label': dash.Input('overview_trade_spec_good_dropdown_good_only', 'value'),
+    })
+
     @app.callback(
         [dash.Output('overview_trade_spec_good_graph_good_only', 'figure'),
          dash.Output('overview_trade_spec_good_info_text_good_only', 'children')],
         [dash.Input('overview_trade_spec_good_dropdown_good_only', 'value')]
     )
+    @callbacks.cached()
     def update_graph(selected_good):
-        df_filtered = df_yearly[df_yearly['Label'] == selected_good]
+        # Monatliche Werte zu jährlichen Werten aggregieren
+        df_filtered = queries.yearly_by_good(selected_good)
 
         if df_filtered.empty:
             return go.Figure(), f"Keine Daten für {selected_good} verfügbar."
 
-        fig = go.Figure()
-
-        # Linienplot für Export & Import
-        for col, name, color in zip(
-            ['Ausfuhr: Wert', 'Einfuhr: Wert'],
-            ['Exportwert', 'Importwert'],
-            ['#1f77b4', '#ff7f0e']
-        ):
-            fig.add_trace(go.Scatter(
-                x=df_filtered['Jahr'],
-                y=df_filtered[col],
-                mode='lines+markers',
-                name=name,
-                line=dict(width=2, color=color),
-                hovertemplate=f'<b>{name}</b><br>Jahr: %{{x}}<br>Wert: %{{y:,.0f}} €<extra></extra>'
-            ))
-
         # Y-Achse skalieren
         max_value = df_filtered[['Ausfuhr: Wert', 'Einfuhr: Wert']].values.max()
-        step_size = determine_step_size(max_value)
-        rounded_max = math.ceil(max_value / step_size) * step_size
-        tickvals = np.arange(0, rounded_max + 1, step_size)
-        ticktext = [formatter(val) for val in tickvals]
-
-        fig.update_layout(
-            title=f'Export- und Importverlauf von {selected_good} weltweit (2008–2024)',
-            xaxis_title='Jahr',
-            yaxis_title='Wert in €',
-            xaxis=dict(
-                tickmode='array',
-                tickvals=sorted(df_filtered['Jahr'].unique()),
-            ),
-            yaxis=dict(
-                tickvals=tickvals,
-                ticktext=ticktext
-            ),
-            legend=dict(title='Kategorie', bgcolor='rgba(255,255,255,0.7)')
+        tickvals, ticktext = axes.linear(max_value)
+
+        # Linienplot für Export & Import
+        fig = trade_figure(
+            data=[
+                {'x': df_filtered['Jahr'], 'y': df_filtered['Ausfuhr: Wert']},
+                {'x': df_filtered['Jahr'], 'y': df_filtered['Einfuhr: Wert']},
+            ],
+            layout={
+                'title': {'text': f'Export- und Importverlauf von {selected_good} weltweit (2008–2024)'},
+                'xaxis': {'tickvals': sorted(df_filtered['Jahr'].unique())},
+                'yaxis': {'tickvals': tickvals, 'ticktext': ticktext},
+            }
         )
 
         # Info-Text
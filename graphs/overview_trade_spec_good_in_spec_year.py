@@ -2,42 +2,38 @@
 
 import dash
 from dash import dcc, html
-import pandas as pd
-import os
-import numpy as np
-import math
 import plotly.graph_objects as go
 
-# Relativer Pfad zur CSV-Datei
-csv_path = os.path.join(os.path.dirname(__file__), "../data/aggregated_df.csv")
-
-# CSV laden
-df = pd.read_csv(csv_path)
-
-# Sicherstellen, dass Daten korrekt geladen wurden
-if df.empty:
-    raise ValueError("CSV-Datei konnte nicht geladen werden oder ist leer.")
-
-# Funktion zur Formatierung der Y-Achse
-def formatter(value):
-    if value >= 1e9:
-        return f'{value / 1e9:.2f} Mrd €'
-    elif value >= 1e6:
-        return f'{value / 1e6:.0f} Mio €'
-    else:
-        return f'{value:,.0f} €'
-
-# Dynamische Schrittweite für y-Achse
-def determine_step_size(max_value):
-    thresholds = [5e6, 10e6, 50e6, 100e6, 250e6, 500e6, 1e9, 5e9, 10e9, 50e9, 100e9]
-    steps = [1e6, 5e6, 10e6, 25e6, 50e6, 100e6, 250e6, 500e6, 1e9, 2e9, 10e9]
-    for i, threshold in enumerate(thresholds):
-        if max_value < threshold:
-            return steps[i]
-    return 25e9
+from core import axes, callbacks, datasets, export, figures, queries, search
+
+
+# Figur-Gerüst mit Export- und Importlinie (wird einmal gebaut und validiert)
+@figures.template
+def trade_figure():
+    fig = go.Figure()
+    for name, color in zip(['Exportvolumen', 'Importvolumen'], ['#1f77b4', '#ff7f0e']):
+        fig.add_trace(go.Scatter(
+            mode='lines+markers',
+            name=name,
+            line=dict(width=2, color=color),
+            hovertemplate=f'<b>{name}</b><br>Monat: %{{x}}<br>Wert: %{{y:,.0f}} €<extra></extra>'
+        ))
+    fig.update_layout(
+        xaxis_title='Monat',
+        yaxis_title='Wert in €',
+        xaxis=dict(
+            tickmode='array',
+            tickvals=list(range(1, 13)),
+            ticktext=axes.MONATE_KURZ
+        ),
+        legend=dict(title='Kategorie', bgcolor='rgba(255,255,255,0.7)')
+    )
+    return fig
 
 # Layout-Funktion
 def create_layout():
+    df = datasets.get('aggregated_df')
+
     return html.Div([
         html.H1("Monatlicher Export- und Importverlauf einer Ware im ausgewählten Jahr"),
 
@@ -49,9 +45,10 @@ def create_layout():
             style={'width': '50%'}
         ),
 
-        dcc.Dropdown(
+        search.dropdown(
             id='overview_spec_good_dropdown_good',
-            options=[{'label': str(g), 'value': g} for g in sorted(df['Label'].dropna().unique())],
+            dataset='aggregated_df',
+            column='Label',
             value='Mineralische Brennstoffe usw.' if 'Mineralische Brennstoffe usw.' in df['Label'].values else df['Label'].dropna().iloc[0],
             clearable=False,
             style={'width': '50%'}
@@ -60,64 +57,50 @@ def create_layout():
         html.Div(id='overview_spec_good_info_text', style={'margin-top': '20px', 'font-size': '16px', 'font-weight': 'bold'}),
 
         dcc.Graph(id='overview_spec_good_graph'),
+
+        export.links('overview_trade_spec_good_in_spec_year'),
     ])
 
 # Callback-Registrierung
 def register_callbacks(app):
+    search.register_dropdown(app, 'overview_spec_good_dropdown_good', 'aggregated_df', 'Label')
+    export.register(app, 'overview_trade_spec_good_in_spec_year', 'aggregated_df', {
+        'Jahr': dash.Input('overview_spec_good_dropdown_year', 'value'),
+        'Label': dash.Input('overview_spec_good_dropdown_good', 'value'),
+    })
+
     @app.callback(
         [dash.Output('overview_spec_good_graph', 'figure'),
          dash.Output('overview_spec_good_info_text', 'children')],
         [dash.Input('overview_spec_good_dropdown_year', 'value'),
          dash.Input('overview_spec_good_dropdown_good', 'value')]
     )
+    @callbacks.cached()
     def update_graph(selected_year, selected_good):
+
         # Daten filtern
-        df_filtered = df[(df['Jahr'] == selected_year) & (df['Label'] == selected_good)]
+        df_filtered = queries.goods(year=selected_year, good=selected_good)
 
         if df_filtered.empty:
             return go.Figure(), "Keine Daten für diese Kombination verfügbar."
 
-        fig = go.Figure()
-
-        for col, name, color in zip(
-            ['Ausfuhr: Wert', 'Einfuhr: Wert'],
-            ['Exportvolumen', 'Importvolumen'],
-            ['#1f77b4', '#ff7f0e']
-        ):
-            fig.add_trace(go.Scatter(
-                x=df_filtered['Monat'],
-                y=df_filtered[col],
-                mode='lines+markers',
-                name=name,
-                line=dict(width=2, color=color),
-                hovertemplate=f'<b>{name}</b><br>Monat: %{{x}}<br>Wert: %{{y:,.0f}} €<extra></extra>'
-            ))
-
         # Y-Achse berechnen
         max_value = df_filtered[['Ausfuhr: Wert', 'Einfuhr: Wert']].values.max()
-        step_size = determine_step_size(max_value)
-        rounded_max = math.ceil(max_value / step_size) * step_size
-        tickvals = np.arange(0, rounded_max + 1, step_size)
-        ticktext = [formatter(val) for val in tickvals]
-
-        fig.update_layout(
-            title=f'Monatlicher Export- und Importverlauf von "{selected_good}" im Jahr {selected_year}',
-            xaxis_title='Monat',
-            yaxis_title='Wert in €',
-            xaxis=dict(
-                tickmode='array',
-                tickvals=list(range(1, 13)),
-                ticktext=['Jan', 'Feb', 'Mär', 'Apr', 'Mai', 'Jun', 'Jul', 'Aug', 'Sep', 'Okt', 'Nov', 'Dez']
-            ),
-            yaxis=dict(
-                tickvals=tickvals,
-                ticktext=ticktext
-            ),
-            legend=dict(title='Kategorie', bgcolor='rgba(255,255,255,0.7)')
+        tickvals, ticktext = axes.linear(max_value)
+
+        fig = trade_figure(
+            data=[
+                {'x': df_filtered['Monat'], 'y': df_filtered['Ausfuhr: Wert']},
+                {'x': df_filtered['Monat'], 'y': df_filtered['Einfuhr: Wert']},
+            ],
+            layout={
+                'title': {'text': f'Monatlicher Export- und Importverlauf von "{selected_good}" im Jahr {selected_year}'},
+                'yaxis': {'tickvals': tickvals, 'ticktext': ticktext},
+            }
         )
 
         # Ranking-Info berechnen
-        df_year = df[df['Jahr'] == selected_year]
+        df_year = queries.goods(year=selected_year)
         export_ranking = df_year.groupby('Label')['Ausfuhr: Wert'].sum().sort_values(ascending=False).reset_index()
         import_ranking = df_year.groupby('Label')['Einfuhr: Wert'].sum().sort_values(ascending=False).reset_index()
 
@@ -1,58 +1,49 @@
 import dash
 from dash import dcc, html
-import pandas as pd
 import plotly.graph_objects as go
-import os
-import numpy as np
-import math
-
-# Relativer Pfad zur CSV-Datei
-csv_path = os.path.join(os.path.dirname(__file__), "../data/top10_goods_spec_country_and_year.csv")
-
-# Daten laden
-df = pd.read_csv(csv_path)
-
-# Falls die Daten nicht korrekt geladen wurden, abbrechen
-if df.empty:
-    raise ValueError("CSV-Datei konnte nicht geladen werden oder ist leer.")
-
-# Werte umrechnen (Tausenderwerte auf Originalwerte)
-df[['Ausfuhr: Wert', 'Einfuhr: Wert']] = df[['Ausfuhr: Wert', 'Einfuhr: Wert']].fillna(0) * 1000
-
-# Funktion zur Bestimmung der optimalen Schrittgröße für die Y-Achse
-def determine_step_size(max_value):
-    thresholds = [5e6, 10e6, 50e6, 100e6, 250e6, 500e6, 1e9, 5e9, 10e9, 50e9, 100e9]
-    steps = [1e6, 5e6, 10e6, 25e6, 50e6, 100e6, 250e6, 500e6, 1e9, 2e9, 10e9]
-    for i, threshold in enumerate(thresholds):
-        if max_value < threshold:
-            return steps[i]
-    return 25e9
-
-# Funktion zur Y-Achsen-Formatierung
-def formatter(value):
-    if value >= 1e9:
-        return f'{value / 1e9:.2f} Mrd €'
-    elif value >= 1e6:
-        return f'{value / 1e6:.0f} Mio €'
-    else:
-        return f'{value:,.0f} €'
+
+from core import axes, callbacks, datasets, export, figures, queries, search
+
+
+# Figur-Gerüst mit Export- und Importlinie (wird einmal gebaut und validiert)
+@figures.template
+def trade_figure():
+    fig = go.Figure()
+    for name, color in zip(['Exportwert', 'Importwert'], ['#1f77b4', '#ff7f0e']):
+        fig.add_trace(go.Scatter(
+            mode='lines+markers',
+            name=name,
+            line=dict(width=2, color=color),
+            hovertemplate=f'<b>{name}</b><br>Jahr: %{{x}}<br>Wert: %{{y:,.0f}} €<extra></extra>'
+        ))
+    fig.update_layout(
+        xaxis_title='Jahr',
+        yaxis_title='Wert in €',
+        xaxis=dict(tickmode='array'),
+        legend=dict(title='Kategorie', bgcolor='rgba(255,255,255,0.7)')
+    )
+    return fig
 
 # Funktion zur Erstellung des Layouts
 def create_layout():
+    df = datasets.get('top10_goods_spec_country_and_year')
+
     return html.Div([
         html.H1("Jährlicher Export- und Importverlauf einer Ware mit Deutschland"),
 
-        dcc.Dropdown(
+        search.dropdown(
             id='overview_trade_spec_good_dropdown_country',
-            options=[{'label': country, 'value': country} for country in sorted(df['Land'].dropna().unique())],
+            dataset='top10_goods_spec_country_and_year',
+            column='Land',
             value='Islamische Republik Iran' if 'Islamische Republik Iran' in df['Land'].values else df['Land'].dropna().unique()[0],
             clearable=False,
             style={'width': '50%'}
         ),
 
-        dcc.Dropdown(
+        search.dropdown(
             id='overview_trade_spec_good_dropdown_good',
-            options=[{'label': good, 'value': good} for good in sorted(df['Label'].dropna().unique())],
+            dataset='top10_goods_spec_country_and_year',
+            column='Label',
             value="Pharmazeutische Erzeugnisse",  # Standardmäßig erste Ware
             clearable=False,
             style={'width': '50%'}
@@ -61,61 +52,50 @@ def create_layout():
         html.Div(id='overview_trade_spec_good_info_text', style={'margin-top': '20px', 'font-size': '16px', 'font-weight': 'bold'}),
 
         dcc.Graph(id='overview_trade_spec_good_graph'),
+
+        export.links('overview_trade_spec_good_with_spec_country_2008_until_2024'),
     ])
 
 # Callback für das Update des Graphen
 def register_callbacks(app):
+    search.register_dropdown(app, 'overview_trade_spec_good_dropdown_country', 'top10_goods_spec_country_and_year', 'Land')
+    search.register_dropdown(app, 'overview_trade_spec_good_dropdown_good', 'top10_goods_spec_country_and_year', 'Label')
+    export.register(app, 'overview_trade_spec_good_with_spec_country_2008_until_2024', 'top10_goods_spec_country_and_year', {
+        'Land': dash.Input('overview_trade_spec_good_dropdown_country', 'value'),
+        'Label': dash.Input('overview_trade_spec_good_dropdown_good', 'value'),
+    })
+
     @app.callback(
         [dash.Output('overview_trade_spec_good_graph', 'figure'),
          dash.Output('overview_trade_spec_good_info_text', 'children')],
         [dash.Input('overview_trade_spec_good_dropdown_country', 'value'),
          dash.Input('overview_trade_spec_good_dropdown_good', 'value')]
     )
+    @callbacks.cached()
     def update_graph(selected_country, selected_good):
+
         # Daten filtern für das ausgewählte Land und die ausgewählte Ware
-        df_filtered = df[(df['Land'] == selected_country) & (df['Label'] == selected_good)]
+        df_filtered = queries.country_goods(country=selected_country, good=selected_good)
 
         # Falls keine Daten vorhanden sind, leeren Graph zurückgeben
         if df_filtered.empty:
             return go.Figure(), f"Keine Daten für {selected_good} in {selected_country} verfügbar."
 
-        fig = go.Figure()
-
-        # Linien für Export und Import
-        for col, name, color in zip(
-            ['Ausfuhr: Wert', 'Einfuhr: Wert'],
-            ['Exportwert', 'Importwert'],
-            ['#1f77b4', '#ff7f0e']
-        ):
-            fig.add_trace(go.Scatter(
-                x=df_filtered['Jahr'],
-                y=df_filtered[col],
-                mode='lines+markers',
-                name=name,
-                line=dict(width=2, color=color),
-                hovertemplate=f'<b>{name}</b><br>Jahr: %{{x}}<br>Wert: %{{y:,.0f}} €<extra></extra>'
-            ))
-
         # Achsenskala berechnen
         max_value = df_filtered[['Ausfuhr: Wert', 'Einfuhr: Wert']].values.max()
-        step_size = determine_step_size(max_value)
-        rounded_max = math.ceil(max_value / step_size) * step_size
-        tickvals = np.arange(0, rounded_max + 1, step_size)
-        ticktext = [formatter(val) for val in tickvals]
-
-        fig.update_layout(
-            title=f'Jährlicher Export- und Importverlauf von {selected_good} mit {selected_country}',
-            xaxis_title='Jahr',
-            yaxis_title='Wert in €',
-            xaxis=dict(
-                tickmode='array',
-                tickvals=sorted(df_filtered['Jahr'].unique()),
-            ),
-            yaxis=dict(
-                tickvals=tickvals,
-                ticktext=ticktext
-            ),
-            legend=dict(title='Kategorie', bgcolor='rgba(255,255,255,0.7)')
+        tickvals, ticktext = axes.linear(max_value)
+
+        # Linien für Export und Import
+        fig = trade_figure(
+            data=[
+                {'x': df_filtered['Jahr'], 'y': df_filtered['Ausfuhr: Wert']},
+                {'x': df_filtered['Jahr'], 'y': df_filtered['Einfuhr: Wert']},
+            ],
+            layout={
+                'title': {'text': f'Jährlicher Export- und Importverlauf von {selected_good} mit {selected_country}'},
+                'xaxis': {'tickvals': sorted(df_filtered['Jahr'].unique())},
+                'yaxis': {'tickvals': tickvals, 'ticktext': ticktext},
+            }
         )
 
         # Handelsbilanz-Info berechnen
@@ -0,0 +1,105 @@
+from dash import dcc, html
+from dash.dependencies import Input, Output
+import plotly.graph_objects as go
+
+from core import callbacks, figures, movers
+
+# Angezeigte Länder je Richtung
+TOP_N = 10
+
+KENNZAHLEN = {
+    'export': 'Export-Ranking',
+    'import': 'Import-Ranking',
+    'handelsvolumen': 'Handelsvolumen-Ranking',
+}
+
+# Auswahl: nur Länder bis zu diesem Platz im gewählten Jahr (None = alle)
+PLATZ_GRENZEN = [
+    {'label': 'Alle Länder', 'value': 'alle'},
+    {'label': 'Top 50', 'value': 50},
+    {'label': 'Top 100', 'value': 100},
+]
+
+# Figur-Gerüst für Auf- bzw. Absteiger (Balken = Plätze gewonnen bzw. verloren)
+def movers_figure(color, xaxis_title):
+    @figures.template
+    def build():
+        fig = go.Figure(go.Bar(
+            orientation='h',
+            marker_color=color,
+            hovertemplate='<b>%{y}</b><br>Plätze: %{x:.1f}<br>Platz im Vorjahr %{customdata[1]:.1f} → %{customdata[0]:.1f}<extra></extra>'
+        ))
+        fig.update_layout(
+            xaxis_title=xaxis_title,
+            yaxis=dict(title='Land', autorange='reversed'),
+        )
+        return fig
+    return build
+
+climbers_figure = movers_figure('green', 'Gewonnene Plätze zum Vorjahr')
+fallers_figure = movers_figure('red', 'Verlorene Plätze zum Vorjahr')
+
+# Funktion zur Erstellung des Layouts
+def create_layout():
+    jahre = movers.years()
+
+    return html.Div([
+        html.H1("Größte Auf- und Absteiger im Ranking Deutschlands"),
+
+        dcc.Dropdown(
+            id='rank_movers_year_dropdown',
+            options=[{'label': str(j), 'value': j} for j in jahre],
+            value=jahre[-1] if jahre else None,  # Standardmäßig das aktuellste Jahr
+            clearable=False,
+            style={'width': '50%'}
+        ),
+
+        dcc.RadioItems(
+            id='rank_movers_metric_radio',
+            options=[{'label': label, 'value': metric} for metric, label in KENNZAHLEN.items()],
+            value='export',
+            inline=True
+        ),
+
+        dcc.RadioItems(
+            id='rank_movers_limit_radio',
+            options=PLATZ_GRENZEN,
+            value='alle',
+            inline=True
+        ),
+
+        dcc.Graph(id='rank_movers_climbers_graph'),
+        dcc.Graph(id='rank_movers_fallers_graph'),
+    ])
+
+def register_callbacks(app):
+    @app.callback(
+        [Output('rank_movers_climbers_graph', 'figure'),
+         Output('rank_movers_fallers_graph', 'figure')],
+        [Input('rank_movers_year_dropdown', 'value'),
+         Input('rank_movers_metric_radio', 'value'),
+         Input('rank_movers_limit_radio', 'value')]
+    )
+    @callbacks.cached()
+    def update_graphs(selected_year, selected_metric, selected_limit):
+        if selected_year is None:
+            return go.Figure(), go.Figure()
+        max_rank = None if selected_limit == 'alle' else selected_limit
+
+        # Nachschlagen in den vorsortierten Platzveränderungen des Jahres
+        figures_out = []
+        for direction, build, title in [
+            ('aufsteiger', climbers_figure, 'Größte Aufsteiger'),
+            ('absteiger', fallers_figure, 'Größte Absteiger'),
+        ]:
+            df_movers = movers.movers(selected_year, selected_metric, TOP_N, direction, max_rank)
+            figures_out.append(build(
+                data=[{
+                    'x': df_movers['Veränderung'].abs(),
+                    'y': df_movers['Land'],
+                    'customdata': df_movers[['Platz', 'Platz_Vorjahr']].to_numpy(),
+                }],
+                layout={'title': {'text': f'{title} im {KENNZAHLEN[selected_metric]} {selected_year} (gegenüber {selected_year - 1})'}}
+            ))
+
+        return tuple(figures_out)
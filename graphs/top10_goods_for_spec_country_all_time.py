@@ -1,128 +1,89 @@
 from dash import dcc, html
 from dash.dependencies import Input, Output
-import pandas as pd
 import plotly.graph_objects as go
-import numpy as np
-import os
 
-# Sicherstellen, dass der richtige Dateipfad verwendet wird
-csv_path = os.path.join(os.path.dirname(__file__), '../data/top10_goods_spec_country.csv')
-top10_goods_spec_country = pd.read_csv(csv_path)
+from core import axes, callbacks, datasets, export, figures, queries, search
 
-# Einzigartige Länder alphabetisch sortieren
-länder_options = sorted(top10_goods_spec_country['Land'].unique())
 
-# Funktion zum Formatieren der x-Achse (Euro-Werte)
-def formatter(value):
-    if value >= 1e9:
-        return f'{value / 1e9:.1f} Mrd'
-    elif value >= 1e6:
-        return f'{value / 1e6:.1f} Mio'
-    elif value >= 1e3:
-        return f'{value / 1e3:.1f} K'
-    else:
-        return f'{int(value)}'
+# Figur-Gerüst für die Export- bzw. Import-Balken (wird einmal gebaut und validiert)
+def top10_figure(color, hover_label, xaxis_title):
+    @figures.template
+    def build():
+        fig = go.Figure()
+        fig.add_trace(go.Bar(
+            orientation='h',
+            marker_color=color,
+            hovertemplate=f'{hover_label}: %{{x:,.0f}} €<extra></extra>'
+        ))
+        fig.update_layout(
+            xaxis_title=xaxis_title,
+            yaxis_title="Warenkategorie",
+            xaxis=dict(tickmode='array'),
+        )
+        return fig
+    return build
 
-# Funktion zur Berechnung der Schrittweite der Achse
-def calculate_tick_step(max_value):
-    if max_value < 5e6:
-        step = 1e6
-    elif max_value < 10e6:
-        step = 2e6
-    elif max_value < 50e6:
-        step = 5e6
-    elif max_value < 100e6:
-        step = 10e6
-    elif max_value < 250e6:
-        step = 20e6
-    elif max_value < 500e6:
-        step = 50e6
-    elif max_value < 1e9:
-        step = 100e6
-    elif max_value < 5e9:
-        step = 200e6
-    elif max_value < 10e9:
-        step = 500e6
-    elif max_value < 50e9:
-        step = 5e9
-    elif max_value < 100e9:
-        step = 10e9
-    elif max_value < 250e9:
-        step = 20e9
-    else:
-        step = 50e9
-    return step
+export_figure = top10_figure('blue', 'Exportwert', "Exportwert (Euro)")
+import_figure = top10_figure('red', 'Importwert', "Importwert (Euro)")
 
 # Layout-Funktion für das Dash-Modul
 def create_layout():
+    top10_goods_spec_country = datasets.get('top10_goods_spec_country')
+
     return html.Div([
         html.H1("Top 10 Handelswaren zwischen Deutschland und einem ausgewählten Land (2008-2024)"),
-        dcc.Dropdown(
+        search.dropdown(
             id='land_dropdown_top10_goods',
-            options=[{'label': land, 'value': land} for land in länder_options],
+            dataset='top10_goods_spec_country',
+            column='Land',
             value='Islamische Republik Iran',
             clearable=False,
             style={'width': '50%'}
         ),
         dcc.Graph(id='export_graph_top10_goods'),
         dcc.Graph(id='import_graph_top10_goods'),
+
+        export.links('top10_goods_for_spec_country_all_time'),
     ])
 
 # Callback-Funktion registrieren
 def register_callbacks(app):
+    search.register_dropdown(app, 'land_dropdown_top10_goods', 'top10_goods_spec_country', 'Land')
+    export.register(app, 'top10_goods_for_spec_country_all_time', 'top10_goods_spec_country', {
+        'Land': Input('land_dropdown_top10_goods', 'value'),
+    })
+
     @app.callback(
         [Output('export_graph_top10_goods', 'figure'),
          Output('import_graph_top10_goods', 'figure')],
         Input('land_dropdown_top10_goods', 'value')
     )
+    @callbacks.cached()
     def update_graphs(selected_country):
-        filtered_df = top10_goods_spec_country[top10_goods_spec_country['Land'] == selected_country]
-        aggregated_country_df = filtered_df.groupby(['Code', 'Label'], as_index=False).agg(
-            {'Ausfuhr: Wert': 'sum', 'Einfuhr: Wert': 'sum'}
-        )
-
-        top_10_exports = aggregated_country_df.sort_values(by='Ausfuhr: Wert', ascending=False).head(10)
+        top_10_exports = queries.top_n('export', None, 10, by='Label', country=selected_country)
         max_export = top_10_exports['Ausfuhr: Wert'].max()
-        export_step = calculate_tick_step(max_export)
-        rounded_export_max = np.ceil(max_export / export_step) * export_step
-        export_tick_vals = np.arange(0, rounded_export_max + 1, export_step)
+        export_tick_vals, export_tick_text = axes.linear(max_export, labels='kurz')
 
-        top_10_imports = aggregated_country_df.sort_values(by='Einfuhr: Wert', ascending=False).head(10)
+        top_10_imports = queries.top_n('import', None, 10, by='Label', country=selected_country)
         max_import = top_10_imports['Einfuhr: Wert'].max()
-        import_step = calculate_tick_step(max_import)
-        rounded_import_max = np.ceil(max_import / import_step) * import_step
-        import_tick_vals = np.arange(0, rounded_import_max + 1, import_step)
+        import_tick_vals, import_tick_text = axes.linear(max_import, labels='kurz')
 
         # Export-Plot
-        export_fig = go.Figure()
-        export_fig.add_trace(go.Bar(
-            x=top_10_exports['Ausfuhr: Wert'],
-            y=top_10_exports['Label'],
-            orientation='h',
-            marker_color='blue',
-            hovertemplate='Exportwert: %{x:,.0f} €<extra></extra>'
-        ))
-        export_fig.update_layout(
-            title=f"Top 10 Exportprodukte aus Deutschland nach {selected_country} (2008-2024)",
-            xaxis_title="Exportwert (Euro)",
-            yaxis_title="Warenkategorie",
-            xaxis=dict(tickmode='array', tickvals=export_tick_vals, ticktext=[formatter(val) for val in export_tick_vals]),
+        export_fig = export_figure(
+            data=[{'x': top_10_exports['Ausfuhr: Wert'], 'y': top_10_exports['Label']}],
+            layout={
+                'title': {'text': f"Top 10 Exportprodukte aus Deutschland nach {selected_country} (2008-2024)"},
+                'xaxis': {'tickvals': export_tick_vals, 'ticktext': export_tick_text},
+            }
         )
 
         # Import-Plot
-        import_fig = go.Figure()
-        import_fig.add_trace(go.Bar(
-            x=top_10_imports['Einfuhr: Wert'],
-            y=top_10_imports['Label'],
-            orientation='h',
-            marker_color='red',
-            hovertemplate='Importwert: %{x:,.0f} €<extra></extra>'
-        ))
-        import_fig.update_layout(
-            title=f"Top 10 Importprodukte aus {selected_country} nach Deutschland (2008-2024)",
-            xaxis_title="Importwert (Euro)",
-            yaxis_title="Warenkategorie",
-            xaxis=dict(tickmode='array', tickvals=import_tick_vals, ticktext=[formatter(val) for val in import_tick_vals]),
+        import_fig = import_figure(
+            data=[{'x': top_10_imports['Einfuhr: Wert'], 'y': top_10_imports['Label']}],
+            layout={
+                'title': {'text': f"Top 10 Importprodukte aus {selected_country} nach Deutschland (2008-2024)"},
+                'xaxis': {'tickvals': import_tick_vals, 'ticktext': import_tick_text},
+            }
         )
 
         return export_fig, import_fig
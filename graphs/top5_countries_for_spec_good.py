@@ -1,23 +1,9 @@
 import dash
 from dash import dcc, html
-import pandas as pd
 import plotly.graph_objects as go
-import os
-import numpy as np
-import math
 
-# Relativer Pfad zur CSV-Datei
-csv_path = os.path.join(os.path.dirname(__file__), "../data/top10_goods_spec_country_and_year.csv")
+from core import axes, callbacks, datasets, export, figures, queries, search
 
-# Daten laden
-df = pd.read_csv(csv_path)
-
-# Falls die Daten nicht korrekt geladen wurden, abbrechen
-if df.empty:
-    raise ValueError("CSV-Datei konnte nicht geladen werden oder ist leer.")
-
-# Werte umrechnen (Tausenderwerte auf Originalwerte)
-df[['Ausfuhr: Wert', 'Einfuhr: Wert']] = df[['Ausfuhr: Wert', 'Einfuhr: Wert']].fillna(0) * 1000
 
 # Liste der Farben für Konsistenz
 colors = [
@@ -27,50 +13,60 @@ colors = [
     "#4b0082", "#ffa500", "#00ff00", "#800080", "#ff4500"
 ]
 
-# Funktion zur Bestimmung der optimalen Schrittgröße für die Y-Achse
-def determine_step_size(max_value):
-    thresholds = [5e6, 10e6, 50e6, 100e6, 250e6, 500e6, 1e9, 5e9, 10e9, 50e9, 100e9]
-    steps = [1e6, 5e6, 10e6, 25e6, 50e6, 100e6, 250e6, 500e6, 1e9, 2e9, 10e9]
-    for i, threshold in enumerate(thresholds):
-        if max_value < threshold:
-            return steps[i]
-    return 25e9
-
-# Y-Achsen-Formatter
-def formatter(value):
-    if value >= 1e9:
-        return f'{value / 1e9:.2f} Mrd €'
-    elif value >= 1e6:
-        return f'{value / 1e6:.0f} Mio €'
-    else:
-        return f'{value:,.0f} €'
+# Figur-Gerüst für Export- bzw. Importgrafik, eine Linie je Land (wird einmal gebaut und validiert)
+def top5_figure(yaxis_title):
+    @figures.template
+    def build():
+        fig = go.Figure(go.Scatter(mode='lines+markers', line=dict(width=2)))
+        fig.update_layout(
+            xaxis_title="Jahr",
+            yaxis_title=yaxis_title,
+            xaxis=dict(tickmode='array'),
+            legend=dict(title="Länder")
+        )
+        return fig
+    return build
+
+export_figure = top5_figure("Exportwert in €")
+import_figure = top5_figure("Importwert in €")
 
 # Layout-Funktion
 def create_layout():
+    df = datasets.get('top10_goods_spec_country_and_year')
+
     return html.Div([
         html.H1("Deutschlands Top 5 Export- und Importländer einer ausgewählten Ware (2008–2024)"),
 
-        dcc.Dropdown(
+        search.dropdown(
             id='top5_spec_good_dropdown_goods',
-            options=[{'label': good, 'value': good} for good in sorted(df['Label'].dropna().unique())],
+            dataset='top10_goods_spec_country_and_year',
+            column='Label',
             value='Kraftfahrzeuge, Landfahrzeuge',
             clearable=False,
             style={'width': '50%'}
         ),
 
         dcc.Graph(id='top5_spec_good_export_graph'),
-        dcc.Graph(id='top5_spec_good_import_graph')
+        dcc.Graph(id='top5_spec_good_import_graph'),
+
+        export.links('top5_countries_for_spec_good'),
     ])
 
 # Callback-Registrierung
 def register_callbacks(app):
+    search.register_dropdown(app, 'top5_spec_good_dropdown_goods', 'top10_goods_spec_country_and_year', 'Label')
+    export.register(app, 'top5_countries_for_spec_good', 'top10_goods_spec_country_and_year', {
+        'Label': dash.Input('top5_spec_good_dropdown_goods', 'value'),
+    })
+
     @app.callback(
         [dash.Output('top5_spec_good_export_graph', 'figure'),
          dash.Output('top5_spec_good_import_graph', 'figure')],
         [dash.Input('top5_spec_good_dropdown_goods', 'value')]
     )
+    @callbacks.cached()
     def update_graphs(selected_good):
-        df_filtered = df[df['Label'] == selected_good]
+        df_filtered = queries.country_goods(good=selected_good)
 
         if df_filtered.empty:
             return go.Figure(), go.Figure()
@@ -91,57 +87,49 @@ def register_callbacks(app):
         max_import = import_df['Einfuhr: Wert'].max()
 
         # EXPORT-GRAPH
-        fig_export = go.Figure()
+        export_traces = []
         for i, country in enumerate(top5_export_countries):
             country_df = export_df[export_df['Land'] == country]
-            fig_export.add_trace(go.Scatter(
-                x=country_df['Jahr'],
-                y=country_df['Ausfuhr: Wert'],
-                mode='lines+markers',
-                name=country,
-                line=dict(width=2, color=colors[i % len(colors)]),
-                hovertemplate=f"<b>{country} – {selected_good}</b><br>Jahr: %{{x}}<br>Export: %{{y:,.0f}} €<extra></extra>"
-            ))
-
-        step_export = determine_step_size(max_export)
-        rounded_max_export = math.ceil(max_export / step_export) * step_export
-        tickvals_export = np.arange(0, rounded_max_export + 1, step_export)
-        ticktext_export = [formatter(val) for val in tickvals_export]
-
-        fig_export.update_layout(
-            title=f"Top 5 Exportländer für {selected_good}",
-            xaxis_title="Jahr",
-            yaxis_title="Exportwert in €",
-            xaxis=dict(tickmode='array', tickvals=sorted(export_df['Jahr'].unique())),
-            yaxis=dict(tickvals=tickvals_export, ticktext=ticktext_export),
-            legend=dict(title="Länder")
+            export_traces.append({
+                'x': country_df['Jahr'],
+                'y': country_df['Ausfuhr: Wert'],
+                'name': country,
+                'line': {'color': colors[i % len(colors)]},
+                'hovertemplate': f"<b>{country} – {selected_good}</b><br>Jahr: %{{x}}<br>Export: %{{y:,.0f}} €<extra></extra>",
+            })
+
+        tickvals_export, ticktext_export = axes.linear(max_export)
+
+        fig_export = export_figure(
+            data=export_traces,
+            layout={
+                'title': {'text': f"Top 5 Exportländer für {selected_good}"},
+                'xaxis': {'tickvals': sorted(export_df['Jahr'].unique())},
+                'yaxis': {'tickvals': tickvals_export, 'ticktext': ticktext_export},
+            }
         )
 
         # IMPORT-GRAPH
-        fig_import = go.Figure()
+        import_traces = []
         for i, country in enumerate(top5_import_countries):
             country_df = import_df[import_df['Land'] == country]
-            fig_import.add_trace(go.Scatter(
-                x=country_df['Jahr'],
-                y=country_df['Einfuhr: Wert'],
-                mode='lines+markers',
-                name=country,
-                line=dict(width=2, color=colors[i % len(colors)]),
-                hovertemplate=f"<b>{country} – {selected_good}</b><br>Jahr: %{{x}}<br>Import: %{{y:,.0f}} €<extra></extra>"
-            ))
-
-        step_import = determine_step_size(max_import)
-        rounded_max_import = math.ceil(max_import / step_import) * step_import
-        tickvals_import = np.arange(0, rounded_max_import + 1, step_import)
-        ticktext_import = [formatter(val) for val in tickvals_import]
-
-        fig_import.update_layout(
-            title=f"Top 5 Importländer für {selected_good}",
-            xaxis_title="Jahr",
-            yaxis_title="Importwert in €",
-            xaxis=dict(tickmode='array', tickvals=sorted(import_df['Jahr'].unique())),
-            yaxis=dict(tickvals=tickvals_import, ticktext=ticktext_import),
-            legend=dict(title="Länder")
+            import_traces.append({
+                'x': country_df['Jahr'],
+                'y': country_df['Einfuhr: Wert'],
+                'name': country,
+                'line': {'color': colors[i % len(colors)]},
+                'hovertemplate': f"<b>{country} – {selected_good}</b><br>Jahr: %{{x}}<br>Import: %{{y:,.0f}} €<extra></extra>",
+            })
+
+        tickvals_import, ticktext_import = axes.linear(max_import)
+
+        fig_import = import_figure(
+            data=import_traces,
+            layout={
+                'title': {'text': f"Top 5 Importländer für {selected_good}"},
+                'xaxis': {'tickvals': sorted(import_df['Jahr'].unique())},
+                'yaxis': {'tickvals': tickvals_import, 'ticktext': ticktext_import},
+            }
         )
 
         return fig_export, fig_import
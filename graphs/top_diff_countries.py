@@ -1,27 +1,43 @@
 from dash import dcc, html
 from dash.dependencies import Input, Output
-import pandas as pd
 import plotly.graph_objects as go
-import numpy as np
-import math
-import os
 
-# Daten laden (Pfad für Render anpassen)
-data_path = os.path.join("data", "df_grouped.csv")
-df_grouped = pd.read_csv(data_path)
+from core import axes, callbacks, datasets, export, figures, queries
 
-# Funktion zum Formatieren der x-Achse (Mrd)
-def formatter(x, pos):
-    return f'{int(x * 1e-9)} Mrd' if abs(x) >= 1e9 else f'{int(x)}'
 
-# Funktion zum Berechnen der Achsen-Ticks (nur Mrd)
-def generate_ticks(min_value, max_value, step_size):
-    min_tick = math.floor(min_value / step_size) * step_size
-    max_tick = math.ceil(max_value / step_size) * step_size
-    return np.arange(min_tick, max_tick + step_size, step_size)
+# Figur-Gerüst für eine Kennzahl (wird einmal gebaut und validiert)
+def diff_figure(wort, xaxis_title):
+    @figures.template
+    def build():
+        fig = go.Figure()
+        fig.add_trace(go.Bar(
+            orientation='h',
+            name='Top 4 Zuwächse',
+            marker_color='green',
+            hovertemplate=f'Höhe des {wort}zuwachses: %{{x:,.0f}} €<extra></extra>'
+        ))
+        fig.add_trace(go.Bar(
+            orientation='h',
+            name='Top 4 Rückgänge',
+            marker_color='red',
+            hovertemplate=f'Höhe des {wort}rückgangs: %{{x:,.0f}} €<extra></extra>'
+        ))
+        fig.update_layout(
+            xaxis_title=xaxis_title,
+            xaxis=dict(tickmode='array'),
+            yaxis_title='Land'
+        )
+        return fig
+    return build
+
+export_figure = diff_figure('Export', 'Exportdifferenz (EUR)')
+import_figure = diff_figure('Import', 'Importdifferenz (EUR)')
+handelsvolumen_figure = diff_figure('Handels', 'Handelsvolumendifferenz (EUR)')
 
 # Layout für das Diagramm
 def create_layout():
+    df_grouped = datasets.get('df_grouped')
+
     return html.Div([
         html.H1("Länder mit größten Handelsdifferenzen mit Deutschland zum Vorjahr"),
 
@@ -38,18 +54,25 @@ def create_layout():
         dcc.Graph(id='export_diff_graph'),
         dcc.Graph(id='import_diff_graph'),
         dcc.Graph(id='handelsvolumen_diff_graph'),
+
+        export.links('top_diff_countries'),
     ])
 
 # Callbacks registrieren
 def register_callbacks(app):
+    export.register(app, 'top_diff_countries', 'df_grouped', {
+        'Jahr': Input('jahr_dropdown_2', 'value'),
+    })
+
     @app.callback(
         [Output('export_diff_graph', 'figure'),
          Output('import_diff_graph', 'figure'),
          Output('handelsvolumen_diff_graph', 'figure')],
         Input('jahr_dropdown_2', 'value')
     )
+    @callbacks.cached()
     def update_graphs(year_selected):
-        df_filtered = df_grouped[df_grouped['Jahr'] == year_selected]
+        df_filtered = queries.partners(year_selected)
         df_filtered = df_filtered[~df_filtered['Land'].isin(['Nicht ermittelte Länder und Gebiete', 'Schiffs- und Luftfahrzeugbedarf'])]
 
         # Export-Differenzen: Top 4 und Bottom 4
@@ -72,83 +95,43 @@ def register_callbacks(app):
 
         # Achsen-Ticks berechnen
         step_size = 1e9  # Schrittwert immer 1 Mrd
-        export_ticks = generate_ticks(export_diff_min, export_diff_max, step_size)
-        import_ticks = generate_ticks(import_diff_min, import_diff_max, step_size)
-        handelsvolumen_ticks = generate_ticks(handelsvolumen_diff_min, handelsvolumen_diff_max, step_size)
-
-        # Diagramm: Exportdifferenzen
-        export_fig = go.Figure()
-        export_fig.add_trace(go.Bar(
-            y=top_4_export_diff['Land'],
-            x=top_4_export_diff['export_differenz'],
-            orientation='h',
-            name='Top 4 Zuwächse',
-            marker_color='green',
-            hovertemplate='Höhe des Exportzuwachses: %{x:,.0f} €<extra></extra>'
-        ))
-        export_fig.add_trace(go.Bar(
-            y=bottom_4_export_diff['Land'],
-            x=bottom_4_export_diff['export_differenz'],
-            orientation='h',
-            name='Top 4 Rückgänge',
-            marker_color='red',
-            hovertemplate='Höhe des Exportrückgangs: %{x:,.0f} €<extra></extra>'
-        ))
-        export_fig.update_layout(
-            title=f'Exportdifferenzen für {year_selected}',
-            xaxis_title='Exportdifferenz (EUR)',
-            xaxis=dict(tickmode='array', tickvals=export_ticks, ticktext=[formatter(val, 0) for val in export_ticks]),
-            yaxis_title='Land'
+        export_ticks, export_ticktext = axes.diverging([export_diff_min, export_diff_max], step=step_size, labels='ganz')
+        import_ticks, import_ticktext = axes.diverging([import_diff_min, import_diff_max], step=step_size, labels='ganz')
+        handelsvolumen_ticks, handelsvolumen_ticktext = axes.diverging(
+            [handelsvolumen_diff_min, handelsvolumen_diff_max], step=step_size, labels='ganz')
+
+        # Diagramme: nur Daten, Titel und Ticks in die Gerüste einsetzen
+        export_fig = export_figure(
+            data=[
+                {'y': top_4_export_diff['Land'], 'x': top_4_export_diff['export_differenz']},
+                {'y': bottom_4_export_diff['Land'], 'x': bottom_4_export_diff['export_differenz']},
+            ],
+            layout={
+                'title': {'text': f'Exportdifferenzen für {year_selected}'},
+                'xaxis': {'tickvals': export_ticks, 'ticktext': export_ticktext},
+            }
         )
 
-        # Diagramm: Importdifferenzen
-        import_fig = go.Figure()
-        import_fig.add_trace(go.Bar(
-            y=top_4_import_diff['Land'],
-            x=top_4_import_diff['import_differenz'],
-            orientation='h',
-            name='Top 4 Zuwächse',
-            marker_color='green',
-            hovertemplate='Höhe des Importzuwachses: %{x:,.0f} €<extra></extra>'
-        ))
-        import_fig.add_trace(go.Bar(
-            y=bottom_4_import_diff['Land'],
-            x=bottom_4_import_diff['import_differenz'],
-            orientation='h',
-            name='Top 4 Rückgänge',
-            marker_color='red',
-            hovertemplate='Höhe des Importrückgangs: %{x:,.0f} €<extra></extra>'
-        ))
-        import_fig.update_layout(
-            title=f'Importdifferenzen für {year_selected}',
-            xaxis_title='Importdifferenz (EUR)',
-            xaxis=dict(tickmode='array', tickvals=import_ticks, ticktext=[formatter(val, 0) for val in import_ticks]),
-            yaxis_title='Land'
+        import_fig = import_figure(
+            data=[
+                {'y': top_4_import_diff['Land'], 'x': top_4_import_diff['import_differenz']},
+                {'y': bottom_4_import_diff['Land'], 'x': bottom_4_import_diff['import_differenz']},
+            ],
+            layout={
+                'title': {'text': f'Importdifferenzen für {year_selected}'},
+                'xaxis': {'tickvals': import_ticks, 'ticktext': import_ticktext},
+            }
         )
 
-        # Diagramm: Handelsvolumendifferenzen
-        handelsvolumen_fig = go.Figure()
-        handelsvolumen_fig.add_trace(go.Bar(
-            y=top_4_handelsvolumen_diff['Land'],
-            x=top_4_handelsvolumen_diff['handelsvolumen_differenz'],
-            orientation='h',
-            name='Top 4 Zuwächse',
-            marker_color='green',
-            hovertemplate='Höhe des Handelszuwachses: %{x:,.0f} €<extra></extra>'
-        ))
-        handelsvolumen_fig.add_trace(go.Bar(
-            y=bottom_4_handelsvolumen_diff['Land'],
-            x=bottom_4_handelsvolumen_diff['handelsvolumen_differenz'],
-            orientation='h',
-            name='Top 4 Rückgänge',
-            marker_color='red',
-            hovertemplate='Höhe des Handelsrückgangs: %{x:,.0f} €<extra></extra>'
-        ))
-        handelsvolumen_fig.update_layout(
-            title=f'Handelsvolumendifferenzen für {year_selected}',
-            xaxis_title='Handelsvolumendifferenz (EUR)',
-            xaxis=dict(tickmode='array', tickvals=handelsvolumen_ticks, ticktext=[formatter(val, 0) for val in handelsvolumen_ticks]),
-            yaxis_title='Land'
+        handelsvolumen_fig = handelsvolumen_figure(
+            data=[
+                {'y': top_4_handelsvolumen_diff['Land'], 'x': top_4_handelsvolumen_diff['handelsvolumen_differenz']},
+                {'y': bottom_4_handelsvolumen_diff['Land'], 'x': bottom_4_handelsvolumen_diff['handelsvolumen_differenz']},
+            ],
+            layout={
+                'title': {'text': f'Handelsvolumendifferenzen für {year_selected}'},
+                'xaxis': {'tickvals': handelsvolumen_ticks, 'ticktext': handelsvolumen_ticktext},
+            }
         )
 
         return export_fig, import_fig, handelsvolumen_fig
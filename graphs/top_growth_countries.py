@@ -1,13 +1,37 @@
 from dash import dcc, html
 from dash.dependencies import Input, Output
-import pandas as pd
 import plotly.graph_objects as go
 
-# Daten laden
-df_grouped = pd.read_csv('data/df_grouped.csv')
+from core import callbacks, datasets, export, figures, queries
+
+
+# Figur-Gerüst für alle drei Wachstumsgrafiken (wird einmal gebaut und validiert)
+@figures.template
+def growth_figure():
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        orientation='h',
+        name='Top 4 Wachstum',
+        marker_color='green',
+        hovertemplate='Wachstum: %{x:.2f}%<extra></extra>'
+    ))
+    fig.add_trace(go.Bar(
+        orientation='h',
+        name='Top 4 Negativwachstum',
+        marker_color='red',
+        hovertemplate='Rückgang: %{x:.2f}%<extra></extra>'
+    ))
+    fig.update_layout(
+        xaxis_title='Wachstumsrate (%)',
+        yaxis_title='Land',
+        barmode='relative',
+    )
+    return fig
 
 # Layout-Funktion für das Dashboard
 def create_layout():
+    df_grouped = datasets.get('df_grouped')
+
     return html.Div([
         html.H1("Länder mit größtem Handelswachstum- bzw. rückgang mit Deutschland zum Vorjahr"),
         
@@ -24,21 +48,28 @@ def create_layout():
         dcc.Graph(id='export_wachstum_graph'),
         dcc.Graph(id='import_wachstum_graph'),
         dcc.Graph(id='handelsvolumen_wachstum_graph'),
+
+        export.links('top_growth_countries'),
     ])
 
 # Callbacks registrieren
 def register_callbacks(app):
+    export.register(app, 'top_growth_countries', 'df_grouped', {
+        'Jahr': Input('jahr_dropdown_wachstum', 'value'),
+    })
+
     @app.callback(
         [Output('export_wachstum_graph', 'figure'),
          Output('import_wachstum_graph', 'figure'),
          Output('handelsvolumen_wachstum_graph', 'figure')],
         Input('jahr_dropdown_wachstum', 'value')
     )
+    @callbacks.cached()
     def update_graphs(year_selected):
         # Filtern der relevanten Länder
-        df_filtered = df_grouped[(df_grouped['Jahr'] == year_selected) & 
-                                 ((df_grouped['export_wert'] >= 100_000_000) | 
-                                  (df_grouped['import_wert'] >= 100_000_000))]
+        df_filtered = queries.partners(year_selected)
+        df_filtered = df_filtered[(df_filtered['export_wert'] >= 100_000_000) |
+                                  (df_filtered['import_wert'] >= 100_000_000)]
         df_filtered = df_filtered[~df_filtered['Land'].isin(['Nicht ermittelte Länder und Gebiete', 'Schiffs- und Luftfahrzeugbedarf'])]
 
         # 1. Export-Wachstum: Top 4 & Bottom 4
@@ -61,31 +92,16 @@ def register_callbacks(app):
 
         # Funktion zum Erstellen der Graphen
         def create_bar_chart(top_df, bottom_df, x_col, title, x_min, x_max):
-            fig = go.Figure()
-            fig.add_trace(go.Bar(
-                y=top_df['Land'],
-                x=top_df[x_col],
-                orientation='h',
-                name='Top 4 Wachstum',
-                marker_color='green',
-                hovertemplate='Wachstum: %{x:.2f}%<extra></extra>'
-            ))
-            fig.add_trace(go.Bar(
-                y=bottom_df['Land'],
-                x=bottom_df[x_col],
-                orientation='h',
-                name='Top 4 Negativwachstum',
-                marker_color='red',
-                hovertemplate='Rückgang: %{x:.2f}%<extra></extra>'
-            ))
-            fig.update_layout(
-                title=f'{title} für {year_selected}',
-                xaxis_title='Wachstumsrate (%)',
-                yaxis_title='Land',
-                xaxis=dict(range=[x_min * 1.5, x_max * 1.1]),
-                barmode='relative',
+            return growth_figure(
+                data=[
+                    {'y': top_df['Land'], 'x': top_df[x_col]},
+                    {'y': bottom_df['Land'], 'x': bottom_df[x_col]},
+                ],
+                layout={
+                    'title': {'text': f'{title} für {year_selected}'},
+                    'xaxis': {'range': [x_min * 1.5, x_max * 1.1]},
+                }
             )
-            return fig
 
         return (
             create_bar_chart(top_4_export, bottom_4_export, 'export_wachstum', 'Exportwachstum', export_min, export_max),
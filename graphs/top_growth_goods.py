@@ -1,13 +1,42 @@
 from dash import dcc, html
 from dash.dependencies import Input, Output
-import pandas as pd
 import plotly.graph_objects as go
 
-# Daten einlesen
-df_reduced = pd.read_csv('data/df_reduced.csv')
+from core import callbacks, datasets, export, figures, queries
+
+
+# Figur-Gerüst für eine Kennzahl (wird einmal gebaut und validiert)
+def growth_figure(wort):
+    @figures.template
+    def build():
+        fig = go.Figure()
+        fig.add_trace(go.Bar(
+            orientation='h',
+            name='Top 4 Zuwächse',
+            marker_color='green',
+            hovertemplate=f'Relative {wort}veränderung: %{{x:.1f}}%<extra></extra>'
+        ))
+        fig.add_trace(go.Bar(
+            orientation='h',
+            name='Top 4 Rückgänge',
+            marker_color='red',
+            hovertemplate=f'Relative {wort}rückgang: %{{x:.1f}}%<extra></extra>'
+        ))
+        fig.update_layout(
+            xaxis_title='Veränderung in %',
+            xaxis=dict(tickformat=".1f", tickmode='auto'),
+            yaxis_title='Warengruppe',
+        )
+        return fig
+    return build
+
+export_figure = growth_figure('Export')
+import_figure = growth_figure('Import')
 
 # Layout-Funktion für das Graph-Modul
 def create_layout():
+    df_reduced = datasets.get('df_reduced')
+
     return html.Div([
         html.H1("Waren mit größtem Handelswachstum bzw. -rückgang für Deutschland zum Vorjahr"),
         
@@ -23,20 +52,24 @@ def create_layout():
         # Graphen für relative Export- und Import-Differenzen
         dcc.Graph(id='export_rel_diff_graph'),
         dcc.Graph(id='import_rel_diff_graph'),
+
+        export.links('top_growth_goods'),
     ])
 
 # Callback-Funktion registrieren
 def register_callbacks(app):
+    export.register(app, 'top_growth_goods', 'df_reduced', {
+        'Jahr': Input('jahr_dropdown_growth_goods', 'value'),
+    }, previous_year='Jahr')
+
     @app.callback(
         [Output('export_rel_diff_graph', 'figure'),
          Output('import_rel_diff_graph', 'figure')],
         Input('jahr_dropdown_growth_goods', 'value')
     )
+    @callbacks.cached()
     def update_graphs(selected_year):
-        df_current = df_reduced[df_reduced['Jahr'] == selected_year]
-        df_previous = df_reduced[df_reduced['Jahr'] == selected_year - 1]
-
-        df_diff = pd.merge(df_current, df_previous, on="Label", suffixes=('_current', '_previous'))
+        df_diff = queries.yoy(None, selected_year)
 
         # Berechnung der relativen Veränderungen in Prozent
         df_diff['export_rel_diff'] = (df_diff['Ausfuhr: Wert_current'] - df_diff['Ausfuhr: Wert_previous']) / df_diff['Ausfuhr: Wert_previous'] * 100
@@ -55,61 +88,27 @@ def register_callbacks(app):
         import_rel_max = max(top_4_import_rel_diff['import_rel_diff'].max(), 0)
 
         # Graph für relative Export-Differenzen
-        export_fig = go.Figure()
-
-        export_fig.add_trace(go.Bar(
-            y=top_4_export_rel_diff['Label'],
-            x=top_4_export_rel_diff['export_rel_diff'],
-            orientation='h',
-            name='Top 4 Zuwächse',
-            marker_color='green',
-            hovertemplate='Relative Exportveränderung: %{x:.1f}%<extra></extra>'
-        ))
-
-        export_fig.add_trace(go.Bar(
-            y=bottom_4_export_rel_diff['Label'],
-            x=bottom_4_export_rel_diff['export_rel_diff'],
-            orientation='h',
-            name='Top 4 Rückgänge',
-            marker_color='red',
-            hovertemplate='Relative Exportrückgang: %{x:.1f}%<extra></extra>'
-        ))
-
-        export_fig.update_layout(
-            title=f'Relative Exportdifferenzen nach Warengruppe ({selected_year} vs. {selected_year - 1})',
-            xaxis_title='Veränderung in %',
-            xaxis=dict(tickformat=".1f", tickmode='auto'),
-            yaxis_title='Warengruppe',
-            xaxis_range=[export_rel_min * 1.2, export_rel_max * 1.2],
+        export_fig = export_figure(
+            data=[
+                {'y': top_4_export_rel_diff['Label'], 'x': top_4_export_rel_diff['export_rel_diff']},
+                {'y': bottom_4_export_rel_diff['Label'], 'x': bottom_4_export_rel_diff['export_rel_diff']},
+            ],
+            layout={
+                'title': {'text': f'Relative Exportdifferenzen nach Warengruppe ({selected_year} vs. {selected_year - 1})'},
+                'xaxis': {'range': [export_rel_min * 1.2, export_rel_max * 1.2]},
+            }
         )
 
         # Graph für relative Import-Differenzen
-        import_fig = go.Figure()
-
-        import_fig.add_trace(go.Bar(
-            y=top_4_import_rel_diff['Label'],
-            x=top_4_import_rel_diff['import_rel_diff'],
-            orientation='h',
-            name='Top 4 Zuwächse',
-            marker_color='green',
-            hovertemplate='Relative Importveränderung: %{x:.1f}%<extra></extra>'
-        ))
-
-        import_fig.add_trace(go.Bar(
-            y=bottom_4_import_rel_diff['Label'],
-            x=bottom_4_import_rel_diff['import_rel_diff'],
-            orientation='h',
-            name='Top 4 Rückgänge',
-            marker_color='red',
-            hovertemplate='Relative Importrückgang: %{x:.1f}%<extra></extra>'
-        ))
-
-        import_fig.update_layout(
-            title=f'Relative Importdifferenzen nach Warengruppe ({selected_year} vs. {selected_year - 1})',
-            xaxis_title='Veränderung in %',
-            xaxis=dict(tickformat=".1f", tickmode='auto'),
-            yaxis_title='Warengruppe',
-            xaxis_range=[import_rel_min * 1.2, import_rel_max * 1.2],
+        import_fig = import_figure(
+            data=[
+                {'y': top_4_import_rel_diff['Label'], 'x': top_4_import_rel_diff['import_rel_diff']},
+                {'y': bottom_4_import_rel_diff['Label'], 'x': bottom_4_import_rel_diff['import_rel_diff']},
+            ],
+            layout={
+                'title': {'text': f'Relative Importdifferenzen nach Warengruppe ({selected_year} vs. {selected_year - 1})'},
+                'xaxis': {'range': [import_rel_min * 1.2, import_rel_max * 1.2]},
+            }
         )
 
         return export_fig, import_fig
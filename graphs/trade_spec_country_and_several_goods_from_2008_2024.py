@@ -1,23 +1,9 @@
 import dash
 from dash import dcc, html
-import pandas as pd
 import plotly.graph_objects as go
-import os
-import numpy as np
-import math
 
-# Relativer Pfad zur CSV-Datei
-csv_path = os.path.join(os.path.dirname(__file__), "../data/top10_goods_spec_country_and_year.csv")
+from core import axes, callbacks, datasets, export, figures, jobs, queries, search
 
-# Daten laden
-df = pd.read_csv(csv_path)
-
-# Falls die Daten nicht korrekt geladen wurden, abbrechen
-if df.empty:
-    raise ValueError("CSV-Datei konnte nicht geladen werden oder ist leer.")
-
-# Werte umrechnen (Tausenderwerte auf Originalwerte)
-df[['Ausfuhr: Wert', 'Einfuhr: Wert']] = df[['Ausfuhr: Wert', 'Einfuhr: Wert']].fillna(0) * 1000
 
 # Liste der Farben für Konsistenz
 colors = [
@@ -31,44 +17,50 @@ colors = [
     "#808000", "#ffdab9", "#00bfff", "#cd5c5c", "#9400d3"
 ]
 
-# Farben Waren zuordnen
-unique_labels = sorted(df['Label'].dropna().unique())
-color_dict = {label: colors[i % len(colors)] for i, label in enumerate(unique_labels)}
-
-# Funktion zur Bestimmung der optimalen Schrittgröße für die Y-Achse
-def determine_step_size(max_value):
-    thresholds = [5e6, 10e6, 50e6, 100e6, 250e6, 500e6, 1e9, 5e9, 10e9, 50e9, 100e9]
-    steps = [1e6, 5e6, 10e6, 25e6, 50e6, 100e6, 250e6, 500e6, 1e9, 2e9, 10e9]
-    for i, threshold in enumerate(thresholds):
-        if max_value < threshold:
-            return steps[i]
-    return 25e9
-
-# Funktion zur Y-Achsen-Formatierung
-def formatter(value):
-    if value >= 1e9:
-        return f'{value / 1e9:.2f} Mrd €'
-    elif value >= 1e6:
-        return f'{value / 1e6:.0f} Mio €'
-    else:
-        return f'{value:,.0f} €'
+# Farben Waren zuordnen (einmal je Datenversion)
+@datasets.per_version
+def color_dict(snapshot):
+    df = snapshot['top10_goods_spec_country_and_year']
+    unique_labels = sorted(df['Label'].dropna().unique())
+    return {label: colors[i % len(colors)] for i, label in enumerate(unique_labels)}
+
+# Figur-Gerüst für Export- bzw. Importgrafik, eine Linie je Ware (wird einmal gebaut und validiert)
+def goods_figure(yaxis_title):
+    @figures.template
+    def build():
+        fig = go.Figure(go.Scatter(mode='lines+markers', line=dict(width=2)))
+        fig.update_layout(
+            xaxis_title='Jahr',
+            yaxis_title=yaxis_title,
+            xaxis=dict(tickmode='array'),
+            legend=dict(title='Waren')
+        )
+        return fig
+    return build
+
+export_figure = goods_figure('Exportwert in €')
+import_figure = goods_figure('Importwert in €')
 
 # Layout-Funktion
 def create_layout():
+    df = datasets.get('top10_goods_spec_country_and_year')
+
     return html.Div([
         html.H1("Gesamter Export- und Importverlauf verschiedener Waren mit Deutschland"),
 
-        dcc.Dropdown(
+        search.dropdown(
             id='trade_several_goods_dropdown_country',
-            options=[{'label': country, 'value': country} for country in sorted(df['Land'].dropna().unique())],
+            dataset='top10_goods_spec_country_and_year',
+            column='Land',
             value='Islamische Republik Iran' if 'Islamische Republik Iran' in df['Land'].values else df['Land'].dropna().unique()[0],
             clearable=False,
             style={'width': '50%'}
         ),
 
-        dcc.Dropdown(
+        search.dropdown(
             id='trade_several_goods_dropdown_goods',
-            options=[{'label': good, 'value': good} for good in sorted(df['Label'].dropna().unique())],
+            dataset='top10_goods_spec_country_and_year',
+            column='Label',
             value=["Pharmazeutische Erzeugnisse", "Mineralische Brennstoffe usw."],  # Standardwerte
             multi=True,
             clearable=False,
@@ -77,94 +69,109 @@ def create_layout():
 
         html.Div(id='trade_several_goods_info_text', style={'margin-top': '20px', 'font-size': '16px', 'font-weight': 'bold'}),
 
+        *jobs.layout('trade_several_goods'),
+
         dcc.Graph(id='trade_several_goods_export_graph'),
         dcc.Graph(id='trade_several_goods_import_graph'),
+
+        export.links('trade_spec_country_and_several_goods_from_2008_2024'),
     ])
 
-# Callback-Registrierung
-def register_callbacks(app):
-    @app.callback(
-        [dash.Output('trade_several_goods_export_graph', 'figure'),
-         dash.Output('trade_several_goods_import_graph', 'figure'),
-         dash.Output('trade_several_goods_info_text', 'children')],
-        [dash.Input('trade_several_goods_dropdown_country', 'value'),
-         dash.Input('trade_several_goods_dropdown_goods', 'value')]
+# Eingaben für build_graphs aus dem aktuellen Snapshot
+def graph_args(selected_country, selected_goods):
+    df_filtered = queries.country_goods(country=selected_country, good=selected_goods)
+    return df_filtered, selected_country, selected_goods, color_dict()
+
+# Figuren berechnen; läuft im Hintergrundbetrieb in einem Pool-Prozess (siehe core.jobs)
+def build_graphs(progress, df_filtered, selected_country, selected_goods, goods_colors):
+    # Falls keine Daten vorhanden sind, leere Graphen zurückgeben
+    if df_filtered.empty:
+        return go.Figure(), go.Figure(), f"Keine Daten für die ausgewählten Waren in {selected_country} verfügbar."
+
+    # Daten für Y-Achsen-Skalierung sammeln
+    max_export = df_filtered['Ausfuhr: Wert'].max()
+    max_import = df_filtered['Einfuhr: Wert'].max()
+
+    export_traces = []
+    import_traces = []
+    for i, good in enumerate(selected_goods):
+        progress(i, len(selected_goods))
+        df_good = df_filtered[df_filtered['Label'] == good]
+        color = goods_colors.get(good, '#000000')  # Fallback-Farbe falls nicht gefunden
+
+        # EXPORT-GRAPH
+        export_traces.append({
+            'x': df_good['Jahr'],
+            'y': df_good['Ausfuhr: Wert'],
+            'name': f"{good} - Export",
+            'line': {'color': color},
+            'hovertemplate': f'<b>{good} - Export</b><br>Jahr: %{{x}}<br>Wert: %{{y:,.0f}} €<extra></extra>',
+        })
+
+        # IMPORT-GRAPH
+        import_traces.append({
+            'x': df_good['Jahr'],
+            'y': df_good['Einfuhr: Wert'],
+            'name': f"{good} - Import",
+            'line': {'color': color},
+            'hovertemplate': f'<b>{good} - Import</b><br>Jahr: %{{x}}<br>Wert: %{{y:,.0f}} €<extra></extra>',
+        })
+
+    # Achsenskala berechnen
+    tickvals_export, ticktext_export = axes.linear(max_export)
+
+    tickvals_import, ticktext_import = axes.linear(max_import)
+
+    jahre = sorted(df_filtered['Jahr'].unique())
+
+    fig_export = export_figure(
+        data=export_traces,
+        layout={
+            'title': {'text': f'Jährliche Exporte aus Deutschland nach {selected_country}'},
+            'xaxis': {'tickvals': jahre},
+            'yaxis': {'tickvals': tickvals_export, 'ticktext': ticktext_export},
+        }
     )
-    def update_graphs(selected_country, selected_goods):
-        df_filtered = df[(df['Land'] == selected_country) & (df['Label'].isin(selected_goods))]
-
-        # Falls keine Daten vorhanden sind, leere Graphen zurückgeben
-        if df_filtered.empty:
-            return go.Figure(), go.Figure(), f"Keine Daten für die ausgewählten Waren in {selected_country} verfügbar."
-
-        # Export- und Import-Graphen
-        fig_export = go.Figure()
-        fig_import = go.Figure()
-
-        # Daten für Y-Achsen-Skalierung sammeln
-        max_export = df_filtered['Ausfuhr: Wert'].max()
-        max_import = df_filtered['Einfuhr: Wert'].max()
-
-        for good in selected_goods:
-            df_good = df_filtered[df_filtered['Label'] == good]
-            color = color_dict.get(good, '#000000')  # Fallback-Farbe falls nicht gefunden
-
-            # EXPORT-GRAPH
-            fig_export.add_trace(go.Scatter(
-                x=df_good['Jahr'],
-                y=df_good['Ausfuhr: Wert'],
-                mode='lines+markers',
-                name=f"{good} - Export",
-                line=dict(width=2, color=color),
-                hovertemplate=f'<b>{good} - Export</b><br>Jahr: %{{x}}<br>Wert: %{{y:,.0f}} €<extra></extra>'
-            ))
-
-            # IMPORT-GRAPH
-            fig_import.add_trace(go.Scatter(
-                x=df_good['Jahr'],
-                y=df_good['Einfuhr: Wert'],
-                mode='lines+markers',
-                name=f"{good} - Import",
-                line=dict(width=2, color=color),
-                hovertemplate=f'<b>{good} - Import</b><br>Jahr: %{{x}}<br>Wert: %{{y:,.0f}} €<extra></extra>'
-            ))
-
-        # Achsenskala berechnen
-        step_size_export = determine_step_size(max_export)
-        rounded_max_export = math.ceil(max_export / step_size_export) * step_size_export
-        tickvals_export = np.arange(0, rounded_max_export + 1, step_size_export)
-        ticktext_export = [formatter(val) for val in tickvals_export]
-
-        step_size_import = determine_step_size(max_import)
-        rounded_max_import = math.ceil(max_import / step_size_import) * step_size_import
-        tickvals_import = np.arange(0, rounded_max_import + 1, step_size_import)
-        ticktext_import = [formatter(val) for val in tickvals_import]
-
-        fig_export.update_layout(
-            title=f'Jährliche Exporte aus Deutschland nach {selected_country}',
-            xaxis_title='Jahr',
-            yaxis_title='Exportwert in €',
-            xaxis=dict(tickmode='array', tickvals=sorted(df_filtered['Jahr'].unique())),
-            yaxis=dict(tickvals=tickvals_export, ticktext=ticktext_export),
-            legend=dict(title='Waren')
-        )
 
-        fig_import.update_layout(
-            title=f'Jährliche Importe aus {selected_country} nach Deutschland',
-            xaxis_title='Jahr',
-            yaxis_title='Importwert in €',
-            xaxis=dict(tickmode='array', tickvals=sorted(df_filtered['Jahr'].unique())),
-            yaxis=dict(tickvals=tickvals_import, ticktext=ticktext_import),
-            legend=dict(title='Waren')
-        )
+    fig_import = import_figure(
+        data=import_traces,
+        layout={
+            'title': {'text': f'Jährliche Importe aus {selected_country} nach Deutschland'},
+            'xaxis': {'tickvals': jahre},
+            'yaxis': {'tickvals': tickvals_import, 'ticktext': ticktext_import},
+        }
+    )
 
-        # Handelsbilanz-Info berechnen
-        total_export = df_filtered['Ausfuhr: Wert'].sum() / 1e9
-        total_import = df_filtered['Einfuhr: Wert'].sum() / 1e9
-        handelsbilanz = total_export - total_import
-        status = "Handelsüberschuss" if handelsbilanz > 0 else "Handelsdefizit" if handelsbilanz < 0 else "Ausgeglichene Handelsbilanz"
+    # Handelsbilanz-Info berechnen
+    total_export = df_filtered['Ausfuhr: Wert'].sum() / 1e9
+    total_import = df_filtered['Einfuhr: Wert'].sum() / 1e9
+    handelsbilanz = total_export - total_import
+    status = "Handelsüberschuss" if handelsbilanz > 0 else "Handelsdefizit" if handelsbilanz < 0 else "Ausgeglichene Handelsbilanz"
 
-        info_text = f"Gesamter Export: {total_export:.2f} Mrd €, Gesamter Import: {total_import:.2f} Mrd € → {status}: {handelsbilanz:.2f} Mrd € (für die ausgewählten Waren mit {selected_country} von 2008-2024)"
+    info_text = f"Gesamter Export: {total_export:.2f} Mrd €, Gesamter Import: {total_import:.2f} Mrd € → {status}: {handelsbilanz:.2f} Mrd € (für die ausgewählten Waren mit {selected_country} von 2008-2024)"
 
-        return fig_export, fig_import, info_text
+    return fig_export, fig_import, info_text
 
+# Callback-Registrierung
+def register_callbacks(app):
+    search.register_dropdown(app, 'trade_several_goods_dropdown_country', 'top10_goods_spec_country_and_year', 'Land')
+    search.register_dropdown(app, 'trade_several_goods_dropdown_goods', 'top10_goods_spec_country_and_year', 'Label')
+    export.register(app, 'trade_spec_country_and_several_goods_from_2008_2024', 'top10_goods_spec_country_and_year', {
+        'Land': dash.Input('trade_several_goods_dropdown_country', 'value'),
+        'Label': dash.Input('trade_several_goods_dropdown_goods', 'value'),
+    })
+
+    outputs = [dash.Output('trade_several_goods_export_graph', 'figure'),
+               dash.Output('trade_several_goods_import_graph', 'figure'),
+               dash.Output('trade_several_goods_info_text', 'children')]
+    inputs = [dash.Input('trade_several_goods_dropdown_country', 'value'),
+              dash.Input('trade_several_goods_dropdown_goods', 'value')]
+
+    if jobs.ENABLED:
+        jobs.register_background(app, 'trade_several_goods', outputs, inputs, graph_args, build_graphs)
+        return
+
+    @app.callback(outputs, inputs)
+    @callbacks.cached()
+    def update_graphs(selected_country, selected_goods):
+        return build_graphs(jobs.no_progress, *graph_args(selected_country, selected_goods))
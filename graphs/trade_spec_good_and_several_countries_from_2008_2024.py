@@ -1,23 +1,9 @@
 import dash
 from dash import dcc, html
-import pandas as pd
 import plotly.graph_objects as go
-import os
-import numpy as np
-import math
 
-# Relativer Pfad zur CSV-Datei
-csv_path = os.path.join(os.path.dirname(__file__), "../data/top10_goods_spec_country_and_year.csv")
+from core import axes, callbacks, datasets, export, figures, queries, search
 
-# Daten laden
-df = pd.read_csv(csv_path)
-
-# Falls die Daten nicht korrekt geladen wurden, abbrechen
-if df.empty:
-    raise ValueError("CSV-Datei konnte nicht geladen werden oder ist leer.")
-
-# Werte umrechnen (Tausenderwerte auf Originalwerte)
-df[['Ausfuhr: Wert', 'Einfuhr: Wert']] = df[['Ausfuhr: Wert', 'Einfuhr: Wert']].fillna(0) * 1000
 
 # Liste der Farben für Konsistenz
 colors = [
@@ -31,44 +17,50 @@ colors = [
     "#808000", "#ffdab9", "#00bfff", "#cd5c5c", "#9400d3"
 ]
 
-# Farben Ländern zuordnen
-unique_countries = sorted(df['Land'].dropna().unique())
-color_dict = {country: colors[i % len(colors)] for i, country in enumerate(unique_countries)}
-
-# Funktion zur Bestimmung der optimalen Schrittgröße für die Y-Achse
-def determine_step_size(max_value):
-    thresholds = [5e6, 10e6, 50e6, 100e6, 250e6, 500e6, 1e9, 5e9, 10e9, 50e9, 100e9]
-    steps = [1e6, 5e6, 10e6, 25e6, 50e6, 100e6, 250e6, 500e6, 1e9, 2e9, 10e9]
-    for i, threshold in enumerate(thresholds):
-        if max_value < threshold:
-            return steps[i]
-    return 25e9
-
-# Funktion zur Y-Achsen-Formatierung
-def formatter(value):
-    if value >= 1e9:
-        return f'{value / 1e9:.2f} Mrd €'
-    elif value >= 1e6:
-        return f'{value / 1e6:.0f} Mio €'
-    else:
-        return f'{value:,.0f} €'
+# Farben Ländern zuordnen (einmal je Datenversion)
+@datasets.per_version
+def color_dict(snapshot):
+    df = snapshot['top10_goods_spec_country_and_year']
+    unique_countries = sorted(df['Land'].dropna().unique())
+    return {country: colors[i % len(colors)] for i, country in enumerate(unique_countries)}
+
+# Figur-Gerüst für Export- bzw. Importgrafik, eine Linie je Land (wird einmal gebaut und validiert)
+def countries_figure(yaxis_title):
+    @figures.template
+    def build():
+        fig = go.Figure(go.Scatter(mode='lines+markers', line=dict(width=2)))
+        fig.update_layout(
+            xaxis_title='Jahr',
+            yaxis_title=yaxis_title,
+            xaxis=dict(tickmode='array'),
+            legend=dict(title='Länder')
+        )
+        return fig
+    return build
+
+export_figure = countries_figure('Exportwert in €')
+import_figure = countries_figure('Importwert in €')
 
 # Layout-Funktion
 def create_layout():
+    df = datasets.get('top10_goods_spec_country_and_year')
+
     return html.Div([
         html.H1("Gesamter Export- und Importverlauf einer Ware mit verschiedenen Ländern von 2008 bis 2024"),
 
-        dcc.Dropdown(
+        search.dropdown(
             id='trade_spec_good_dropdown_goods',
-            options=[{'label': good, 'value': good} for good in sorted(df['Label'].dropna().unique())],
+            dataset='top10_goods_spec_country_and_year',
+            column='Label',
             value="Kraftfahrzeuge, Landfahrzeuge",  # Standardwert
             clearable=False,
             style={'width': '50%'}
         ),
 
-        dcc.Dropdown(
+        search.dropdown(
             id='trade_spec_good_dropdown_countries',
-            options=[{'label': country, 'value': country} for country in sorted(df['Land'].dropna().unique())],
+            dataset='top10_goods_spec_country_and_year',
+            column='Land',
             value=['Islamische Republik Iran', 'Irak', 'Katar'],  # Standardwerte
             multi=True,
             clearable=False,
@@ -79,10 +71,19 @@ def create_layout():
 
         dcc.Graph(id='trade_spec_good_export_graph'),
         dcc.Graph(id='trade_spec_good_import_graph'),
+
+        export.links('trade_spec_good_and_several_countries_from_2008_2024'),
     ])
 
 # Callback-Registrierung
 def register_callbacks(app):
+    search.register_dropdown(app, 'trade_spec_good_dropdown_goods', 'top10_goods_spec_country_and_year', 'Label')
+    search.register_dropdown(app, 'trade_spec_good_dropdown_countries', 'top10_goods_spec_country_and_year', 'Land')
+    export.register(app, 'trade_spec_good_and_several_countries_from_2008_2024', 'top10_goods_spec_country_and_year', {
+        'Label': dash.Input('trade_spec_good_dropdown_goods', 'value'),
+        'Land': dash.Input('trade_spec_good_dropdown_countries', 'value'),
+    })
+
     @app.callback(
         [dash.Output('trade_spec_good_export_graph', 'figure'),
          dash.Output('trade_spec_good_import_graph', 'figure'),
@@ -90,75 +91,68 @@ def register_callbacks(app):
         [dash.Input('trade_spec_good_dropdown_goods', 'value'),
          dash.Input('trade_spec_good_dropdown_countries', 'value')]
     )
+    @callbacks.cached()
     def update_graphs(selected_good, selected_countries):
-        df_filtered = df[(df['Label'] == selected_good) & (df['Land'].isin(selected_countries))]
+        df_filtered = queries.country_goods(country=selected_countries, good=selected_good)
 
         # Falls keine Daten vorhanden sind, leere Graphen zurückgeben
         if df_filtered.empty:
             return go.Figure(), go.Figure(), f"Keine Daten für {selected_good} in den ausgewählten Ländern verfügbar."
 
-        # Export- und Import-Graphen
-        fig_export = go.Figure()
-        fig_import = go.Figure()
-
         # Daten für Y-Achsen-Skalierung sammeln
         max_export = df_filtered['Ausfuhr: Wert'].max()
         max_import = df_filtered['Einfuhr: Wert'].max()
 
+        export_traces = []
+        import_traces = []
         for country in selected_countries:
             df_country = df_filtered[df_filtered['Land'] == country]
-            color = color_dict.get(country, '#000000')  # Fallback-Farbe falls nicht gefunden
+            color = color_dict().get(country, '#000000')  # Fallback-Farbe falls nicht gefunden
 
             # EXPORT-GRAPH
-            fig_export.add_trace(go.Scatter(
-                x=df_country['Jahr'],
-                y=df_country['Ausfuhr: Wert'],
-                mode='lines+markers',
-                name=f"{country} - Export",
-                line=dict(width=2, color=color),
-                hovertemplate=f'<b>{country} - {selected_good}</b><br>Jahr: %{{x}}<br>Wert: %{{y:,.0f}} €<extra></extra>'
-            ))
+            export_traces.append({
+                'x': df_country['Jahr'],
+                'y': df_country['Ausfuhr: Wert'],
+                'name': f"{country} - Export",
+                'line': {'color': color},
+                'hovertemplate': f'<b>{country} - {selected_good}</b><br>Jahr: %{{x}}<br>Wert: %{{y:,.0f}} €<extra></extra>',
+            })
 
             # IMPORT-GRAPH
-            fig_import.add_trace(go.Scatter(
-                x=df_country['Jahr'],
-                y=df_country['Einfuhr: Wert'],
-                mode='lines+markers',
-                name=f"{country} - Import",
-                line=dict(width=2, color=color),
-                hovertemplate=f'<b>{country} - {selected_good}</b><br>Jahr: %{{x}}<br>Wert: %{{y:,.0f}} €<extra></extra>'
-            ))
+            import_traces.append({
+                'x': df_country['Jahr'],
+                'y': df_country['Einfuhr: Wert'],
+                'name': f"{country} - Import",
+                'line': {'color': color},
+                'hovertemplate': f'<b>{country} - {selected_good}</b><br>Jahr: %{{x}}<br>Wert: %{{y:,.0f}} €<extra></extra>',
+            })
 
         # Achsenskala berechnen
-        step_size_export = determine_step_size(max_export)
-        rounded_max_export = math.ceil(max_export / step_size_export) * step_size_export
-        tickvals_export = np.arange(0, rounded_max_export + 1, step_size_export)
-        ticktext_export = [formatter(val) for val in tickvals_export]
-
-        step_size_import = determine_step_size(max_import)
-        rounded_max_import = math.ceil(max_import / step_size_import) * step_size_import
-        tickvals_import = np.arange(0, rounded_max_import + 1, step_size_import)
-        ticktext_import = [formatter(val) for val in tickvals_import]
-
-        fig_export.update_layout(
-            title=f'Jährliche Exporte von {selected_good} aus Deutschland in die ausgewählten Länder',
-            xaxis_title='Jahr',
-            yaxis_title='Exportwert in €',
-            xaxis=dict(tickmode='array', tickvals=sorted(df_filtered['Jahr'].unique())),
-            yaxis=dict(tickvals=tickvals_export, ticktext=ticktext_export),
-            legend=dict(title='Länder')
+        tickvals_export, ticktext_export = axes.linear(max_export)
+
+        tickvals_import, ticktext_import = axes.linear(max_import)
+
+        jahre = sorted(df_filtered['Jahr'].unique())
+
+        fig_export = export_figure(
+            data=export_traces,
+            layout={
+                'title': {'text': f'Jährliche Exporte von {selected_good} aus Deutschland in die ausgewählten Länder'},
+                'xaxis': {'tickvals': jahre},
+                'yaxis': {'tickvals': tickvals_export, 'ticktext': ticktext_export},
+            }
         )
 
-        fig_import.update_layout(
-            title=f'Jährliche Importe von {selected_good} aus den ausgewählten Ländern nach Deutschland',
-            xaxis_title='Jahr',
-            yaxis_title='Importwert in €',
-            xaxis=dict(tickmode='array', tickvals=sorted(df_filtered['Jahr'].unique())),
-            yaxis=dict(tickvals=tickvals_import, ticktext=ticktext_import),
-            legend=dict(title='Länder')
+        fig_import = import_figure(
+            data=import_traces,
+            layout={
+                'title': {'text': f'Jährliche Importe von {selected_good} aus den ausgewählten Ländern nach Deutschland'},
+                'xaxis': {'tickvals': jahre},
+                'yaxis': {'tickvals': tickvals_import, 'ticktext': ticktext_import},
+            }
         )
 
-                # Handelsbilanz-Info berechnen
+        # Handelsbilanz-Info berechnen
         total_export = df_filtered['Ausfuhr: Wert'].sum() / 1e9
         total_import = df_filtered['Einfuhr: Wert'].sum() / 1e9
         handelsbilanz = total_export - total_import
@@ -1,32 +1,8 @@
 import dash
 from dash import dcc, html
-import pandas as pd
 import plotly.graph_objects as go
-import os
-import numpy as np
-import math
 
-# ----------- CSVs aus Ordner "data" laden -----------------
-jahre = list(range(2014, 2025))
-daten_liste = []
-
-for jahr in jahre:
-    pfad = os.path.join(os.path.dirname(__file__), f"../data/Handelsdaten_{jahr}.csv")
-    if os.path.exists(pfad):
-        df_jahr = pd.read_csv(pfad, encoding='utf-8')
-        daten_liste.append(df_jahr)
-
-if not daten_liste:
-    raise ValueError("Keine gültigen Handelsdaten-Dateien gefunden.")
-
-df = pd.concat(daten_liste, ignore_index=True)
-
-# Monatsnamen hinzufügen
-monatsnamen = {
-    1: "Jan", 2: "Feb", 3: "Mär", 4: "Apr", 5: "Mai", 6: "Jun",
-    7: "Jul", 8: "Aug", 9: "Sep", 10: "Okt", 11: "Nov", 12: "Dez"
-}
-df['Monat_Name'] = df['Monat'].map(monatsnamen)
+from core import axes, callbacks, datasets, export, figures, queries, search
 
 # ---------------- Hilfsfunktionen ------------------
 
@@ -38,27 +14,31 @@ df['Monat_Name'] = df['Monat'].map(monatsnamen)
     #        return steps[i]
     #return 2e9
 
+# Figur-Gerüst mit Export- und Importbalken (wird einmal gebaut und validiert)
+@figures.template
+def trade_figure():
+    fig = go.Figure()
+    for name, color in zip(['Exportwert', 'Importwert'], ['#1f77b4', '#ff7f0e']):
+        fig.add_trace(go.Bar(
+            name=name,
+            marker=dict(color=color),
+            hovertemplate=f'<b>{name}</b><br>Monat: %{{x}}<br>Wert: %{{y:,.0f}} €<extra></extra>'
+        ))
+    fig.update_layout(
+        barmode='group',
+        xaxis_title='Monat',
+        yaxis_title='Wert in €',
+        legend=dict(title='Kategorie', bgcolor='rgba(255,255,255,0.7)')
+    )
+    return fig
 
-def determine_step_size(max_value):
-    thresholds = [2e4, 5e4, 1e5, 2e5, 5e5, 1e6, 2e6, 5e6, 10e6, 50e6, 100e6, 250e6, 500e6, 1e9, 5e9, 10e9]
-    steps =       [5e3, 1e4, 2e4, 5e4, 1e5, 2e5, 5e5, 1e6, 5e6, 10e6, 25e6, 50e6, 100e6, 250e6, 500e6, 1e9]
-    for i, threshold in enumerate(thresholds):
-        if max_value < threshold:
-            return steps[i]
-    return 2e9
-
-
-def formatter(value):
-    if value >= 1e9:
-        return f'{value / 1e9:.2f} Mrd €'
-    elif value >= 1e6:
-        return f'{value / 1e6:.0f} Mio €'
-    else:
-        return f'{value:,.0f} €'
 
 # ---------------- Layout-Funktion ------------------
 
 def create_layout():
+    # Die Jahresdateien werden zentral parallel geladen, Monatsnamen sind bereits ergänzt
+    df = datasets.get('handelsdaten')
+
     return html.Div([
         html.H1("Monatlicher Export- und Importverlauf einer Ware mit einem Land im ausgewählten Jahr"),
 
@@ -70,17 +50,19 @@ def create_layout():
             style={'width': '40%'}
         ),
 
-        dcc.Dropdown(
+        search.dropdown(
             id='16729_dropdown_ware',
-            options=[{'label': ware, 'value': ware} for ware in sorted(df['Label'].dropna().unique())],
+            dataset='handelsdaten',
+            column='Label',
             value="Pharmazeutische Erzeugnisse",
             clearable=False,
             style={'width': '60%'}
         ),
 
-        dcc.Dropdown(
+        search.dropdown(
             id='16729_dropdown_land',
-            options=[{'label': land, 'value': land} for land in sorted(df['Land'].dropna().unique())],
+            dataset='handelsdaten',
+            column='Land',
             value="Islamische Republik Iran",
             clearable=False,
             style={'width': '60%'}
@@ -89,11 +71,20 @@ def create_layout():
         html.Div(id='16729_info_text', style={'margin-top': '20px', 'font-size': '16px', 'font-weight': 'bold'}),
 
         dcc.Graph(id='16729_graph'),
+
+        export.links('trade_spec_good_in_spec_year_and_spec_country'),
     ])
 
 # ---------------- Callback-Funktion ------------------
 
 def register_callbacks(app):
+    search.register_dropdown(app, '16729_dropdown_ware', 'handelsdaten', 'Label')
+    search.register_dropdown(app, '16729_dropdown_land', 'handelsdaten', 'Land')
+    export.register(app, 'trade_spec_good_in_spec_year_and_spec_country', 'handelsdaten', {
+        'Jahr': dash.Input('16729_dropdown_jahr', 'value'),
+        'Label': dash.Input('16729_dropdown_ware', 'value'),
+    })
+
     @app.callback(
         [dash.Output('16729_graph', 'figure'),
          dash.Output('16729_info_text', 'children')],
@@ -101,8 +92,9 @@ def register_callbacks(app):
          dash.Input('16729_dropdown_ware', 'value'),
          dash.Input('16729_dropdown_land', 'value')]
     )
+    @callbacks.cached()
     def update_graph(selected_year, selected_ware, selected_country):
-        df_year = df[(df['Jahr'] == selected_year) & (df['Label'] == selected_ware)]
+        df_year = queries.details(selected_year, selected_ware)
 
         if df_year.empty:
             return go.Figure(), f"Keine Daten für {selected_ware} im Jahr {selected_year} verfügbar."
@@ -112,38 +104,19 @@ def register_callbacks(app):
         if df_selected.empty:
             return go.Figure(), f"Keine Daten für {selected_ware} mit {selected_country} im Jahr {selected_year} verfügbar."
 
-        fig = go.Figure()
-
-        for col, name, color in zip(
-            ['Ausfuhr: Wert', 'Einfuhr: Wert'],
-            ['Exportwert', 'Importwert'],
-            ['#1f77b4', '#ff7f0e']
-        ):
-            fig.add_trace(go.Bar(
-                x=df_selected['Monat_Name'],
-                y=df_selected[col],
-                name=name,
-                marker=dict(color=color),
-                hovertemplate=f'<b>{name}</b><br>Monat: %{{x}}<br>Wert: %{{y:,.0f}} €<extra></extra>'
-            ))
-
         # Achsenskalierung
         max_value = df_selected[['Ausfuhr: Wert', 'Einfuhr: Wert']].values.max()
-        step_size = determine_step_size(max_value)
-        rounded_max = math.ceil(max_value / step_size) * step_size
-        tickvals = np.arange(0, rounded_max + 1, step_size)
-        ticktext = [formatter(val) for val in tickvals]
-
-        fig.update_layout(
-            barmode='group',
-            title=f'Monatlicher Export- und Importverlauf von {selected_ware} mit {selected_country} ({selected_year})',
-            xaxis_title='Monat',
-            yaxis_title='Wert in €',
-            yaxis=dict(
-                tickvals=tickvals,
-                ticktext=ticktext
-            ),
-            legend=dict(title='Kategorie', bgcolor='rgba(255,255,255,0.7)')
+        tickvals, ticktext = axes.linear(max_value)
+
+        fig = trade_figure(
+            data=[
+                {'x': df_selected['Monat_Name'], 'y': df_selected['Ausfuhr: Wert']},
+                {'x': df_selected['Monat_Name'], 'y': df_selected['Einfuhr: Wert']},
+            ],
+            layout={
+                'title': {'text': f'Monatlicher Export- und Importverlauf von {selected_ware} mit {selected_country} ({selected_year})'},
+                'yaxis': {'tickvals': tickvals, 'ticktext': ticktext},
+            }
         )
 
         # Handelsbilanz-Analyse und Ranking
@@ -4,6 +4,8 @@ import dash_bootstrap_components as dbc
 import importlib
 import os
 
+from core import admin, asgi, batch, database, datasets, export, forecast, prerender, queries, search
+
 app = dash.Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP])
 server = app.server
 
@@ -12,7 +14,8 @@ def create_nav_structure():
     return {
         "Überblick über Deutschlands Handel": {
             "Gesamtüberblick seit 2008 bis 2024": {
-                "Gesamter Export-, Import- und Handelsvolumen-Verlauf Deutschlands": "gesamt_export_import_volumen"
+                "Gesamter Export-, Import- und Handelsvolumen-Verlauf Deutschlands": "gesamt_export_import_volumen",
+                "Auffällige Monate im Handel": "anomalies_trade"
             },
             "Überblick nach bestimmtem Jahr": {
                 "Monatlicher Handelsverlauf": "monthly_trade",
@@ -21,7 +24,8 @@ def create_nav_structure():
                 "Länder mit größten Export- und Importzuwächsen (relativ)": "top_growth_countries",
                 "Top 10 Waren": "top_10_trade_goods",
                 "Waren mit größten Export- und Importzuwächsen (absolut)": "top_diff_goods",
-                "Waren mit größten Export- und Importzuwächsen (relativ)": "top_growth_goods"
+                "Waren mit größten Export- und Importzuwächsen (relativ)": "top_growth_goods",
+                "Größte Auf- und Absteiger im Ranking": "rank_movers"
             }
         },
         "Länderanalyse": {
@@ -30,7 +34,10 @@ def create_nav_structure():
                 "Vergleich mit anderen Ländern": "country_comparison",
                 "Export- und Importwachstumsrate": "export_import_growth_countries",
                 "Platzierung im Export- und Importranking Deutschlands": "export_import_ranking_graph_of_country",
-                "Deutschlands Top 10 Waren im Handel": "top10_goods_for_spec_country_all_time"
+                "Deutschlands Top 10 Waren im Handel": "top10_goods_for_spec_country_all_time",
+                "Prognose der Export- und Importwerte": "forecast_trade",
+                "Auffällige Monate im Handel": "anomalies_trade",
+                "Korrelation der monatlichen Handelsverläufe": "correlation_trade"
             },
             "Überblick nach bestimmtem Jahr": {
                 "Monatlicher Handelsverlauf & Handelsbilanz": "LA_trade_spec_country_and_year",
@@ -53,11 +60,15 @@ def create_nav_structure():
             "Gesamtüberblick seit 2008 bis 2024": {
                 "Gesamter Export- und Importverlauf einer Ware": "overview_trade_spec_good_2008_until_2024",
                 "Gesamter Export- und Importverlauf mehrerer Waren": "overview_trade_several_goods_2008_until_2024",
-                "Deutschlands Top 5 Export- und Importländer einer Ware": "top5_countries_for_spec_good"
+                "Deutschlands Top 5 Export- und Importländer einer Ware": "top5_countries_for_spec_good",
+                "Prognose der Export- und Importwerte": "forecast_trade",
+                "Auffällige Monate im Handel": "anomalies_trade",
+                "Korrelation der monatlichen Handelsverläufe": "correlation_trade"
             },
             "Überblick nach bestimmtem Jahr": {
                 "Gesamter Export- und Importverlauf einer Ware im ausgewählten Jahr + Ranking": "overview_trade_spec_good_in_spec_year",
-                "Top 10 Handelspartner im ausgewählten Jahr mit ausgewählter Ware": "top_10_trade_partners_spec_good"
+                "Top 10 Handelspartner im ausgewählten Jahr mit ausgewählter Ware": "top_10_trade_partners_spec_good",
+                "Abhängigkeitsrisiko nach Waren (Marktkonzentration)": "concentration_goods"
             },
             "Überblick nach bestimmtem Land": {
                 "Deutschlands gesamter Export- und Importverlauf einer Ware mit einem Land": "overview_trade_spec_good_with_spec_country_2008_until_2024"
@@ -127,7 +138,8 @@ def render_graph(pathname):
     try:
         graph_module = importlib.import_module(f'graphs.{graph_name}')
         if hasattr(graph_module, 'create_layout'):
-            return graph_module.create_layout()
+            # Standardansicht mit bereits berechneten Figuren
+            return prerender.layout(graph_name) or graph_module.create_layout()
         else:
             return html.Div(f"Graph {graph_name} does not have a create_layout() function"), 404
     except ModuleNotFoundError:
@@ -142,9 +154,32 @@ graph_modules = [
     "LA_top10_goods_for_spec_country_and_year", "top4_diff_goods_spec_country_and_year", "top4_growth_goods_spec_country_and_year", "LA_trade_spec_country_and_year",
     "overview_trade_spec_good_with_spec_country_2008_until_2024", "trade_spec_country_and_several_goods_from_2008_2024", "trade_spec_good_and_several_countries_from_2008_2024",
     "overview_trade_spec_good_2008_until_2024", "top5_countries_for_spec_good", "overview_trade_several_goods_2008_until_2024", "overview_trade_spec_good_in_spec_year",
-    "top_10_trade_partners_spec_good", "trade_spec_good_in_spec_year_and_spec_country"
+    "top_10_trade_partners_spec_good", "trade_spec_good_in_spec_year_and_spec_country",
+    "forecast_trade", "anomalies_trade", "correlation_trade", "concentration_goods",
+    "rank_movers"
 ]
 
+# Alle Datensätze parallel laden, bevor die Module sie über datasets.get() abrufen
+datasets.load_all()
+# Speicherbudget je Worker (MEMORY_BUDGET_MB, 0 = ohne Grenze)
+datasets.check_memory_budget()
+
+# Geänderte Dateien in data/ im laufenden Betrieb neu laden (0 = aus)
+watch_interval = float(os.environ.get('DATA_WATCH_INTERVAL', 10))
+if watch_interval > 0:
+    datasets.watch(watch_interval)
+# Optional: alle Datensätze zusätzlich in der gemeinsamen SQLite-Datei bereitstellen
+# (auch nötig, wenn die Seiten über DATA_BACKEND=sqlite abfragen)
+if database.ENABLED or queries.backend().name == 'sqlite':
+    database.ensure()
+admin.register_routes(server)
+search.register_routes(server)
+# Länderauswahl "land_dropdown" von LA_gesamt_export_import_volumen und
+# country_comparison: gleiche ID, daher nur ein Such-Callback für beide Seiten
+search.register_dropdown(app, 'land_dropdown', 'df_grouped', 'Land')
+batch.register_routes(server)
+export.register_routes(server)
+
 for module_name in graph_modules:
     try:
         module = importlib.import_module(f'graphs.{module_name}')
@@ -153,5 +188,21 @@ for module_name in graph_modules:
     except ModuleNotFoundError:
         print(f"Module {module_name} not found.")
 
+# Standardansicht aller Seiten vorberechnen (PRERENDER=0: erst beim ersten Aufruf)
+prerender.register(app, {
+    module_name: importlib.import_module(f'graphs.{module_name}').create_layout
+    for module_name in graph_modules
+})
+# Die Prognoseseite erst vorberechnen, wenn alle Modelle angepasst sind
+prerender.defer('forecast_trade', forecast.ready)
+prerender.build_in_background()
+# Prognosemodelle aller Reihen im Prozess-Pool anpassen (FORECAST=0: aus)
+forecast.build_in_background()
+
+# ASGI-Einstiegspunkt, z.B. uvicorn --factory multiple_pages_test_zweiteHauptkategorie:asgi_app
+# (uvicorn und a2wsgi zusätzlich installieren: pip install -r requirements-asgi.txt)
+def asgi_app():
+    return asgi.wrap(server)
+
 if __name__ == "__main__":
     app.run_server(debug=True)